@@ -0,0 +1 @@
+"""Python tooling around the feature catalogue produced by generate_features.py."""
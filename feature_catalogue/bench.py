@@ -0,0 +1,236 @@
+"""Latency benchmarks for catalogue cases that carry a ``perf_budget``.
+
+A budget, declared per feature in definitions.py, looks like::
+
+    {"requests": ["GET /api/standings/individual?limit=5&offset=0"], "p50_ms": 150, "p95_ms": 400,
+     "min_rps": 50, "auth": "user"}
+
+One iteration issues all of a feature's ``requests`` concurrently, as the
+page fans them out, and its latency is the time until the last response
+arrives. Iterations run ``concurrency`` at a time after a warm-up; p50/p95
+and throughput are checked against the budget and, when a baseline file is
+given, against the recorded baseline with a relative tolerance. Any
+violation makes the CLI exit non-zero so CI can gate on it.
+
+``--stub`` benchmarks against an in-process stand-in with configurable
+latency instead of a running server, to exercise the harness itself; its
+timings are never saved as a baseline. Perf outcomes stay out of the
+catalogue's ``passes``, which records functional results only.
+"""
+import argparse
+import asyncio
+import bisect
+import json
+import math
+import random
+import sys
+import time
+from datetime import date
+
+from .http import HttpClient, HttpError, server_url, start_server
+from .runner import SEEDED_USERS
+from .stream import iter_features
+
+
+class Histogram:
+    """Log-bucketed latency histogram (four buckets per doubling) with exact samples."""
+
+    def __init__(self):
+        self.samples = []
+
+    def add(self, ms):
+        bisect.insort(self.samples, ms)
+
+    def percentile(self, p):
+        if not self.samples:
+            return math.nan
+        index = min(len(self.samples) - 1, max(0, math.ceil(p / 100 * len(self.samples)) - 1))
+        return self.samples[index]
+
+    def buckets(self):
+        counts = {}
+        for ms in self.samples:
+            upper = 2 ** (math.ceil(4 * math.log2(max(ms, 0.01))) / 4)
+            key = f'{upper:.2f}'
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+
+
+def _parse_request(spec):
+    method, _, path = spec.partition(' ')
+    return method.upper(), path
+
+
+async def _login(client, who):
+    identifier, password = SEEDED_USERS[who]
+    response = await client.post('/api/auth/login', json={'identifier': identifier, 'password': password})
+    if not response.ok:
+        raise HttpError(f'login as {who}: HTTP {response.status}')
+    return response.json()['accessToken']
+
+
+async def bench_feature(client, feature, iterations=200, concurrency=10, warmup=10):
+    """Benchmark one feature's budget requests; returns a result dict."""
+    budget = feature['perf_budget']
+    requests = [_parse_request(spec) for spec in budget['requests']]
+    headers = {}
+    if budget.get('auth'):
+        headers['Authorization'] = f"Bearer {await _login(client, budget['auth'])}"
+
+    histogram = Histogram()
+    errors = 0
+
+    async def iteration(record):
+        nonlocal errors
+        started = time.perf_counter()
+        try:
+            responses = await asyncio.gather(*(client.request(m, p, headers=headers) for m, p in requests))
+        except (HttpError, OSError, asyncio.TimeoutError):
+            errors += record
+            return
+        if record:
+            if all(r.ok for r in responses):
+                histogram.add((time.perf_counter() - started) * 1000)
+            else:
+                errors += 1
+
+    async def run(count, record):
+        remaining = iter(range(count))
+
+        async def lane():
+            for _ in remaining:
+                await iteration(record)
+        await asyncio.gather(*(lane() for _ in range(concurrency)))
+
+    await run(warmup, False)
+    started = time.perf_counter()
+    await run(iterations, True)
+    elapsed = time.perf_counter() - started
+    return {
+        'id': feature['id'],
+        'description': feature['description'],
+        'iterations': iterations,
+        'errors': errors,
+        'p50_ms': round(histogram.percentile(50), 2),
+        'p95_ms': round(histogram.percentile(95), 2),
+        'p99_ms': round(histogram.percentile(99), 2),
+        'max_ms': round(histogram.samples[-1], 2) if histogram.samples else math.nan,
+        'rps': round(iterations / elapsed, 1) if elapsed else math.nan,
+        'histogram': histogram.buckets(),
+    }
+
+
+def check(result, budget, baseline=None, tolerance=0.2):
+    """Return a list of human-readable budget and baseline violations."""
+    violations = []
+    if result['errors']:
+        violations.append(f"{result['errors']} failed iterations")
+    for key in ('p50_ms', 'p95_ms'):
+        if key in budget and not result[key] <= budget[key]:
+            violations.append(f"{key[:-3]} {result[key]} ms over budget {budget[key]} ms")
+        if baseline and key in baseline and not result[key] <= baseline[key] * (1 + tolerance):
+            violations.append(f"{key[:-3]} {result[key]} ms regressed from baseline {baseline[key]} ms")
+    if 'min_rps' in budget and not result['rps'] >= budget['min_rps']:
+        violations.append(f"{result['rps']} it/s under budget {budget['min_rps']} it/s")
+    if baseline and 'rps' in baseline and not result['rps'] >= baseline['rps'] * (1 - tolerance):
+        violations.append(f"{result['rps']} it/s regressed from baseline {baseline['rps']} it/s")
+    return violations
+
+
+def stub_handler(delay_ms=5.0, jitter=0.5):
+    """Stand-in for the server: every request succeeds after a jittered delay."""
+    async def handler(method, target, headers, body):
+        await asyncio.sleep(delay_ms * (1 + random.uniform(-jitter, jitter)) / 1000)
+        if target == '/api/auth/login':
+            return 200, {}, {'accessToken': 'stub-token'}
+        return 200, {}, {'success': True, 'path': target}
+    return handler
+
+
+async def run_benchmarks(features, base_url=None, stub_delay=None, iterations=200, concurrency=10, warmup=10,
+                         on_result=None):
+    server = None
+    if base_url is None:
+        server = await start_server(stub_handler(stub_delay if stub_delay is not None else 5.0))
+        base_url = server_url(server)
+    results = []
+    try:
+        async with HttpClient(base_url, max_connections=concurrency * 4) as client:
+            for feature in features:
+                result = await bench_feature(client, feature, iterations, concurrency, warmup)
+                results.append(result)
+                if on_result is not None:
+                    on_result(result)
+    finally:
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+    return results
+
+
+def load_baselines(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return {int(k): v for k, v in json.load(f).items()}
+    except FileNotFoundError:
+        return {}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark catalogue cases against their perf budgets.")
+    parser.add_argument('--catalogue', default='feature_list.json')
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--api', help="server base URL, e.g. http://localhost:5000")
+    target.add_argument('--stub', action='store_true', help="benchmark an in-process stub instead of a server")
+    parser.add_argument('--stub-delay', type=float, default=5.0, help="stub latency in ms (default: %(default)s)")
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--id', type=int, action='append', dest='ids')
+    parser.add_argument('--category')
+    parser.add_argument('--baseline', default='perf_baselines.json', help="baseline file (default: %(default)s)")
+    parser.add_argument('--save-baseline', action='store_true', help="record this run as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed regression vs baseline (default: 20%%)")
+    parser.add_argument('--json', dest='json_out', help="write full results, including histograms, to this file")
+    args = parser.parse_args(argv)
+    if not args.api and not args.stub:
+        parser.error("one of --api or --stub is required")
+    if args.stub and args.save_baseline:
+        parser.error("--save-baseline records real server timings; it cannot be used with --stub")
+
+    features = list(iter_features(args.catalogue, lambda f: 'perf_budget' in f
+                                  and (not args.ids or f['id'] in args.ids)
+                                  and (args.category is None or f['category'] == args.category)))
+    baselines = load_baselines(args.baseline)
+    outcomes = {}
+
+    def report(result):
+        feature = next(f for f in features if f['id'] == result['id'])
+        violations = check(result, feature['perf_budget'], baselines.get(result['id']), args.tolerance)
+        outcomes[result['id']] = not violations
+        status = 'ok' if not violations else 'OVER'
+        print(f"{status:>4}  #{result['id']:<4} p50 {result['p50_ms']:8.1f} ms  p95 {result['p95_ms']:8.1f} ms  "
+              f"{result['rps']:8.1f} it/s  {result['description']}")
+        for violation in violations:
+            print(f"        - {violation}")
+
+    results = asyncio.run(run_benchmarks(features, None if args.stub else args.api, args.stub_delay,
+                                         args.iterations, args.concurrency, args.warmup, report))
+    if args.json_out:
+        with open(args.json_out, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        # Runs with failed iterations (or no samples at all) are not a baseline.
+        recorded = [r for r in results
+                    if not r['errors'] and all(math.isfinite(r[key]) for key in ('p50_ms', 'p95_ms', 'rps'))]
+        baselines.update({r['id']: {'p50_ms': r['p50_ms'], 'p95_ms': r['p95_ms'], 'rps': r['rps'],
+                                    'recorded': date.today().isoformat()} for r in recorded})
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({str(k): v for k, v in sorted(baselines.items())}, f, indent=2, allow_nan=False)
+        print(f"Saved baselines for {len(recorded)} of {len(results)} features to {args.baseline}")
+    if not all(outcomes.values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,559 @@
+"""Hit ratio, invalidation cost and stale-read checks for the Redis caches.
+
+The controllers cache read models in Redis under the ``CACHE_KEYS`` of
+``server/src/config/redis.ts``, each with its ``CACHE_TTL``. When a match
+result lands, ``cacheService.invalidateAfterMatchResult`` deletes match,
+leaderboard and group keys with ``KEYS pattern`` + ``DEL``. This tool
+replays a match-day trace (viewers loading the pages the Standings and
+Statistics cases visit, plus match results) and reports, per key family:
+hit ratio, sets, expiries, deletes, and stale reads. A stale read is a
+hit on a result-dependent key whose value was computed before the latest
+match result.
+
+Two ways to run it:
+
+``simulate``
+    Models the server's cache-aside code paths in virtual time, so a whole
+    match day at 10k+ viewers runs in seconds. A miss issues a database
+    query that lands ``--db-ms`` later; concurrent misses on the same key
+    all query (the server has no single-flight), and a query that started
+    before a result but lands after it writes a stale value. ``--policy``
+    picks what happens on a result: ``ttl`` is what
+    ``adminController.updateMatchResult`` does today (nothing; entries
+    age out), ``after-result`` applies ``invalidateAfterMatchResult``.
+
+``live``
+    Serves an instrumented in-memory Redis stand-in (RESP2) that the
+    server uses via ``REDIS_HOST``/``REDIS_PORT``, and replays the trace
+    against the running API in scaled real time, posting results through
+    ``POST /api/admin/matches/:id/result``.
+"""
+import argparse
+import asyncio
+import fnmatch
+import functools
+import heapq
+import json
+import random
+import re
+import time
+from collections import Counter, defaultdict
+from urllib.parse import parse_qsl, urlsplit
+
+from .steps import feature_steps
+from .stream import iter_features
+
+# CACHE_TTL, in seconds.
+TTL = {
+    'leaderboard': 300, 'matches': 600, 'teams': 3600, 'groups': 300, 'user_stats': 300,
+    'department_stats': 300, 'bonus_questions': 3600, 'scoring_rules': 3600, 'tournament_stats': 1800,
+}
+
+# Key family -> pattern over CACHE_KEYS; first match wins.
+KEY_FAMILIES = [
+    ('leaderboard:individual', re.compile(r'^leaderboard:individual')),
+    ('leaderboard:department', re.compile(r'^leaderboard:department')),
+    ('matches', re.compile(r'^matches:')),
+    ('match', re.compile(r'^match:')),
+    ('teams', re.compile(r'^teams:all')),
+    ('team', re.compile(r'^team:')),
+    ('group:standings', re.compile(r'^group:standings:')),
+    ('user:predictions', re.compile(r'^user:[^:]+:predictions$')),
+    ('user:stats', re.compile(r'^user:[^:]+:stats$')),
+    ('department:stats', re.compile(r'^department:[^:]+:stats$')),
+    ('bonus', re.compile(r'^bonus:')),
+    ('scoring', re.compile(r'^scoring:')),
+    ('stats:topscorers', re.compile(r'^stats:topscorers:')),
+    ('stats:topcards', re.compile(r'^stats:topcards:')),
+    ('stats:global', re.compile(r'^stats:global:')),
+]
+
+# Families whose cached value changes when a match result is recorded.
+RESULT_DEPENDENT = {
+    'leaderboard:individual', 'leaderboard:department', 'matches', 'match', 'group:standings',
+    'user:stats', 'department:stats', 'stats:global',
+}
+
+# The API calls each client page makes on load (client/src/pages/*).
+PAGE_REQUESTS = {
+    '/': ['GET /api/matches/upcoming?limit=1', 'GET /api/standings/individual?limit=5&offset=0'],
+    '/standings/individual': ['GET /api/standings/individual?limit=50&offset=0'],
+    '/standings/departments': ['GET /api/standings/departments'],
+    '/statistics': ['GET /api/matches', 'GET /api/matches/statistics?season=2022',
+                    'GET /api/matches/prediction-stats'],
+    '/matches': ['GET /api/matches', 'GET /api/teams'],
+    '/groups': ['GET /api/teams', 'GET /api/matches?stage=group'],
+    '/my-prediction': ['GET /api/matches', 'GET /api/teams', 'GET /api/predictions/my',
+                       'GET /api/bonus-questions', 'GET /api/matches/statistics?season=2022'],
+}
+
+TRACE_CATEGORIES = ('Standings', 'Statistics')
+UNCACHED = '(uncached)'
+
+
+@functools.lru_cache(maxsize=65536)
+def key_family(key):
+    for family, pattern in KEY_FAMILIES:
+        if pattern.match(key):
+            return family
+    return 'other'
+
+
+def cache_keys(request, event='event'):
+    """Cache keys and TTLs the controller serving ``request`` reads, mirroring the .ts code."""
+    method, _, target = request.partition(' ')
+    parts = urlsplit(target)
+    path, query = parts.path, dict(parse_qsl(parts.query))
+    if method != 'GET':
+        return []
+    if path == '/api/standings/individual':
+        limit, offset = int(query.get('limit', 100)), int(query.get('offset', 0))
+        # getIndividualStandings keys on the parsed limit as sent; nothing clamps it.
+        key = f"leaderboard:individual:{event}:{limit}:{offset}:{query.get('search', '')}"
+        return [(key, TTL['leaderboard'])]
+    if path == '/api/standings/top':
+        return [(f"leaderboard:individual:top:{event}:{query.get('limit', 5)}", TTL['leaderboard'])]
+    if path == '/api/matches':
+        if query.get('stage'):
+            return [(f"matches:stage:{query['stage']}", TTL['matches'])]
+        status = query.get('status')
+        return [(f"matches:all:{status or 'all'}:{query.get('group', 'all')}",
+                 60 if status == 'live' else TTL['matches'])]
+    if path == '/api/matches/statistics':
+        season = query.get('season', '2026')
+        return [(f'stats:topscorers:{season}', TTL['tournament_stats']),
+                (f'stats:topcards:{season}', TTL['tournament_stats'])]
+    if path == '/api/matches/prediction-stats':
+        return [('stats:global:predictions', TTL['tournament_stats'])]
+    if path == '/api/teams':
+        return [(f"teams:all:{query['group']}" if query.get('group') else 'teams:all', TTL['teams'])]
+    return []
+
+
+# What ``invalidateAfterMatchResult(matchId, group)`` deletes: (kind, argument).
+def after_result_invalidation(match_id, group=None):
+    ops = [('del', f'match:{match_id}'), ('keys', 'matches:all*'), ('keys', 'matches:*'),
+           ('keys', 'leaderboard:individual*'), ('keys', 'leaderboard:department*'),
+           ('del', 'leaderboard:department')]
+    if group:
+        ops.append(('del', f'group:standings:{group}'))
+    return ops
+
+
+POLICIES = {
+    'ttl': lambda match_id, group=None: [],
+    'after-result': after_result_invalidation,
+}
+
+
+class FamilyStats:
+    __slots__ = ('hits', 'misses', 'sets', 'expired', 'deleted', 'stale', 'max_stale_age', 'queries')
+
+    def __init__(self):
+        self.hits = self.misses = self.sets = self.expired = self.deleted = 0
+        self.stale = self.queries = 0
+        self.max_stale_age = 0.0
+
+    @property
+    def hit_ratio(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self):
+        data = {name: getattr(self, name) for name in self.__slots__}
+        data['hit_ratio'] = round(self.hit_ratio, 4)
+        data['max_stale_age'] = round(self.max_stale_age, 3)
+        return data
+
+
+class InstrumentedStore:
+    """In-memory key/value store with TTLs that counts what happens per key family.
+
+    ``clock`` returns the current time in seconds; the simulator passes its
+    virtual clock, the RESP stand-in wall-clock time. Each entry remembers
+    the time its value was computed, so a read after :meth:`mark_result`
+    of a value computed before it is counted as stale.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.started = clock()
+        self.data = {}
+        self.families = defaultdict(FamilyStats)
+        self.last_result = None
+        self.results = []
+        self.scans = 0
+        self.scanned = 0
+
+    def _live(self, key, now):
+        entry = self.data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= now:
+            del self.data[key]
+            self.families[key_family(key)].expired += 1
+            return None
+        return entry
+
+    def get(self, key):
+        now = self.clock()
+        entry = self._live(key, now)
+        family = key_family(key)
+        stats = self.families[family]
+        if entry is None:
+            stats.misses += 1
+            return None
+        stats.hits += 1
+        if self.last_result is not None and entry[2] < self.last_result and family in RESULT_DEPENDENT:
+            stats.stale += 1
+            stats.max_stale_age = max(stats.max_stale_age, now - self.last_result)
+            if self.results:
+                self.results[-1]['stale_reads'] += 1
+        return entry[0]
+
+    def set(self, key, value, ttl=None, computed=None):
+        now = self.clock()
+        self.data[key] = (value, now + ttl if ttl else None, now if computed is None else computed)
+        self.families[key_family(key)].sets += 1
+
+    def delete(self, *keys):
+        now = self.clock()
+        removed = 0
+        for key in keys:
+            if self._live(key, now) is not None:
+                del self.data[key]
+                self.families[key_family(key)].deleted += 1
+                removed += 1
+        if self.results:
+            self.results[-1]['deleted'] += removed
+        return removed
+
+    def keys(self, pattern):
+        # KEYS walks the whole keyspace; that cost is what the report shows.
+        self.scans += 1
+        self.scanned += len(self.data)
+        if self.results:
+            self.results[-1]['scans'] += 1
+            self.results[-1]['scanned'] += len(self.data)
+        now = self.clock()
+        return [k for k in list(self.data) if fnmatch.fnmatchcase(k, pattern) and self._live(k, now) is not None]
+
+    def flush(self):
+        self.delete(*list(self.data))
+
+    def mark_result(self, label):
+        """Record that a match result was committed now."""
+        self.last_result = self.clock()
+        self.results.append({'match': label, 'at': round(self.last_result - self.started, 3), 'deleted': 0,
+                             'scans': 0, 'scanned': 0, 'refill_queries': 0, 'stale_reads': 0})
+
+    def report(self):
+        totals = FamilyStats()
+        for stats in self.families.values():
+            for name in FamilyStats.__slots__:
+                if name != 'max_stale_age':
+                    setattr(totals, name, getattr(totals, name) + getattr(stats, name))
+            totals.max_stale_age = max(totals.max_stale_age, stats.max_stale_age)
+        return {
+            'families': {family: stats.as_dict() for family, stats in sorted(self.families.items())},
+            'total': totals.as_dict(),
+            'results': self.results,
+            'keyspace_scans': self.scans,
+            'keys_scanned': self.scanned,
+        }
+
+
+def trace_pages(catalogue, categories=TRACE_CATEGORIES):
+    """Page -> weight from the catalogue: how many cases of ``categories`` open that page."""
+    weights = Counter()
+    for feature in iter_features(catalogue, lambda f: f['category'] in categories):
+        for step in feature_steps(feature):
+            match = re.match(r'^Navigate to (/[^\s,]*)', step)
+            if match:
+                weights[match.group(1)] += 1
+                break
+    return {page: n for page, n in weights.items() if page in PAGE_REQUESTS}
+
+
+def match_day(viewers, think_time, duration, results, seed=0, pages=None):
+    """Yield ``(time, kind, payload)`` events of one match day, in time order.
+
+    Page loads arrive as one Poisson stream at ``viewers / think_time`` per
+    second, spread over ``pages`` by weight. ``results`` is a list of
+    ``(time, match_id, group)`` result commits.
+    """
+    rng = random.Random(seed)
+    pages = pages or {page: 1 for page in PAGE_REQUESTS}
+    names, weights = list(pages), list(pages.values())
+    rate = viewers / think_time
+    pending = sorted(results)
+    now = 0.0
+    while True:
+        now += rng.expovariate(rate)
+        while pending and pending[0][0] <= now:
+            at, match_id, group = pending.pop(0)
+            yield at, 'result', (match_id, group)
+        if now >= duration:
+            return
+        yield now, 'page', rng.choices(names, weights)[0]
+
+
+def default_results(duration, matches, groups='ABCDEFGHIJKL'):
+    """Results spaced evenly over the day, the last one ``duration / (matches + 1)`` before the end."""
+    step = duration / (matches + 1)
+    return [(step * (i + 1), f'match-{i + 1}', groups[i % len(groups)]) for i in range(matches)]
+
+
+def simulate(events, policy='ttl', db_ms=None, refill_window=60.0):
+    """Replay ``events`` against a model of the server's cache-aside paths.
+
+    ``db_ms`` maps key family to query latency in ms (default 50, 250 for
+    leaderboards). Returns the :class:`InstrumentedStore` for its report.
+    """
+    latency = {'leaderboard:individual': 0.25, 'leaderboard:department': 0.25}
+    latency.update({family: ms / 1000 for family, ms in (db_ms or {}).items()})
+    invalidate = POLICIES[policy]
+    clock = [0.0]
+    store = InstrumentedStore(lambda: clock[0])
+    landing = []  # (land time, seq, key, ttl, computed at)
+    seq = 0
+    uncached = store.families[UNCACHED]
+    plans = {page: [cache_keys(request) for request in requests] for page, requests in PAGE_REQUESTS.items()}
+    for now, kind, payload in events:
+        while landing and landing[0][0] <= now:
+            at, _, key, ttl, computed = heapq.heappop(landing)
+            clock[0] = at
+            store.set(key, True, ttl, computed)
+        clock[0] = now
+        if kind == 'result':
+            match_id, group = payload
+            store.mark_result(match_id)
+            for op, arg in invalidate(match_id, group):
+                store.delete(*(store.keys(arg) if op == 'keys' else [arg]))
+            continue
+        for keys in plans[payload]:
+            if not keys:
+                uncached.misses += 1
+                uncached.queries += 1
+                continue
+            for key, ttl in keys:
+                if store.get(key) is None:
+                    family = key_family(key)
+                    store.families[family].queries += 1
+                    if store.results and now - store.last_result <= refill_window:
+                        store.results[-1]['refill_queries'] += 1
+                    seq += 1
+                    heapq.heappush(landing, (now + latency.get(family, 0.05), seq, key, ttl, now))
+    return store
+
+
+# --- live mode: RESP2 stand-in -------------------------------------------------
+
+def _resp(value):
+    if value is None:
+        return b'$-1\r\n'
+    if isinstance(value, bool):
+        return b'+OK\r\n' if value else b'$-1\r\n'
+    if isinstance(value, int):
+        return b':%d\r\n' % value
+    if isinstance(value, list):
+        return b'*%d\r\n' % len(value) + b''.join(_resp(v) for v in value)
+    if isinstance(value, str):
+        value = value.encode('utf-8')
+    return b'$%d\r\n%s\r\n' % (len(value), value)
+
+
+async def _read_command(reader):
+    line = await reader.readuntil(b'\r\n')
+    if not line.startswith(b'*'):
+        return line.decode('utf-8').split()
+    args = []
+    for _ in range(int(line[1:])):
+        size = int((await reader.readuntil(b'\r\n'))[1:])
+        args.append((await reader.readexactly(size + 2))[:-2].decode('utf-8'))
+    return args
+
+
+def _execute(store, args):
+    command = args[0].upper()
+    if command == 'PING':
+        return b'+PONG\r\n'
+    if command == 'GET':
+        return _resp(store.get(args[1]))
+    if command == 'SETEX':
+        store.set(args[1], args[3], int(args[2]))
+        return _resp(True)
+    if command == 'SET':
+        options = [a.upper() for a in args[3:]]
+        ttl = None
+        if 'EX' in options:
+            ttl = int(args[3 + options.index('EX') + 1])
+        elif 'PX' in options:
+            ttl = int(args[3 + options.index('PX') + 1]) / 1000
+        store.set(args[1], args[2], ttl)
+        return _resp(True)
+    if command in ('DEL', 'UNLINK'):
+        return _resp(store.delete(*args[1:]))
+    if command == 'KEYS':
+        return _resp(store.keys(args[1]))
+    if command == 'EXISTS':
+        return _resp(sum(store._live(k, store.clock()) is not None for k in args[1:]))
+    if command in ('FLUSHDB', 'FLUSHALL'):
+        store.flush()
+        return _resp(True)
+    if command == 'INFO':
+        return _resp('# Server\r\nredis_version:7.0.0\r\nloading:0\r\n')
+    if command in ('SELECT', 'CLIENT', 'QUIT'):
+        return _resp(True)
+    if command == 'COMMAND':
+        return _resp([])
+    return f'-ERR unknown command {args[0]!r}\r\n'.encode('utf-8')
+
+
+async def start_redis(store, host='127.0.0.1', port=6379):
+    """Serve ``store`` over the Redis protocol (the commands ioredis and redis.ts use)."""
+    async def connection(reader, writer):
+        try:
+            while True:
+                try:
+                    args = await _read_command(reader)
+                except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+                    return
+                if not args:
+                    continue
+                writer.write(_execute(store, args))
+                await writer.drain()
+                if args[0].upper() == 'QUIT':
+                    return
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(connection, host, port)
+
+
+async def replay_live(events, api, store, speed=60.0, workers=64, event_code='internal', match_ids=None):
+    """Replay ``events`` against the server at ``api``, ``speed`` times faster than real time."""
+    from .http import HttpClient
+    from .runner import SEEDED_USERS
+
+    headers = {'X-Event-Code': event_code}
+    started = time.monotonic()
+    async with HttpClient(api, max_connections=workers, headers=headers) as client:
+        identifier, password = SEEDED_USERS['admin']
+        login = await client.post('/api/auth/login', json={'identifier': identifier, 'password': password})
+        token = login.json()['accessToken'] if login.ok else None
+        if match_ids is None:
+            listing = await client.get('/api/matches?stage=group')
+            match_ids = [m['id'] for m in (listing.json() or {}).get('matches', [])] if listing.ok else []
+        slots = asyncio.Semaphore(workers)
+        tasks = set()
+        rng = random.Random(0)
+
+        async def load(page):
+            async with slots:
+                for request in PAGE_REQUESTS[page]:
+                    method, _, target = request.partition(' ')
+                    await client.request(method, target)
+
+        async def result(index, label):
+            if not match_ids or token is None:
+                return
+            match_id = match_ids[index % len(match_ids)]
+            response = await client.post(f'/api/admin/matches/{match_id}/result',
+                                         json={'homeScore': rng.randint(0, 4), 'awayScore': rng.randint(0, 4)},
+                                         headers={'Authorization': f'Bearer {token}'})
+            if response.ok:
+                store.mark_result(label)
+
+        results_seen = 0
+        for at, kind, payload in events:
+            delay = started + at / speed - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if kind == 'result':
+                tasks.add(asyncio.ensure_future(result(results_seen, payload[0])))
+                results_seen += 1
+            else:
+                tasks.add(asyncio.ensure_future(load(payload)))
+            tasks = {t for t in tasks if not t.done()}
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def format_report(report):
+    lines = [f"{'family':<24}{'reads':>10}{'hit %':>8}{'sets':>8}{'expired':>9}{'deleted':>9}"
+             f"{'queries':>9}{'stale':>8}{'max age s':>11}"]
+    for family, s in report['families'].items():
+        reads = s['hits'] + s['misses']
+        lines.append(f"{family:<24}{reads:>10}{s['hit_ratio'] * 100:>8.1f}{s['sets']:>8}{s['expired']:>9}"
+                     f"{s['deleted']:>9}{s['queries']:>9}{s['stale']:>8}{s['max_stale_age']:>11.1f}")
+    for r in report['results']:
+        lines.append(f"result {r['match']} at {r['at']:.0f}s: deleted {r['deleted']} keys, "
+                     f"{r['scans']} KEYS scans over {r['scanned']} keys, {r['refill_queries']} refill queries, "
+                     f"{r['stale_reads']} stale reads")
+    total = report['total']
+    lines.append(f"total: {total['hits'] + total['misses']} reads, hit ratio {total['hit_ratio'] * 100:.1f}%, "
+                 f"{total['stale']} stale reads")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a match day against the caches and report hit ratios, "
+                                                 "invalidation fan-out and stale reads.")
+    sub = parser.add_subparsers(dest='mode', required=True)
+    sim = sub.add_parser('simulate', help="model the server's caching in virtual time")
+    sim.add_argument('--policy', choices=sorted(POLICIES), default='ttl')
+    sim.add_argument('--db-ms', action='append', default=[], metavar='FAMILY=MS',
+                     help="query latency for a key family (repeatable)")
+    live = sub.add_parser('live', help="serve a Redis stand-in and replay against a running server")
+    live.add_argument('--api', default='http://localhost:5000')
+    live.add_argument('--redis-host', default='127.0.0.1')
+    live.add_argument('--redis-port', type=int, default=6379)
+    live.add_argument('--speed', type=float, default=60.0, help="trace seconds per real second")
+    live.add_argument('--workers', type=int, default=64)
+    live.add_argument('--event-code', default='internal')
+    for p in (sim, live):
+        p.add_argument('--catalogue', default='feature_list.json')
+        p.add_argument('--viewers', type=int, default=10000)
+        p.add_argument('--think-time', type=float, default=60.0, help="mean seconds between a viewer's page loads")
+        p.add_argument('--hours', type=float, default=3.0)
+        p.add_argument('--matches', type=int, default=2, help="match results during the trace")
+        p.add_argument('--seed', type=int, default=0)
+        p.add_argument('--json', dest='json_out', help="also write the report to this file")
+        p.add_argument('--strict', action='store_true', help="exit 1 if any stale read was observed")
+    args = parser.parse_args(argv)
+
+    duration = args.hours * 3600
+    events = match_day(args.viewers, args.think_time, duration, default_results(duration, args.matches),
+                       args.seed, trace_pages(args.catalogue) or None)
+    if args.mode == 'simulate':
+        db_ms = {}
+        for value in args.db_ms:
+            family, sep, ms = value.rpartition('=')
+            if not sep:
+                parser.error(f'expected FAMILY=MS, got {value!r}')
+            db_ms[family] = float(ms)
+        started = time.perf_counter()
+        store = simulate(events, args.policy, db_ms)
+        print(f"Simulated {args.hours:g}h, {args.viewers} viewers, policy {args.policy} "
+              f"in {time.perf_counter() - started:.1f}s")
+    else:
+        store = InstrumentedStore()
+
+        async def run():
+            server = await start_redis(store, args.redis_host, args.redis_port)
+            print(f"Redis stand-in on {args.redis_host}:{args.redis_port}; replaying at {args.speed:g}x")
+            try:
+                await replay_live(events, args.api, store, args.speed, args.workers, args.event_code)
+            finally:
+                server.close()
+        asyncio.run(run())
+
+    report = store.report()
+    print(format_report(report))
+    if args.json_out:
+        with open(args.json_out, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.strict and report['total']['stale']:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,223 @@
+"""``python -m feature_catalogue <command>``: one entry point for the catalogue tools.
+
+``query`` and ``stats`` read the SQLite index of
+:mod:`feature_catalogue.store`, which re-reads the catalogue only when its
+mtime or size changed, so a warm call costs little more than interpreter
+start-up. ``diff`` reads the catalogues it compares directly.
+``generate``, ``run`` and the other tool commands
+hand their arguments to that module's ``main``. Every command imports its
+module only when it runs, so ``query`` never loads the runner, the
+generator or the category definitions.
+"""
+import argparse
+import json
+import sys
+
+# Commands that forward their arguments to ``feature_catalogue.<module>.main``.
+TOOLS = {
+    'generate': ('generate', "build feature_list.json from the category definitions"),
+    'run': ('runner', "run catalogue test steps concurrently"),
+    'impact': ('impact', "list cases affected by changed source files"),
+    'coverage': ('coverage', "find near-duplicate cases and untouched endpoints"),
+    'history': ('history', "flakiness and duration statistics from the run history"),
+    'trace': ('trace', "summarize a run trace or convert it to folded stacks"),
+    'bench': ('bench', "benchmark cases that carry a perf budget"),
+    'load': ('load', "replay catalogue journeys as load"),
+    'insights': ('insights', "prediction analytics cubes for the Admin Insights cases"),
+    'validate': ('model', "validate or convert a catalogue file"),
+}
+
+GENERATED = '@generated'
+
+
+def _missing(path):
+    return SystemExit(f"❌ {path} not found; run 'python -m feature_catalogue generate' first")
+
+
+def _open_store(path):
+    import os
+
+    from .store import open_store
+    # Checked first: opening the store would leave an empty index behind.
+    if not os.path.exists(path):
+        raise _missing(path)
+    return open_store(path)
+
+
+def _print_features(features, fmt):
+    if fmt == 'ids':
+        print('\n'.join(str(f['id']) for f in features))
+    elif fmt == 'ndjson':
+        sys.stdout.write(''.join(json.dumps(f, separators=(',', ':')) + '\n' for f in features))
+    elif fmt == 'table':
+        for f in features:
+            print(f"#{f['id']:<5} {'pass' if f.get('passes') else 'fail':4}  {f['priority']:<6} "
+                  f"{f['category']:<22} {f['description']}")
+    else:
+        print(json.dumps(features, indent=2))
+
+
+def cmd_query(args):
+    with _open_store(args.catalogue) as store:
+        if args.ids:
+            features = [f for f in (store.get(fid) for fid in args.ids) if f is not None]
+        else:
+            features = store.query(args.category, args.priority, args.passes, args.search)
+    if args.count:
+        print(len(features))
+    else:
+        _print_features(features, args.format)
+
+
+def cmd_stats(args):
+    with _open_store(args.catalogue) as store:
+        categories, priorities = store.counts('category'), store.counts('priority')
+    total = sum(entry['total'] for entry in categories.values())
+    passing = sum(entry['passing'] for entry in categories.values())
+    result = {
+        'total': total,
+        'passing': passing,
+        'categories': categories,
+        'priorities': priorities,
+    }
+    if args.history:
+        from .history import RunHistory
+        classes = {}
+        for stats in RunHistory.for_catalogue(args.catalogue).stats().values():
+            classes[stats.classification] = classes.get(stats.classification, 0) + 1
+        result['history'] = classes
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    print(f"{total} cases, {passing} passing ({passing / max(1, total):.0%})")
+    for key in ('categories', 'priorities'):
+        print(f"{key}:")
+        for name, entry in result[key].items():
+            print(f"  {name:<24} {entry['passing']:>5} / {entry['total']:<5}")
+    if 'history' in result:
+        print('history: ' + ', '.join(f'{name} {n}' for name, n in sorted(result['history'].items())))
+
+
+def _features_from(spec, catalogue):
+    """Features of ``spec``: a catalogue path, ``git:REV`` (the catalogue at a revision) or ``@generated``."""
+    if spec == GENERATED:
+        from .generate import build_output, load_existing
+        output, _, _ = build_output(load_existing(catalogue))
+        return output['features']
+    if spec.startswith('git:'):
+        import subprocess
+
+        from .model import normalize_feature
+        rev = spec[4:] or 'HEAD'
+        try:
+            text = subprocess.run(['git', 'show', f'{rev}:./{catalogue}'], check=True, capture_output=True,
+                                  text=True).stdout
+        except (OSError, subprocess.CalledProcessError) as exc:
+            raise SystemExit(f"❌ cannot read {catalogue} at {rev}: {getattr(exc, 'stderr', '') or exc}") from None
+        data = json.loads(text)
+        return [normalize_feature(f) for f in (data['features'] if isinstance(data, dict) else data)]
+    from .stream import load_features
+    try:
+        return load_features(spec)
+    except FileNotFoundError:
+        raise _missing(spec) from None
+
+
+def diff_features(old, new):
+    """Compare two feature lists by id; ``passes`` flips are reported apart from content changes."""
+    old_by_id = {f['id']: f for f in old}
+    new_by_id = {f['id']: f for f in new}
+    changed, flipped = [], []
+    for fid in old_by_id.keys() & new_by_id.keys():
+        a, b = old_by_id[fid], new_by_id[fid]
+        if {k: v for k, v in a.items() if k != 'passes'} != {k: v for k, v in b.items() if k != 'passes'}:
+            changed.append(fid)
+        elif bool(a.get('passes')) != bool(b.get('passes')):
+            flipped.append(fid)
+    return {
+        'added': sorted(new_by_id.keys() - old_by_id.keys()),
+        'removed': sorted(old_by_id.keys() - new_by_id.keys()),
+        'changed': sorted(changed),
+        'passes_flipped': sorted(flipped),
+    }
+
+
+def cmd_diff(args):
+    old_spec = args.old or args.catalogue
+    new_spec = args.new or (args.catalogue if args.old else GENERATED)
+    old, new = _features_from(old_spec, args.catalogue), _features_from(new_spec, args.catalogue)
+    result = diff_features(old, new)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        described = {f['id']: f['description'] for f in old}
+        described.update({f['id']: f['description'] for f in new})
+        print(f"{old_spec} -> {new_spec}: " + ', '.join(f"{len(ids)} {kind.replace('_', ' ')}"
+                                                      for kind, ids in result.items()))
+        marks = {'added': '+', 'removed': '-', 'changed': '~', 'passes_flipped': '!'}
+        for kind, ids in result.items():
+            for fid in ids:
+                print(f"{marks[kind]} #{fid:<5} {described[fid]}")
+    if args.exit_code and any(result.values()):
+        raise SystemExit(1)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m feature_catalogue',
+                                     description="Catalogue toolchain: generate, query, diff, run and stats.")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--catalogue', default='feature_list.json')
+    commands = parser.add_subparsers(dest='command', metavar='COMMAND')
+
+    query = commands.add_parser('query', parents=[common], help="look up cases by id or filter (index-backed)")
+    query.add_argument('ids', nargs='*', type=int, help="feature ids")
+    query.add_argument('--category')
+    query.add_argument('--priority', choices=['high', 'medium', 'low'])
+    state = query.add_mutually_exclusive_group()
+    state.add_argument('--passing', action='store_const', const=True, dest='passes')
+    state.add_argument('--failing', action='store_const', const=False, dest='passes')
+    query.add_argument('--search', help="case-insensitive substring of the description")
+    query.add_argument('--format', choices=['json', 'ndjson', 'ids', 'table'], default='json')
+    query.add_argument('--count', action='store_true', help="print only the number of matches")
+    query.set_defaults(handler=cmd_query)
+
+    stats = commands.add_parser('stats', parents=[common], help="totals and pass rates per category and priority")
+    stats.add_argument('--history', action='store_true', help="add flakiness classes from the run history")
+    stats.add_argument('--json', action='store_true')
+    stats.set_defaults(handler=cmd_stats)
+
+    diff = commands.add_parser('diff', parents=[common], help="compare catalogues: paths, git:REV or @generated",
+                               description="With no arguments, compare the catalogue with what "
+                                           "'generate --incremental' would write; with one, compare "
+                                           "it with the catalogue.")
+    diff.add_argument('old', nargs='?')
+    diff.add_argument('new', nargs='?')
+    diff.add_argument('--json', action='store_true')
+    diff.add_argument('--exit-code', action='store_true', help="exit with 1 when there are differences")
+    diff.set_defaults(handler=cmd_diff)
+
+    for name, (_, summary) in TOOLS.items():
+        commands.add_parser(name, help=summary, add_help=False)
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    # Tool commands skip our parser entirely; their own parser sees the rest of the line.
+    if argv and argv[0] in TOOLS:
+        import importlib
+        module = importlib.import_module(f'.{TOOLS[argv[0]][0]}', __package__)
+        # model.main takes the validate/convert subcommand itself; ``validate FILE`` means the former.
+        if argv[0] == 'validate' and argv[1:2] not in (['validate'], ['convert']):
+            return module.main(['validate', *argv[1:]])
+        return module.main(argv[1:])
+
+    args = build_parser().parse_args(argv)
+    if args.command is None or args.command in TOOLS:
+        build_parser().print_help()
+        return
+    args.handler(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,533 @@
+"""Redundancy and coverage-gap analysis of the feature catalogue.
+
+Three reports over one pass of the catalogue:
+
+Near-duplicate cases
+    Steps are normalised (case, quoted values, verb synonyms such as
+    click/press/tap, filler words). Numbers and nouns are kept as they are:
+    "1h" against "24h", "red" against "yellow cards" or "iPad" against
+    "desktop" is what tells two neighbouring cases apart. Each case becomes
+    the set of word 1- and 2-grams of its description and of each step. A MinHash signature per
+    case, computed with one-permutation hashing and rotation densification,
+    is a single pass over the shingles, with no numpy needed. LSH banding
+    proposes candidate pairs, and the exact Jaccard similarity of their
+    shingle sets confirms them. Confirmed pairs are merged into clusters.
+    Only clusters whose weakest confirmed pair reaches ``DROP_SIMILARITY``
+    are reported with keep/drop advice; looser ones (``--threshold`` below
+    it) are listed for review only.
+    Cases with identical shingle sets are collapsed before hashing, which
+    keeps an expanded catalogue (a dozen identical variants per entry)
+    about as cheap as the base one.
+    Variants produced by ``generate_features.py --expand`` of one entry are
+    duplicates by design. Their setup steps and event prefix are removed
+    before shingling, and clusters made only of them are reported apart
+    from the real duplicates. The duplicate cost of a cluster is the
+    runtime (from the run history, when there is one) or the step count of
+    every member but the one to keep.
+
+Shared step sequences
+    An inverted index maps runs of 1..3 consecutive normalised steps to
+    the cases containing them. Sequences shared by many cases are
+    candidates for fixtures or for trimming.
+
+Untouched endpoints
+    Routes are read from ``server/src/server.ts`` and ``server/src/routes``.
+    A case touches the endpoints it calls explicitly (``GET /api/...``
+    steps, ``perf_budget`` requests), the ones its pages load (see
+    :data:`PAGE_ENDPOINTS`) and the ones its steps imply, alone or on the
+    page they are taken on (see :data:`STEP_ENDPOINTS` and
+    :data:`PAGE_ACTIONS`). Routes no case reaches are reported, mutating
+    ones first, together with requests that match no route.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+from collections import defaultdict
+from functools import lru_cache
+
+from .cachecheck import PAGE_REQUESTS
+from .steps import feature_steps
+from .stream import iter_features
+
+PERMUTATIONS = 64          # signature length; a power of two
+BANDS = 32                 # 32 bands x 2 rows: a pair at Jaccard 0.8 is always a candidate, at 0.4 99.6% of the time
+THRESHOLD = 0.8
+DROP_SIMILARITY = 0.8      # below this a cluster is listed for review, never as "drop"
+MAX_BUCKET = 500           # LSH buckets larger than this are boilerplate, not duplicates
+SEQUENCE = 3
+
+# Verbs only: words that double as nouns ("check", "type", "input") keep their meaning.
+SYNONYMS = {
+    'press': 'click', 'tap': 'click', 'ensure': 'verify', 'confirm': 'verify', 'validate': 'verify',
+    'assert': 'verify', 'go': 'navigate', 'visit': 'navigate', 'open': 'navigate', 'displayed': 'shown',
+    'shows': 'shown', 'show': 'shown', 'appears': 'shown', 'visible': 'shown', 'fill': 'enter',
+    'modify': 'change', 'edit': 'change', 'update': 'change',
+}
+FILLER = frozenset('a an the is are be to of on in for with and that this it its all their his her'.split())
+SETUP_STEPS = ('Switch language to ', 'Set viewport to ')
+
+TOKEN_RE = re.compile(r"[a-z0-9#:/._-]+")
+QUOTED_RE = re.compile(r'"[^"]*"|\'[^\']*\'')
+VARIANT_SUFFIX_RE = re.compile(r' \[[^\]]*\]$')
+
+# Pages the cases navigate to -> API requests the page issues on load.
+PAGE_ENDPOINTS = {
+    **PAGE_REQUESTS,
+    '/profile': ['GET /api/auth/profile'],
+    '/standings': ['GET /api/standings/individual?limit=50&offset=0'],
+    '/admin': ['GET /api/admin/dashboard/stats', 'GET /api/admin/dashboard/api-status'],
+    '/admin/dashboard': ['GET /api/admin/dashboard/stats'],
+    '/admin/api': ['GET /api/admin/dashboard/api-status'],
+    '/admin/users': ['GET /api/admin/users'],
+    '/admin/customers': ['GET /api/admin/customers'],
+    '/admin/matches': ['GET /api/admin/matches'],
+    '/admin/teams': ['GET /api/admin/teams'],
+    '/admin/scoring-rules': ['GET /api/scoring-rules'],
+    '/admin/bonus-questions': ['GET /api/bonus-questions'],
+}
+
+# Step wording (matched against the raw step) -> API requests it implies.
+STEP_ENDPOINTS = [(re.compile(pattern, re.IGNORECASE), requests) for pattern, requests in (
+    (r'^Login as\b|\bclick log ?in\b', ['POST /api/auth/login']),
+    (r'\bclick register\b', ['POST /api/auth/register']),
+    (r'\bverification link\b|\bverify email\b', ['POST /api/auth/verify-email']),
+    (r'\bresend verification\b', ['POST /api/auth/resend-verification']),
+    (r'\b(save|change|update)\b.*\bprofile\b', ['PUT /api/auth/profile']),
+    (r'\b(save|submit)\b.*\bpredictions?\b|\bclick save\b', ['POST /api/predictions']),
+    (r'\bbonus (question )?answer', ['POST /api/predictions/bonus']),
+    (r'\b(delete|clear|remove)\b.*\bprediction', ['DELETE /api/predictions/:matchId']),
+    (r'^Trigger API sync$', ['POST /api/admin/dashboard/sync']),
+    (r'\b(enters?|submits?|saves?)\b.*\bmatch result\b', ['POST /api/admin/matches/:id/result']),
+    (r'\breset password\b', ['POST /api/admin/users/:id/reset-password']),
+    (r'\bbulk import\b|\bimport customers\b', ['POST /api/admin/customers/bulk-import']),
+    (r'\bexport\b.*\bstandings\b', ['GET /api/admin/standings/export']),
+    (r'\bmy rank', ['GET /api/standings/my-ranking']),
+)]
+
+# (page the case is on, step wording) -> API requests; page groups fill ``{0}``.
+PAGE_ACTIONS = [(re.compile(page, re.IGNORECASE), re.compile(step, re.IGNORECASE), requests)
+                for page, step, requests in (
+    (r'^/admin/(users|customers|teams|matches|events)\b', r'^(click )?(create|add)\b', ['POST /api/admin/{0}']),
+    (r'^/admin/(users|customers|teams|matches|events)\b', r'^(click )?(edit|change)\b',
+     ['PUT /api/admin/{0}/:id']),
+    (r'^/admin/(users|customers|teams|events)\b', r'^(click )?delete\b', ['DELETE /api/admin/{0}/:id']),
+    (r'^/admin/matches\b', r'^enter\b.*\bscore\b', ['POST /api/admin/matches/:id/result']),
+    (r'^/profile$', r'^(click )?save\b', ['PUT /api/auth/profile']),
+    (r'\bbonus\b', r'^(select|enter)\b', ['POST /api/predictions/bonus']),
+)]
+
+REQUEST_STEP_RE = re.compile(r'^(GET|POST|PUT|DELETE|PATCH) (/api/\S+)$')
+NAVIGATE_RE = re.compile(r'^Navigate to (/[^\s,]*)')
+PAGE_RE = re.compile(r'^Navigate to (.+)$')
+ROUTE_IMPORT_RE = re.compile(r"^import (\w+) from '\./routes/([\w.-]+)';", re.M)
+MOUNT_RE = re.compile(r"app\.use\(\s*'(/[^']*)',\s*(\w+)\s*\)")
+INLINE_RE = re.compile(r"app\.(get|post|put|delete|patch|use)\(\s*'(/api[^']*)',\s*async")
+ROUTE_RE = re.compile(r"router\.(get|post|put|delete|patch)\(\s*'([^']*)'")
+
+
+@lru_cache(maxsize=None)
+def normalize_step(text):
+    """Canonical form of one step: lower case, quoted values folded, verb synonyms mapped."""
+    text = QUOTED_RE.sub(' s ', text.lower())
+    tokens = []
+    for token in TOKEN_RE.findall(text):
+        token = token.strip('.-_:')
+        if token and token not in FILLER:
+            token = SYNONYMS.get(token, token)
+            if not (tokens and tokens[-1] == token):
+                tokens.append(token)
+    return ' '.join(tokens)
+
+
+def case_steps(feature):
+    """The feature's steps without the setup and event prefix its expansion variant added."""
+    steps = feature_steps(feature)
+    variant = feature.get('variant')
+    if not variant:
+        return steps
+    start = 0
+    while start < len(steps) and steps[start].startswith(SETUP_STEPS):
+        start += 1
+    steps = steps[start:]
+    event = variant.get('event')
+    if event:
+        prefix = f'Navigate to /{event}'
+        steps = [f'Navigate to {s[len(prefix):] or "/"}' if s.startswith(prefix + '/') or s == prefix else s
+                 for s in steps]
+    return steps
+
+
+def base_description(feature):
+    description = feature['description']
+    return VARIANT_SUFFIX_RE.sub('', description) if feature.get('variant') else description
+
+
+class Case:
+    __slots__ = ('id', 'category', 'description', 'steps', 'shingles', 'signature', 'variant', 'priority')
+
+    def __init__(self, feature):
+        self.id = feature['id']
+        self.category = feature['category']
+        self.description = base_description(feature)
+        self.variant = feature.get('variant')
+        self.priority = feature.get('priority')
+        self.steps = [normalize_step(s) for s in case_steps(feature)]
+        self.shingles = frozenset(_shingles(normalize_step(self.description), self.steps))
+        self.signature = None
+
+
+_hashes = {}
+
+
+def _hash(text):
+    value = _hashes.get(text)
+    if value is None:
+        value = _hashes[text] = int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), 'little')
+    return value
+
+
+def _shingles(description, steps):
+    shingles = []
+    for text in [description] + steps:
+        tokens = text.split()
+        shingles += map(_hash, tokens)
+        shingles += (_hash(f'{a} {b}') for a, b in zip(tokens, tokens[1:]))
+    return shingles
+
+
+def signature(shingles, k=PERMUTATIONS):
+    """One-permutation MinHash: bin = low bits, value = the rest; empty bins borrow clockwise."""
+    bits = k.bit_length() - 1
+    bins = [None] * k
+    for h in shingles:
+        b, v = h & (k - 1), h >> bits
+        if bins[b] is None or v < bins[b]:
+            bins[b] = v
+    if None in bins and any(v is not None for v in bins):
+        # Rotation densification (Shrivastava & Li, 2014): take the next non-empty bin,
+        # tagged with the distance so borrowed values don't collide with genuine ones.
+        original = bins[:]
+        for i in range(k):
+            if original[i] is None:
+                distance = 1
+                while original[(i + distance) % k] is None:
+                    distance += 1
+                bins[i] = (original[(i + distance) % k], distance)
+    return tuple(bins)
+
+
+def jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def candidate_pairs(cases, bands=BANDS):
+    """Pairs of case indexes sharing at least one LSH band; returns ``(pairs, skipped buckets)``."""
+    rows = PERMUTATIONS // bands
+    pairs = set()
+    skipped = 0
+    for band in range(bands):
+        buckets = defaultdict(list)
+        lo = band * rows
+        for index, case in enumerate(cases):
+            buckets[case.signature[lo:lo + rows]].append(index)
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            if len(members) > MAX_BUCKET:
+                skipped += 1
+                continue
+            for i, a in enumerate(members):
+                for b in members[i + 1:]:
+                    pairs.add((a, b))
+    return pairs, skipped
+
+
+class _Sets:
+    def __init__(self, n):
+        self.parent = list(range(n))
+
+    def find(self, i):
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+PRIORITY_ORDER = {'high': 0, 'medium': 1, 'low': 2}
+
+
+def duplicate_clusters(cases, threshold=THRESHOLD, cost=None):
+    """Group near-duplicate cases; returns ``(clusters, stats)``, costliest cluster first.
+
+    Clusters are over entries, i.e. ``(category, description)`` with all of
+    its expansion variants, so a cluster holding a single entry is a variant
+    cluster and is only counted. ``cost(case)`` is the price of running a
+    case once (default: its step count).
+    """
+    cost = cost or (lambda case: len(case.steps))
+    identical = defaultdict(list)
+    for case in cases:
+        identical[case.shingles].append(case)
+    groups = list(identical.values())
+    for group in groups:
+        group[0].signature = signature(group[0].shingles)
+    reps = [group[0] for group in groups]
+    pairs, skipped = candidate_pairs(reps)
+    sets = _Sets(len(reps))
+    confirmed = []
+    for a, b in pairs:
+        score = jaccard(reps[a].shingles, reps[b].shingles)
+        if score >= threshold:
+            sets.union(a, b)
+            confirmed.append((a, score))
+    # Filed by final root only once every union is done, so merged components keep all their scores.
+    scores = defaultdict(list)
+    for a, score in confirmed:
+        scores[sets.find(a)].append(score)
+    merged = defaultdict(list)
+    for index in range(len(reps)):
+        merged[sets.find(index)].append(index)
+
+    clusters = []
+    variant_clusters = 0
+    for root, indexes in merged.items():
+        entries = defaultdict(list)
+        for index in indexes:
+            for case in groups[index]:
+                entries[(case.category, case.description)].append(case)
+        if len(entries) < 2:
+            variant_clusters += len(indexes) > 1 or len(groups[indexes[0]]) > 1
+            continue
+        keep = min(entries.values(), key=lambda members: min(
+            (PRIORITY_ORDER.get(c.priority, 3), c.id) for c in members))
+        dropped = [c for members in entries.values() if members is not keep for c in members]
+        # The weakest link: single-linkage merging can chain loosely related cases.
+        similarity = min(scores[root] or [1.0])
+        clusters.append({
+            'keep': min(c.id for c in keep),
+            'ids': sorted(c.id for c in dropped),
+            'descriptions': sorted(description for _, description in entries),
+            'similarity': round(similarity, 3),
+            'drop': similarity >= DROP_SIMILARITY,
+            'duplicate_cost': round(sum(cost(c) for c in dropped), 1),
+        })
+    clusters.sort(key=lambda c: (not c['drop'], -c['duplicate_cost'], c['keep']))
+    return clusters, {'distinct_cases': len(reps), 'candidate_pairs': len(pairs), 'skipped_buckets': skipped,
+                      'variant_clusters': variant_clusters}
+
+
+class StepIndex:
+    """Inverted index from runs of 1..``n`` consecutive normalised steps to case ids."""
+
+    def __init__(self, cases, n=SEQUENCE):
+        self.n = n
+        self.postings = defaultdict(list)
+        for case in cases:
+            seen = set()
+            for size in range(1, n + 1):
+                for i in range(len(case.steps) - size + 1):
+                    key = tuple(case.steps[i:i + size])
+                    if key not in seen:
+                        seen.add(key)
+                        self.postings[key].append(case.id)
+
+    def cases_with(self, *steps):
+        """Ids of the cases containing ``steps`` consecutively (raw or normalised text)."""
+        key = tuple(normalize_step(s) for s in steps)
+        if len(key) <= self.n:
+            return list(self.postings.get(key, []))
+        raise ValueError(f'the index covers sequences of up to {self.n} steps')
+
+    def shared(self, min_cases=5, size=None, top=20):
+        """The sequences found in the most cases, longest first among equal counts."""
+        found = [(key, ids) for key, ids in self.postings.items()
+                 if len(ids) >= min_cases and (size is None or len(key) == size)]
+        found.sort(key=lambda item: (-len(item[1]), -len(item[0]), item[0]))
+        return found[:top]
+
+
+def server_routes(root):
+    """``[(method, path, source)]`` for every Express route, in registration order."""
+    server = os.path.join(root, 'server', 'src', 'server.ts')
+    with open(server, encoding='utf-8') as f:
+        text = f.read()
+    modules = dict(ROUTE_IMPORT_RE.findall(text))
+    routes = []
+    for match in INLINE_RE.finditer(text):
+        method = 'GET' if match.group(1) == 'use' else match.group(1).upper()
+        routes.append((method, match.group(2), f'server/src/server.ts:{text.count(chr(10), 0, match.start()) + 1}'))
+    for prefix, name in MOUNT_RE.findall(text):
+        if name not in modules:
+            continue
+        source = f'server/src/routes/{modules[name]}.ts'
+        try:
+            with open(os.path.join(root, source), encoding='utf-8') as f:
+                module = f.read()
+        except FileNotFoundError:
+            continue
+        for match in ROUTE_RE.finditer(module):
+            sub = match.group(2)
+            path = prefix.rstrip('/') + ('' if sub == '/' else sub) or '/'
+            routes.append((match.group(1).upper(), path, f'{source}:{module.count(chr(10), 0, match.start()) + 1}'))
+    return routes
+
+
+def case_requests(feature):
+    """``{(method, path)}`` of the API requests a case issues, explicitly or through its pages."""
+    requests = set()
+
+    def add(spec):
+        method, _, target = spec.partition(' ')
+        requests.add((method.upper(), target.split('?', 1)[0]))
+
+    for spec in (feature.get('perf_budget') or {}).get('requests', []):
+        add(spec)
+    page = ''
+    for step in case_steps(feature):
+        match = REQUEST_STEP_RE.match(step)
+        if match:
+            add(f'{match.group(1)} {match.group(2)}')
+            continue
+        match = PAGE_RE.match(step)
+        if match:
+            page = match.group(1)
+            path = NAVIGATE_RE.match(step)
+            for spec in PAGE_ENDPOINTS.get(path.group(1).rstrip('/') or '/', []) if path else ():
+                add(spec)
+            continue
+        for page_pattern, pattern, specs in PAGE_ACTIONS:
+            on_page = page_pattern.search(page)
+            if on_page and pattern.search(step):
+                for spec in specs:
+                    add(spec.format(*on_page.groups()))
+        for pattern, specs in STEP_ENDPOINTS:
+            if pattern.search(step):
+                for spec in specs:
+                    add(spec)
+    return requests
+
+
+def _segments_match(route, path):
+    return len(route) == len(path) and all(
+        r == p or r.startswith(':') or p.startswith(':') for r, p in zip(route, path))
+
+
+def endpoint_coverage(features, routes):
+    """Return ``(cases per route, requests matching no route)``.
+
+    A request counts towards the first route that matches it, as in Express.
+    """
+    split = [(method, path, path.strip('/').split('/')) for method, path, _ in routes]
+    hits = {(method, path): set() for method, path, _ in routes}
+    unknown = defaultdict(set)
+    resolved = {}
+    for feature in features:
+        for method, path in case_requests(feature):
+            key = (method, path)
+            if key not in resolved:
+                segments = path.strip('/').split('/')
+                resolved[key] = next(((m, p) for m, p, s in split if m == method and _segments_match(s, segments)),
+                                     None)
+            route = resolved[key]
+            if route is None:
+                unknown[f'{method} {path}'].add(feature['id'])
+            else:
+                hits[route].add(feature['id'])
+    return hits, unknown
+
+
+MUTATING = ('POST', 'PUT', 'DELETE', 'PATCH')
+
+
+def analyse(catalogue, root=None, threshold=THRESHOLD, durations=None):
+    """Run all three analyses over ``catalogue``; returns a JSON-serialisable report."""
+    started = time.perf_counter()
+    root = root or os.path.dirname(os.path.abspath(catalogue))
+    features = list(iter_features(catalogue))
+    cases = [Case(f) for f in features]
+    durations = durations or {}
+    cost = (lambda case: durations.get(case.id, 0.0)) if durations else None
+    clusters, lsh = duplicate_clusters(cases, threshold, cost)
+    index = StepIndex(cases)
+    routes = server_routes(root)
+    hits, unknown = endpoint_coverage(features, routes)
+    sources = {(m, p): s for m, p, s in routes}
+    untouched = sorted((key for key, ids in hits.items() if not ids),
+                       key=lambda key: (key[0] not in MUTATING, key[1], key[0]))
+    return {
+        'cases': len(cases),
+        'elapsed_s': round(time.perf_counter() - started, 3),
+        'cost_unit': 'ms' if durations else 'steps',
+        'duplicates': clusters,
+        'duplicate_cost': round(sum(c['duplicate_cost'] for c in clusters if c['drop']), 1),
+        'lsh': lsh,
+        'shared_steps': [{'steps': list(key), 'cases': len(ids)} for key, ids in index.shared()],
+        'routes': len(routes),
+        'untouched_endpoints': [{'endpoint': f'{m} {p}', 'source': sources[(m, p)]} for m, p in untouched],
+        'thin_endpoints': sorted(f'{m} {p}' for (m, p), ids in hits.items() if len(ids) == 1),
+        'unknown_requests': {spec: sorted(ids) for spec, ids in sorted(unknown.items())},
+    }
+
+
+def format_report(report, top=15):
+    unit = report['cost_unit']
+    lines = [f"{report['cases']} cases analysed in {report['elapsed_s']:.2f}s",
+             f"\nNear-duplicate clusters: {len(report['duplicates'])} "
+             f"(duplicate cost {report['duplicate_cost']} {unit}; "
+             f"{report['lsh']['variant_clusters']} expansion-variant clusters not listed)"]
+    for cluster in report['duplicates'][:top]:
+        ids = ', '.join(f'#{i}' for i in cluster['ids'][:8]) + (' ...' if len(cluster['ids']) > 8 else '')
+        if cluster['drop']:
+            lines.append(f"  keep #{cluster['keep']}, drop {ids} "
+                         f"(similarity {cluster['similarity']:.2f}, {cluster['duplicate_cost']} {unit})")
+        else:
+            lines.append(f"  review #{cluster['keep']} against {ids} "
+                         f"(similarity {cluster['similarity']:.2f}, below {DROP_SIMILARITY}: not a drop)")
+        lines += [f'      {d}' for d in cluster['descriptions'][:4]]
+    lines.append('\nMost shared step sequences:')
+    lines += [f"  {entry['cases']:5d} cases  {' -> '.join(entry['steps'])}" for entry in report['shared_steps'][:top]]
+    lines.append(f"\nEndpoints no case touches: {len(report['untouched_endpoints'])} of {report['routes']}")
+    lines += [f"  {entry['endpoint']:<48} {entry['source']}" for entry in report['untouched_endpoints']]
+    if report['unknown_requests']:
+        lines.append('\nRequests matching no server route:')
+        lines += [f"  {spec:<48} cases {ids[:8]}{' ...' if len(ids) > 8 else ''}"
+                  for spec, ids in report['unknown_requests'].items()]
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find near-duplicate cases and server endpoints no case touches.")
+    parser.add_argument('--catalogue', default='feature_list.json')
+    parser.add_argument('--root', help="repository root (default: the catalogue's directory)")
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help="Jaccard similarity that makes two cases duplicates (default: %(default)s)")
+    parser.add_argument('--history', action='store_true',
+                        help="cost duplicates by mean runtime from the run history instead of step count")
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--json', dest='json_out', help="write the full report to this file")
+    args = parser.parse_args(argv)
+
+    durations = None
+    if args.history:
+        from .history import RunHistory
+        durations = {fid: s.mean_ms for fid, s in RunHistory.for_catalogue(args.catalogue).stats().items()
+                     if s.mean_ms is not None}
+    report = analyse(args.catalogue, args.root, args.threshold, durations)
+    if args.json_out:
+        with open(args.json_out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    print(format_report(report, args.top))
+
+
+if __name__ == '__main__':
+    main()
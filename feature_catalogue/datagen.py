@@ -0,0 +1,271 @@
+"""Deterministic, chunked synthetic data for load-sized catalogue runs.
+
+Streams customers, users, predictions and bonus answers shaped like the
+``server/`` tables (snake_case columns, as Sequelize's ``underscored``
+option maps them) at any scale, holding one chunk of users in memory at a
+time. Every chunk draws from its own RNG seeded by ``(seed, chunk)``, so
+output is reproducible and independent of the chunk being generated
+first. The data model has no departments; customers (companies) are what
+group users on the department-style leaderboards, so they play that role.
+
+Predictions and bonus answers refer to matches by ``match_number`` and to
+bonus questions by ``question_type``, since the UUIDs of seeded rows are
+not known up front. The SQL writer resolves both (and the ``internal``
+event) with joins at insert time.
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import random
+from datetime import datetime, timezone
+
+from .scoring import match_stages
+
+# bcrypt hash of PASSWORD, so generated users can log in.
+PASSWORD = 'password123'
+PASSWORD_HASH = '$2b$10$abcdefghijklmnopqrstuu0SYq8twpcthS10uxQ26rv0s3Obj8Ufu'
+
+EVENT_CODE = 'internal'
+CUSTOMER_PREFIX = 'C1234'
+# Opening match of the 2026 tournament; predictions lock at kickoff.
+PREDICTION_DEADLINE = datetime(2026, 6, 11, 19, 0, tzinfo=timezone.utc)
+REGISTRATION_OPENS = datetime(2026, 4, 1, tzinfo=timezone.utc)
+
+BONUS_QUESTION_TYPES = ('champion', 'top_scorer', 'total_goals', 'highest_scoring_team', 'most_yellow_cards')
+TEAMS = (
+    'Argentina', 'Brazil', 'France', 'England', 'Spain', 'Germany', 'Netherlands', 'Portugal',
+    'Belgium', 'Croatia', 'Uruguay', 'Morocco', 'Japan', 'USA', 'Mexico', 'Canada',
+)
+PLAYERS = ('Mbappe', 'Kane', 'Haaland', 'Messi', 'Vinicius Jr', 'Lautaro Martinez', 'Gakpo', 'Musiala')
+FIRST_NAMES = ('Anna', 'Bram', 'Chloe', 'Daan', 'Emma', 'Finn', 'Julia', 'Lars', 'Maria', 'Noah', 'Sara', 'Thijs')
+LAST_NAMES = ('de Vries', 'Jansen', 'Bakker', 'Visser', 'Smit', 'Meijer', 'Mulder', 'Bos', 'Peters', 'Hendriks')
+LANGUAGES = ('en', 'en', 'nl')
+
+COLUMNS = {
+    'customers': ('id', 'customer_number', 'company_name', 'is_active', 'created_at', 'updated_at'),
+    'users': ('id', 'email', 'username', 'password_hash', 'first_name', 'last_name', 'customer_number',
+              'role', 'is_email_verified', 'language_preference', 'created_at', 'updated_at'),
+    'predictions': ('id', 'user_id', 'match_number', 'home_score', 'away_score', 'created_at', 'updated_at'),
+    'bonus_answers': ('id', 'user_id', 'question_type', 'answer', 'created_at', 'updated_at'),
+}
+
+
+def _uuid(rng):
+    # Version-4 layout without building uuid.UUID objects, which dominate at scale.
+    h = '%032x' % ((rng.getrandbits(128) & ~(0xf000 << 64 | 0xc000 << 48)) | (0x4000 << 64 | 0x8000 << 48))
+    return f'{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}'
+
+
+# Goals per side, drawn by indexing a 64-slot table shaped like a Poisson(1.2).
+_GOALS = [0] * 19 + [1] * 23 + [2] * 14 + [3] * 5 + [4] * 2 + [5]
+
+_MINUTES = {}
+
+
+def _timestamp(epoch):
+    """Format a UTC epoch second as ISO 8601, caching everything up to the minute."""
+    minute, second = divmod(int(epoch), 60)
+    prefix = _MINUTES.get(minute)
+    if prefix is None:
+        prefix = _MINUTES[minute] = datetime.fromtimestamp(minute * 60, timezone.utc).strftime('%Y-%m-%dT%H:%M:')
+    return f'{prefix}{second:02d}Z'
+
+
+def customer_number(index):
+    return f'{CUSTOMER_PREFIX}_{index + 1000:07d}'
+
+
+def user_email(index):
+    return f'user{index:07d}@loadtest.wk2026.com'
+
+
+def generate(users, seed=0, chunk_size=10_000, customers=None, coverage=0.8):
+    """Yield ``(table, rows)`` batches; rows are tuples in ``COLUMNS`` order.
+
+    All customers come first, then for each chunk of users the users, their
+    predictions and their bonus answers. Every row draws from an RNG seeded
+    by ``seed`` and its own index, so the data does not depend on
+    ``chunk_size``. Users are spread over ``customers`` companies (default
+    one per 25 users); prediction times bunch up towards the deadline the
+    way kickoff-day traffic does.
+    """
+    customers = customers or max(1, users // 25)
+    matches = len(match_stages())
+    opens = REGISTRATION_OPENS.timestamp()
+    deadline = PREDICTION_DEADLINE.timestamp()
+
+    created = _timestamp(opens)
+    for start in range(0, customers, chunk_size):
+        rows = []
+        for i in range(start, min(start + chunk_size, customers)):
+            rng = random.Random(f'{seed}:customer:{i}')
+            rows.append((_uuid(rng), customer_number(i), f'Customer {i + 1}', rng.random() > 0.02, created, created))
+        yield 'customers', rows
+
+    for start in range(0, users, chunk_size):
+        user_rows, prediction_rows, answer_rows = [], [], []
+        for i in range(start, min(start + chunk_size, users)):
+            rng = random.Random(f'{seed}:user:{i}')
+            user_id = _uuid(rng)
+            registered = opens + int(rng.random() * (deadline - opens) * 0.9)
+            stamp = _timestamp(registered)
+            user_rows.append((
+                user_id, user_email(i), f'load{i:07d}', PASSWORD_HASH,
+                rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES), customer_number(rng.randrange(customers)),
+                'user', True, rng.choice(LANGUAGES), stamp, stamp,
+            ))
+            span = deadline - registered
+            share = min(max(rng.gauss(coverage, 0.2), 0.0), 1.0)
+            for match_number in range(1, matches + 1):
+                if rng.random() >= share:
+                    continue
+                # Exponential lead time: most predictions land in the last days.
+                lead = min(-math.log(1.0 - rng.random()) * 2 * 86400, span)
+                made = _timestamp(deadline - lead)
+                prediction_rows.append((_uuid(rng), user_id, match_number,
+                                        _GOALS[int(rng.random() * 64)], _GOALS[int(rng.random() * 64)], made, made))
+            for question in BONUS_QUESTION_TYPES:
+                if rng.random() < 0.6:
+                    continue
+                if question == 'top_scorer':
+                    answer = rng.choice(PLAYERS)
+                elif question == 'total_goals':
+                    answer = str(rng.randint(140, 200))
+                else:
+                    answer = rng.choice(TEAMS)
+                answer_rows.append((_uuid(rng), user_id, question, answer, stamp, stamp))
+        yield 'users', user_rows
+        yield 'predictions', prediction_rows
+        yield 'bonus_answers', answer_rows
+
+
+class CsvWriter:
+    extension = '.csv'
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._files = {}
+
+    def _open(self, table):
+        if table not in self._files:
+            f = open(os.path.join(self.directory, table + self.extension), 'w', newline='', encoding='utf-8')
+            self._files[table] = (f, self._start(f, table))
+        return self._files[table][1]
+
+    def _start(self, f, table):
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS[table])
+        return writer
+
+    def write(self, table, rows):
+        self._open(table).writerows(rows)
+
+    def close(self):
+        for f, _ in self._files.values():
+            f.close()
+
+
+class NdjsonWriter(CsvWriter):
+    extension = '.ndjson'
+
+    def _start(self, f, table):
+        columns = COLUMNS[table]
+        return lambda rows: f.writelines(json.dumps(dict(zip(columns, row))) + '\n' for row in rows)
+
+    def write(self, table, rows):
+        self._open(table)(rows)
+
+
+def _sql_literal(value):
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, int):
+        return str(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+# Values selected from a VALUES list arrive as text and need explicit casts.
+USER_CASTS = {'id': '::uuid', 'role': '::enum_users_role',
+              'created_at': '::timestamptz', 'updated_at': '::timestamptz'}
+
+
+class SqlWriter:
+    """Multi-row INSERTs for PostgreSQL, one statement per chunk, in one transaction."""
+
+    def __init__(self, directory):
+        self.f = open(os.path.join(directory, 'fixtures.sql'), 'w', encoding='utf-8')
+        self.f.write('BEGIN;\n')
+
+    def write(self, table, rows):
+        if not rows:
+            return
+        columns = COLUMNS[table]
+        values = ',\n'.join('(' + ', '.join(_sql_literal(v) for v in row) + ')' for row in rows)
+        event = f"(SELECT id FROM events WHERE code = '{EVENT_CODE}')"
+        if table == 'customers':
+            self.f.write(f"INSERT INTO customers ({', '.join(columns)}) VALUES\n{values};\n")
+        elif table == 'users':
+            selected = ', '.join(f'v.{c}{USER_CASTS.get(c, "")}' for c in columns)
+            self.f.write(
+                f"INSERT INTO users (event_id, {', '.join(columns)})\n"
+                f"SELECT {event}, {selected}\nFROM (VALUES\n{values}\n) AS v ({', '.join(columns)});\n")
+        elif table == 'predictions':
+            self.f.write(
+                "INSERT INTO predictions (id, event_id, user_id, match_id, home_score, away_score, created_at, updated_at)\n"
+                f"SELECT v.id::uuid, {event}, v.user_id::uuid, m.id, v.home_score, v.away_score, "
+                "v.created_at::timestamptz, v.updated_at::timestamptz\n"
+                f"FROM (VALUES\n{values}\n) AS v ({', '.join(columns)})\n"
+                "JOIN matches m ON m.match_number = v.match_number;\n")
+        elif table == 'bonus_answers':
+            self.f.write(
+                "INSERT INTO bonus_answers (id, event_id, user_id, bonus_question_id, answer, created_at, updated_at)\n"
+                f"SELECT v.id::uuid, q.event_id, v.user_id::uuid, q.id, v.answer, "
+                "v.created_at::timestamptz, v.updated_at::timestamptz\n"
+                f"FROM (VALUES\n{values}\n) AS v ({', '.join(columns)})\n"
+                f"JOIN bonus_questions q ON q.question_type = v.question_type AND q.event_id = {event};\n")
+
+    def close(self):
+        self.f.write('COMMIT;\n')
+        self.f.close()
+
+
+WRITERS = {'csv': CsvWriter, 'ndjson': NdjsonWriter, 'sql': SqlWriter}
+
+
+def write_fixtures(directory, users, fmt='csv', seed=0, chunk_size=10_000, customers=None, coverage=0.8):
+    """Write generated data to ``directory``; returns row counts per table."""
+    os.makedirs(directory, exist_ok=True)
+    writer = WRITERS[fmt](directory)
+    counts = {}
+    try:
+        for table, rows in generate(users, seed, chunk_size, customers, coverage):
+            writer.write(table, rows)
+            counts[table] = counts.get(table, 0) + len(rows)
+    finally:
+        writer.close()
+    return counts
+
+
+def add_arguments(parser):
+    parser.add_argument('--users', type=int, default=10_000)
+    parser.add_argument('--customers', type=int, help="number of customers (default: one per 25 users)")
+    parser.add_argument('--format', choices=sorted(WRITERS), default='csv')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunk-size', type=int, default=10_000, help="users held in memory at a time")
+    parser.add_argument('--coverage', type=float, default=0.8, help="mean share of matches each user predicts")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate load-sized fixture data for the catalogue cases.")
+    parser.add_argument('directory')
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    counts = write_fixtures(args.directory, args.users, args.format, args.seed, args.chunk_size,
+                            args.customers, args.coverage)
+    print(f"Wrote {', '.join(f'{n} {table}' for table, n in counts.items())} to {args.directory}")
+
+
+if __name__ == '__main__':
+    main()
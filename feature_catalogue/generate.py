@@ -0,0 +1,202 @@
+"""Build ``feature_list.json`` from the category definitions.
+
+``python -m feature_catalogue generate`` and ``generate_features.py`` both
+run :func:`main`. A plain run writes the whole catalogue; ``--incremental``
+re-emits only categories whose content hash changed, ``--expand`` fans
+every case out over events, locales and viewports on a process pool, and
+``--data`` writes load-sized fixture data instead.
+"""
+import argparse
+import json
+
+from . import datagen, model, sources
+from .definitions import CATEGORIES, CATEGORY_AXES, CATEGORY_SOURCES, SHARED_SOURCES
+from .stream import sidecar_is_fresh, write_catalogue
+
+OUTPUT_PATH = 'feature_list.json'
+
+
+def builtin_sources():
+    return sources.from_definitions(CATEGORIES, CATEGORY_SOURCES, CATEGORY_AXES, 'feature_catalogue.definitions')
+
+
+def emit_category(name, entries, next_id, previous=None):
+    """Build the feature dicts for one category.
+
+    Entries whose description is found in ``previous`` keep their id and
+    ``passes`` state; new entries are numbered from ``next_id`` upwards. An
+    entry may carry a fourth element, a dict of optional fields such as
+    ``perf_budget``, which is copied onto the feature.
+    """
+    previous = dict(previous or {})
+    emitted = []
+    for desc, priority, steps, *extra in entries:
+        old = previous.pop(desc, None)
+        if old is not None:
+            fid, passes = old["id"], old.get("passes", False)
+        else:
+            fid, passes = next_id, False
+            next_id += 1
+        feature = {
+            "id": fid,
+            "category": name,
+            "description": desc,
+            "priority": priority,
+            "test_steps": steps,
+        }
+        if extra:
+            feature.update(extra[0])
+        feature["passes"] = passes
+        emitted.append(feature)
+    return emitted, next_id
+
+
+def load_existing(path):
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    # The legacy bare-list shape carries no category hashes, so every category is
+    # re-emitted; features whose description survives keep their id and passes.
+    if isinstance(data, list):
+        return {"features": [model.normalize_feature(f) for f in data]}
+    if not isinstance(data, dict) or not isinstance(data.get("features"), list):
+        return None
+    return data
+
+
+def _document(features, counts, hashes, category_sources, **extra):
+    return {
+        "project": "World Cup 2026 Prediction Game",
+        "version": "1.0.0",
+        "total_features": len(features),
+        "last_updated": "2026-01-21",
+        "categories": counts,
+        "category_hashes": hashes,
+        "category_sources": category_sources,
+        "shared_sources": SHARED_SOURCES,
+        **extra,
+        "features": features
+    }
+
+
+def build_expanded(categories, axes, jobs=None, id_block=10000, previous=None, blocks=None, entries_block=100):
+    """Expand ``categories`` over ``axes`` on a process pool; returns the output document.
+
+    Features arrive pre-rendered (see ``feature_catalogue.sources.expand``).
+    """
+    header, features = sources.expand(categories, axes, jobs, id_block, previous, blocks, entries_block)
+    return _document(features, header["categories"], header["category_hashes"], header["category_sources"],
+                     expansion=header["expansion"])
+
+
+def build_output(existing=None, categories=None):
+    """Return ``(output, changed, removed)`` for the current category definitions.
+
+    ``categories`` is a list of :class:`feature_catalogue.sources.CategorySource`
+    (default: the built-in definitions). With ``existing`` set, categories
+    whose hash matches the stored one are copied through untouched and only
+    the others are re-emitted.
+    """
+    categories = builtin_sources() if categories is None else categories
+    old_hashes = {}
+    old_by_category = {}
+    next_id = 1
+    if existing is not None:
+        old_hashes = existing.get("category_hashes", {})
+        for feature in existing["features"]:
+            old_by_category.setdefault(feature["category"], []).append(feature)
+        next_id = max((f["id"] for f in existing["features"]), default=0) + 1
+
+    features = []
+    hashes = {}
+    changed = []
+    for category in categories:
+        name = category.name
+        digest = category.digest()
+        hashes[name] = digest
+        old = old_by_category.get(name)
+        if old is not None and old_hashes.get(name) == digest:
+            features.extend(old)
+            continue
+        previous = {f["description"]: f for f in old or []}
+        emitted, next_id = emit_category(name, category.entries, next_id, previous)
+        features.extend(emitted)
+        changed.append(name)
+    removed = [name for name in old_by_category if name not in hashes]
+
+    output = _document(features, {c.name: len(c.entries) for c in categories}, hashes,
+                       {c.name: c.sources for c in categories})
+    return output, changed, removed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate feature_list.json from the category definitions.")
+    parser.add_argument('--output', default=OUTPUT_PATH, help="catalogue path (default: %(default)s)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="only re-emit categories whose definition changed, keeping ids and passes state")
+    parser.add_argument('--no-sidecar', action='store_true',
+                        help="do not write the NDJSON sidecar next to the catalogue")
+    parser.add_argument('--source', action='append', default=[], metavar='SPEC',
+                        help="extra category source: module, .py or YAML file, or directory (repeatable)")
+    expansion = parser.add_argument_group("expansion", "multiply every case across events, locales and viewports")
+    expansion.add_argument('--expand', action='append', default=[], metavar='AXIS[=V,...]',
+                           help="expand over an axis: event=CODE,..., locale[=en,nl], viewport[=mobile,...]")
+    expansion.add_argument('--jobs', type=int, default=None, help="worker processes (default: CPU count)")
+    expansion.add_argument('--id-block', type=int, default=10000,
+                           help="ids reserved per category (default: %(default)s)")
+    expansion.add_argument('--entries-block', type=int, default=100,
+                           help="ids reserved per variant inside a category, so appended entries keep "
+                                "existing ids stable (default: %(default)s)")
+    data = parser.add_argument_group("data-fixture mode", "generate load-sized users, predictions and bonus answers")
+    data.add_argument('--data', metavar='DIR', help="write synthetic fixture data to DIR instead of the catalogue")
+    datagen.add_arguments(data)
+    args = parser.parse_args(argv)
+
+    if args.data:
+        counts = datagen.write_fixtures(args.data, args.users, args.format, args.seed, args.chunk_size,
+                                        args.customers, args.coverage)
+        print(f"✅ Wrote {', '.join(f'{n} {table}' for table, n in counts.items())} to {args.data}")
+        return
+
+    try:
+        categories = builtin_sources() + sources.load_sources(args.source)
+        axes = sources.parse_axes(args.expand)
+    except (ValueError, RuntimeError) as exc:
+        raise SystemExit(f"❌ {exc}") from None
+
+    if axes:
+        try:
+            output = build_expanded(categories, axes, args.jobs, args.id_block, sources.passing(args.output),
+                                    sources.id_blocks(args.output, args.id_block), args.entries_block)
+        except ValueError as exc:
+            raise SystemExit(f"❌ {exc}") from None
+        write_catalogue(args.output, output, sidecar=not args.no_sidecar)
+        print(f"✅ Generated {args.output} with {output['total_features']} test cases "
+              f"across {', '.join(axes)}")
+        return
+
+    existing = load_existing(args.output) if args.incremental else None
+    output, changed, removed = build_output(existing, categories)
+
+    sidecar_stale = not args.no_sidecar and not sidecar_is_fresh(args.output)
+    header_changed = existing is not None and any(
+        existing.get(key) != value for key, value in output.items() if key != "features")
+    if existing is not None and not changed and not removed and not header_changed and not sidecar_stale:
+        print(f"✅ {args.output} is up to date ({output['total_features']} test cases)")
+        return
+
+    try:
+        write_catalogue(args.output, output, sidecar=not args.no_sidecar)
+    except model.CatalogueError as exc:
+        raise SystemExit(f"❌ Catalogue does not match the schema: {exc}") from None
+    if existing is None:
+        print(f"✅ Generated {args.output} with {output['total_features']} test cases")
+    else:
+        print(f"✅ Updated {args.output} with {output['total_features']} test cases "
+              f"(re-emitted: {', '.join(changed) or 'none'}; removed: {', '.join(removed) or 'none'})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,329 @@
+"""Append-only run history, flakiness statistics and a re-run policy.
+
+``passes`` in the catalogue only says how the last run went. The history
+log (``feature_list.history.gz`` next to the catalogue) keeps every run:
+each run appends one gzip member holding an NDJSON header line with the
+run's environment, followed by one ``[id, status, duration_ms, attempt]``
+row per attempt. Gzip readers treat concatenated members as one stream,
+and a member is written with a single ``O_APPEND`` write, so the log is
+never rewritten. A member left incomplete by a killed run or a short
+write is skipped once a later member follows it; while it is the last
+thing in the log, reading stops in front of it.
+
+Per-feature statistics (:class:`FeatureStats`) are folded in run by run
+and cached in ``feature_list.history.json`` together with the log offset
+they cover, so refreshing them only decompresses the runs appended since.
+The cache is disposable; it is rebuilt when the log shrinks or is
+replaced.
+
+The policy built on top (:meth:`RunHistory.order`) runs suspects first,
+most likely to fail first, so a broken push fails fast, and the rest
+slowest first, so long cases don't end up alone on the last worker.
+Only features classified ``flaky`` get retries
+(:meth:`RunHistory.retries`).
+"""
+import argparse
+import gzip
+import json
+import os
+import platform
+import subprocess
+import time
+import zlib
+from dataclasses import astuple, dataclass
+
+from .steps import ERROR, FAILED, PASSED
+from .stream import atomic_writer, iter_features
+
+HISTORY_SUFFIX = '.history.gz'
+STATS_SUFFIX = '.history.json'
+STATS_VERSION = 1
+
+# Outcomes of the last WINDOW runs drive the classification: P passed on
+# the first attempt, R passed on a retry, F failed every attempt.
+WINDOW = 20
+ALPHA = 0.3           # weight of the newest run in the moving averages
+SUSPECT = 0.2         # first-attempt failure probability that makes a case a suspect
+NEW_FAILING_PRIOR = 0.5
+NEW_PASSING_PRIOR = 0.1
+
+STATUS_CODES = {PASSED: 'P', FAILED: 'F', ERROR: 'E'}
+GZIP_MAGIC = b'\x1f\x8b\x08'
+READ_CHUNK = 1 << 16
+
+
+def history_path(catalogue_path):
+    return os.path.splitext(catalogue_path)[0] + HISTORY_SUFFIX
+
+
+def stats_path(catalogue_path):
+    return os.path.splitext(catalogue_path)[0] + STATS_SUFFIX
+
+
+def environment(**extra):
+    """Describe where a run happened: host, Python, git revision plus ``extra``."""
+    env = {'host': platform.node(), 'python': platform.python_version()}
+    try:
+        env['git'] = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                    text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    env.update(extra)
+    return env
+
+
+@dataclass(slots=True)
+class FeatureStats:
+    runs: int = 0
+    failures: int = 0
+    recent: str = ''
+    fail_rate: float = None
+    mean_ms: float = None
+    var_ms: float = 0.0
+    max_ms: float = 0.0
+    last_run: int = 0
+
+    def add_run(self, outcome, durations, run):
+        """Fold in one run: its ``P``/``R``/``F`` outcome and its attempt durations."""
+        self.runs += 1
+        self.failures += outcome == 'F'
+        self.recent = (self.recent + outcome)[-WINDOW:]
+        failed_first = 0.0 if outcome == 'P' else 1.0
+        self.fail_rate = failed_first if self.fail_rate is None else \
+            self.fail_rate + ALPHA * (failed_first - self.fail_rate)
+        for ms in durations:
+            if self.mean_ms is None:
+                self.mean_ms = ms
+            else:
+                # Exponentially weighted mean and variance (West, 1979).
+                diff = ms - self.mean_ms
+                step = ALPHA * diff
+                self.mean_ms += step
+                self.var_ms = (1 - ALPHA) * (self.var_ms + diff * step)
+            self.max_ms = max(self.max_ms, ms)
+        self.last_run = run
+
+    @property
+    def flips(self):
+        """Pass/fail transitions between consecutive runs in the window."""
+        verdicts = self.recent.replace('R', 'P')
+        return sum(a != b for a, b in zip(verdicts, verdicts[1:]))
+
+    @property
+    def flakiness(self):
+        """Share of windowed runs that flipped or only passed on a retry, 0..1."""
+        if len(self.recent) < 2:
+            return float('R' in self.recent)
+        return min(1.0, (self.flips + self.recent.count('R')) / (len(self.recent) - 1))
+
+    @property
+    def classification(self):
+        if not self.recent:
+            return 'new'
+        if 'R' in self.recent or self.flips >= 2:
+            return 'flaky'
+        if self.flips == 1:
+            return 'regressed' if self.recent.endswith('F') else 'fixed'
+        return 'failing' if self.recent[0] == 'F' else 'stable'
+
+
+class RunHistory:
+    """The run-history log of one catalogue and the statistics derived from it."""
+
+    def __init__(self, path, stats_file=None):
+        self.path = path
+        self.stats_file = stats_file or os.path.splitext(path)[0] + '.json'
+        self._stats = None
+
+    @classmethod
+    def for_catalogue(cls, catalogue_path):
+        return cls(history_path(catalogue_path), stats_path(catalogue_path))
+
+    def append(self, results, env=None, started=None):
+        """Append one run; ``results`` are ``FeatureResult`` objects, retries included.
+
+        Unsupported results carry no outcome and are not recorded.
+        """
+        rows = [[r.id, STATUS_CODES[r.status], round(r.duration * 1000, 1), getattr(r, 'attempts', 1)]
+                for r in results if r.status in STATUS_CODES]
+        header = {'run': time.time() if started is None else started, 'env': env or {}}
+        lines = [json.dumps(header, sort_keys=True)] + [json.dumps(row, separators=(',', ':')) for row in rows]
+        member = gzip.compress(('\n'.join(lines) + '\n').encode('utf-8'), compresslevel=9)
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, member)
+        finally:
+            os.close(fd)
+        return len(rows)
+
+    def _members(self, offset=0):
+        """Yield ``(end offset, text)`` for every complete gzip member at or after byte ``offset``."""
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(offset)
+                data = memoryview(f.read())
+        except FileNotFoundError:
+            return
+        pos = 0
+        while pos < len(data):
+            start, parts = pos, []
+            member = zlib.decompressobj(wbits=31)
+            try:
+                while not member.eof and pos < len(data):
+                    chunk = data[pos:pos + READ_CHUNK]
+                    parts.append(member.decompress(chunk))
+                    pos += len(chunk) - len(member.unused_data)
+                complete = member.eof
+            except zlib.error:
+                complete = False
+            if complete:
+                yield offset + pos, b''.join(parts).decode('utf-8')
+                continue
+            # Damaged member: resume at the next one, or stop in front of it if it is the last.
+            pos = bytes(data[start + 1:]).find(GZIP_MAGIC)
+            if pos < 0:
+                return
+            pos += start + 1
+
+    def _runs(self, offset=0):
+        for end, text in self._members(offset):
+            header, rows = None, []
+            for line in text.splitlines():
+                record = json.loads(line)
+                if isinstance(record, dict):
+                    if header is not None:
+                        yield end, header, rows
+                    header, rows = record, []
+                else:
+                    rows.append(record)
+            if header is not None:
+                yield end, header, rows
+
+    def runs(self, offset=0):
+        """Yield ``(header, rows)`` for every complete run stored at or after byte ``offset``."""
+        for _, header, rows in self._runs(offset):
+            yield header, rows
+
+    def _load_cache(self, identity):
+        try:
+            with open(self.stats_file, encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return 0, 0, {}
+        if cache.get('version') != STATS_VERSION or cache.get('log') != identity:
+            return 0, 0, {}
+        return cache['offset'], cache['runs'], {int(fid): FeatureStats(*values)
+                                                for fid, values in cache['features'].items()}
+
+    def stats(self, refresh=True):
+        """Return ``{feature_id: FeatureStats}``, folding in runs appended since the last call."""
+        if self._stats is not None and not refresh:
+            return self._stats
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            self._stats = {}
+            return self._stats
+        identity = [st.st_dev, st.st_ino]
+        offset, count, stats = self._load_cache(identity)
+        if offset > st.st_size:
+            offset, count, stats = 0, 0, {}
+        if offset < st.st_size:
+            # The cache records what was actually folded in, not the size seen before reading:
+            # a run appended meanwhile is folded in on the next refresh, exactly once.
+            consumed = offset
+            for consumed, _, rows in self._runs(offset):
+                count += 1
+                outcomes = {}
+                for fid, code, ms, attempt in rows:
+                    entry = outcomes.setdefault(fid, [None, None, []])
+                    if attempt == 1:
+                        entry[0] = code
+                    entry[1] = code
+                    entry[2].append(ms)
+                for fid, (first, last, durations) in outcomes.items():
+                    outcome = 'P' if first == 'P' else 'R' if last == 'P' else 'F'
+                    stats.setdefault(fid, FeatureStats()).add_run(outcome, durations, count)
+            with atomic_writer(self.stats_file) as f:
+                json.dump({'version': STATS_VERSION, 'log': identity, 'offset': consumed, 'runs': count,
+                           'features': {fid: astuple(s) for fid, s in stats.items()}}, f, separators=(',', ':'))
+        self._stats = stats
+        return stats
+
+    def failure_probability(self, feature):
+        """Chance that ``feature`` fails its first attempt, from history or the catalogue's ``passes``."""
+        stats = self.stats(refresh=False).get(feature['id'])
+        if stats is None or stats.fail_rate is None:
+            return NEW_PASSING_PRIOR if feature.get('passes') else NEW_FAILING_PRIOR
+        return stats.fail_rate
+
+    def order(self, features):
+        """Return ``features`` suspects first (likeliest to fail first), then slowest first."""
+        stats = self.stats(refresh=False)
+        known = sorted(s.mean_ms for s in stats.values() if s.mean_ms is not None)
+        typical = known[len(known) // 2] if known else 0.0
+
+        def duration(feature):
+            s = stats.get(feature['id'])
+            return s.mean_ms if s is not None and s.mean_ms is not None else typical
+
+        def key(feature):
+            p = self.failure_probability(feature)
+            if p >= SUSPECT:
+                return (0, -round(p, 2), -duration(feature), feature['id'])
+            return (1, 0, -duration(feature), feature['id'])
+
+        return sorted(features, key=key)
+
+    def retries(self, features, max_retries=2):
+        """``{feature_id: retries}`` for the features classified as flaky."""
+        stats = self.stats(refresh=False)
+        return {f['id']: max_retries for f in features
+                if f['id'] in stats and stats[f['id']].classification == 'flaky'}
+
+
+def _row(fid, stats):
+    std = stats.var_ms ** 0.5
+    mean = f'{stats.mean_ms:9.1f}' if stats.mean_ms is not None else f'{"-":>9}'
+    return (f'#{fid:<5} {stats.classification:<9} {stats.runs:5d} {stats.failures:5d} '
+            f'{stats.flakiness:6.2f} {stats.fail_rate:6.2f} {mean} {std:8.1f} {stats.max_ms:9.1f}  {stats.recent}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Flakiness and duration statistics from the run history.")
+    parser.add_argument('--catalogue', default='feature_list.json')
+    parser.add_argument('--history', help="run-history log (default: next to the catalogue)")
+    parser.add_argument('--only', choices=['new', 'stable', 'flaky', 'regressed', 'fixed', 'failing'],
+                        help="only list features with this classification")
+    parser.add_argument('--slowest', type=int, metavar='N', help="list the N slowest features")
+    parser.add_argument('--order', action='store_true', help="print the run order the policy would use")
+    args = parser.parse_args(argv)
+
+    history = RunHistory(args.history) if args.history else RunHistory.for_catalogue(args.catalogue)
+    stats = history.stats()
+    if args.order:
+        features = list(iter_features(args.catalogue))
+        retries = history.retries(features)
+        for feature in history.order(features):
+            fid = feature['id']
+            print(f"#{fid:<5} p(fail)={history.failure_probability(feature):.2f} "
+                  f"{'retry' if fid in retries else ''}")
+        return
+
+    selected = sorted(stats.items())
+    if args.only:
+        selected = [(fid, s) for fid, s in selected if s.classification == args.only]
+    if args.slowest:
+        selected = sorted(selected, key=lambda item: -(item[1].mean_ms or 0))[:args.slowest]
+    print(f"{'id':<6} {'class':<9} {'runs':>5} {'fails':>5} {'flaky':>6} {'p(f)':>6} "
+          f"{'mean ms':>9} {'std ms':>8} {'max ms':>9}  recent")
+    for fid, s in selected:
+        print(_row(fid, s))
+    counts = {}
+    for s in stats.values():
+        counts[s.classification] = counts.get(s.classification, 0) + 1
+    print(f"{len(stats)} features with history: {counts}")
+
+
+if __name__ == '__main__':
+    main()
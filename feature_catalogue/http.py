@@ -0,0 +1,243 @@
+"""Minimal HTTP/1.1 client and server on asyncio streams.
+
+The catalogue tooling only needs plain request/response calls against the
+``server/`` API, so this avoids pulling in an HTTP library: connections to
+the base URL are kept alive and reused, up to ``max_connections`` at once.
+:func:`start_server` is the matching bare-bones server for local stand-ins.
+"""
+import asyncio
+import json as jsonlib
+import ssl
+from urllib.parse import urlsplit
+
+from . import trace
+
+
+class HttpError(Exception):
+    pass
+
+
+class Response:
+    __slots__ = ('status', 'headers', 'body')
+
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    @property
+    def ok(self):
+        return self.status < 400
+
+    def json(self):
+        return jsonlib.loads(self.body) if self.body else None
+
+    def __repr__(self):
+        return f'<Response {self.status} ({len(self.body)} bytes)>'
+
+
+class HttpClient:
+    def __init__(self, base_url, max_connections=100, timeout=30.0, headers=None):
+        parts = urlsplit(base_url)
+        if parts.scheme not in ('http', 'https'):
+            raise ValueError(f'unsupported URL scheme: {base_url}')
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == 'https' else 80)
+        self.ssl = ssl.create_default_context() if parts.scheme == 'https' else None
+        self.prefix = parts.path.rstrip('/')
+        self.timeout = timeout
+        self.headers = dict(headers or {})
+        self._host_header = parts.netloc
+        self._idle = []
+        self._slots = asyncio.Semaphore(max_connections)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
+        for _, writer in idle:
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def _connect(self):
+        while self._idle:
+            reader, writer = self._idle.pop()
+            if not reader.at_eof() and not writer.is_closing():
+                return reader, writer, True
+            writer.close()
+        reader, writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+        return reader, writer, False
+
+    async def request(self, method, path, json=None, body=None, headers=None):
+        """Send one request and return a :class:`Response`.
+
+        A request on a reused keep-alive connection that the server already
+        closed is retried once on a fresh connection.
+        """
+        if json is not None:
+            body = jsonlib.dumps(json).encode('utf-8')
+        elif isinstance(body, str):
+            body = body.encode('utf-8')
+        merged = {'Host': self._host_header, 'Connection': 'keep-alive', **self.headers, **(headers or {})}
+        if json is not None:
+            merged.setdefault('Content-Type', 'application/json')
+        if body is not None:
+            merged['Content-Length'] = str(len(body))
+        head = f'{method} {self.prefix}{path} HTTP/1.1\r\n'
+        head += ''.join(f'{k}: {v}\r\n' for k, v in merged.items()) + '\r\n'
+        payload = head.encode('latin-1') + (body or b'')
+
+        with trace.span(f'{method} {path}', 'http') as call:
+            async with self._slots:
+                for attempt in range(2):
+                    with trace.span('connect', 'http') as connecting:
+                        reader, writer, reused = await self._connect()
+                        connecting.set('reused', reused)
+                    try:
+                        with trace.span('send', 'http'):
+                            writer.write(payload)
+                            await writer.drain()
+                        response, keep_alive = await asyncio.wait_for(
+                            self._read_response(reader, method), self.timeout)
+                    except (ConnectionError, asyncio.IncompleteReadError) as exc:
+                        writer.close()
+                        if reused and attempt == 0:
+                            continue
+                        raise HttpError(f'{method} {path}: {exc}') from exc
+                    except BaseException:
+                        writer.close()
+                        raise
+                    if keep_alive:
+                        self._idle.append((reader, writer))
+                    else:
+                        writer.close()
+                    call.set('status', response.status)
+                    return response
+
+    async def _read_response(self, reader, method):
+        with trace.span('wait', 'http') as waiting:
+            status_line = await reader.readuntil(b'\r\n')
+        with trace.span('read', 'http'):
+            response, keep_alive = await self._read_rest(reader, method, status_line)
+        if 'server-timing' in response.headers:
+            trace.server_timing(response.headers['server-timing'], waiting)
+        return response, keep_alive
+
+    async def _read_rest(self, reader, method, status_line):
+        try:
+            version, status = status_line.decode('latin-1').split(' ', 2)[:2]
+            status = int(status)
+        except ValueError:
+            raise HttpError(f'malformed status line: {status_line!r}') from None
+        headers = {}
+        while True:
+            line = await reader.readuntil(b'\r\n')
+            if line == b'\r\n':
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        keep_alive = headers.get('connection', '').lower() != 'close' and version != 'HTTP/1.0'
+        if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+            body = b''
+        elif headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await reader.readuntil(b'\r\n')).split(b';')[0], 16)
+                if size == 0:
+                    while await reader.readuntil(b'\r\n') != b'\r\n':
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            body = b''.join(chunks)
+        elif 'content-length' in headers:
+            body = await reader.readexactly(int(headers['content-length']))
+        else:
+            body = await reader.read()
+            keep_alive = False
+        return Response(status, headers, body), keep_alive
+
+    async def get(self, path, **kwargs):
+        return await self.request('GET', path, **kwargs)
+
+    async def post(self, path, **kwargs):
+        return await self.request('POST', path, **kwargs)
+
+    async def put(self, path, **kwargs):
+        return await self.request('PUT', path, **kwargs)
+
+    async def delete(self, path, **kwargs):
+        return await self.request('DELETE', path, **kwargs)
+
+
+async def _read_request(reader):
+    request_line = await reader.readuntil(b'\r\n')
+    if request_line == b'\r\n':
+        request_line = await reader.readuntil(b'\r\n')
+    method, target, version = request_line.decode('latin-1').rstrip('\r\n').split(' ', 2)
+    headers = {}
+    while True:
+        line = await reader.readuntil(b'\r\n')
+        if line == b'\r\n':
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers.get('content-length', 0) or 0))
+    return method, target, version, headers, body
+
+
+async def start_server(handler, host='127.0.0.1', port=0):
+    """Serve ``handler`` over HTTP/1.1 with keep-alive; returns the asyncio server.
+
+    ``handler(method, target, headers, body)`` is a coroutine returning
+    ``(status, headers, body)``; a ``dict`` or ``list`` body is sent as JSON.
+    Meant for local stand-ins of the server API, not for production use.
+    """
+    async def connection(reader, writer):
+        try:
+            while True:
+                try:
+                    method, target, version, headers, body = await _read_request(reader)
+                except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+                    return
+                status, response_headers, payload = await handler(method, target, headers, body)
+                response_headers = dict(response_headers or {})
+                if isinstance(payload, (dict, list)):
+                    payload = jsonlib.dumps(payload).encode('utf-8')
+                    response_headers.setdefault('Content-Type', 'application/json')
+                elif isinstance(payload, str):
+                    payload = payload.encode('utf-8')
+                payload = payload or b''
+                close = headers.get('connection', '').lower() == 'close' or version == 'HTTP/1.0'
+                response_headers['Content-Length'] = str(len(payload))
+                if close:
+                    response_headers['Connection'] = 'close'
+                head = f'HTTP/1.1 {status} {_REASONS.get(status, "Status")}\r\n'
+                head += ''.join(f'{k}: {v}\r\n' for k, v in response_headers.items()) + '\r\n'
+                writer.write(head.encode('latin-1') + payload)
+                await writer.drain()
+                if close:
+                    return
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(connection, host, port)
+
+
+def server_url(server):
+    host, port = server.sockets[0].getsockname()[:2]
+    return f'http://{host}:{port}'
+
+
+_REASONS = {200: 'OK', 201: 'Created', 204: 'No Content', 304: 'Not Modified', 400: 'Bad Request',
+            401: 'Unauthorized', 403: 'Forbidden', 404: 'Not Found', 429: 'Too Many Requests',
+            500: 'Internal Server Error', 502: 'Bad Gateway', 503: 'Service Unavailable', 504: 'Gateway Timeout'}
@@ -0,0 +1,192 @@
+"""Change-impact selection: which catalogue cases does a diff touch?
+
+The catalogue header declares, per category, the source files its cases
+exercise (``category_sources``) and the files every case depends on
+(``shared_sources``). Declared files are expanded through the TypeScript
+import graph of ``server/src`` and ``client/src``, so a change to
+``utils/tieBreak.ts`` reaches every category whose entry points import it,
+directly or not. The expansion stops at route, controller and page
+files (``BOUNDARY_SOURCES``) that were not declared. A declared route
+still reaches its controller, but ``adminController.ts`` importing
+``standingsController.ts`` does not make Admin Panel a Standings
+category. Shared files are taken as listed, since they are typically
+aggregators (``server.ts``, ``App.tsx``) importing everything.
+
+A per-feature coverage trace (``{feature_id: [paths]}``), when supplied,
+replaces the category declaration for the features it covers.
+
+Changed code files that no category reaches select the whole catalogue,
+unless ``unmapped='ignore'``; files matching ``IGNORED_SOURCES`` never
+select anything.
+"""
+import argparse
+import fnmatch
+import json
+import os
+import re
+import subprocess
+
+CODE_ROOTS = ('server/src', 'client/src')
+CODE_EXTENSIONS = ('.ts', '.tsx', '.js', '.jsx')
+IGNORED_SOURCES = ('*.md', '*.txt', 'server/src/tests/*', 'server/src/scripts/*', 'feature_list.*')
+
+# Feature-area entry points: the import closure enters these only from a declared file.
+BOUNDARY_SOURCES = re.compile(r'^server/src/(?:routes|controllers)/|^client/src/pages/')
+
+IMPORT_RE = re.compile(r'''(?:\bfrom\s+|\bimport\s*\(\s*|\brequire\s*\(\s*|^\s*import\s+)['"](\.{1,2}/[^'"]+)['"]''', re.M)
+
+
+def _resolve(base_dir, spec, files):
+    candidate = os.path.normpath(os.path.join(base_dir, spec))
+    for suffix in ('', '.ts', '.tsx', '.js', '.jsx', '/index.ts', '/index.tsx', '/index.js'):
+        if candidate + suffix in files:
+            return candidate + suffix
+    return None
+
+
+def list_sources(root, roots=CODE_ROOTS):
+    files = set()
+    for code_root in roots:
+        for dirpath, dirnames, filenames in os.walk(os.path.join(root, code_root)):
+            dirnames[:] = [d for d in dirnames if d != 'node_modules']
+            for name in filenames:
+                files.add(os.path.relpath(os.path.join(dirpath, name), root).replace(os.sep, '/'))
+    return files
+
+
+def import_graph(root, files=None):
+    """Return ``{path: {imported paths}}`` for relative imports between repo files."""
+    files = list_sources(root) if files is None else files
+    graph = {}
+    for path in files:
+        if not path.endswith(CODE_EXTENSIONS):
+            continue
+        with open(os.path.join(root, path), encoding='utf-8', errors='replace') as f:
+            text = f.read()
+        base_dir = os.path.dirname(path)
+        graph[path] = {target for target in (_resolve(base_dir, spec, files) for spec in IMPORT_RE.findall(text))
+                       if target is not None}
+    return graph
+
+
+def closure(graph, paths, boundary=BOUNDARY_SOURCES):
+    """Return ``paths`` plus everything they import, transitively.
+
+    Files matching ``boundary`` are only entered directly from one of
+    ``paths``; pass ``None`` for the plain transitive closure.
+    """
+    declared = set(paths)
+    seen, stack = set(), list(paths)
+    while stack:
+        path = stack.pop()
+        if path in seen:
+            continue
+        seen.add(path)
+        for target in graph.get(path, ()):
+            if boundary is None or path in declared or not boundary.search(target):
+                stack.append(target)
+    return seen
+
+
+def expand(patterns, files):
+    matched = set()
+    for pattern in patterns:
+        if any(ch in pattern for ch in '*?['):
+            matched.update(fnmatch.filter(files, pattern))
+        else:
+            matched.add(pattern)
+    return matched
+
+
+class ImpactMap:
+    """Source-path to feature mapping built from a catalogue document."""
+
+    def __init__(self, document, root='.', coverage=None):
+        files = list_sources(root)
+        graph = import_graph(root, files)
+        candidates = files | set(document.get('shared_sources', []))
+        self.shared = expand(document.get('shared_sources', []), candidates)
+        self.category_files = {
+            category: closure(graph, expand(patterns, candidates))
+            for category, patterns in document.get('category_sources', {}).items()
+        }
+        self.coverage = {int(fid): set(paths) for fid, paths in (coverage or {}).items()}
+        self.features = [(f['id'], f['category']) for f in document['features']]
+
+    def affected(self, changed, unmapped='all'):
+        """Return ``(ids, reasons)`` for a list of changed repo-relative paths.
+
+        ``reasons`` maps each changed path to the categories (or ``"*"``) it
+        selected, which makes the selection easy to audit.
+        """
+        ids, reasons = set(), {}
+        all_ids = {fid for fid, _ in self.features}
+        for path in changed:
+            if any(fnmatch.fnmatch(path, pattern) for pattern in IGNORED_SOURCES):
+                continue
+            if path in self.shared:
+                reasons[path] = ['*']
+                ids |= all_ids
+                continue
+            categories = sorted(c for c, paths in self.category_files.items() if path in paths)
+            traced = {fid for fid, paths in self.coverage.items() if path in paths}
+            hit = {fid for fid, category in self.features
+                   if category in categories and fid not in self.coverage} | traced
+            if hit:
+                reasons[path] = categories + [f'#{fid}' for fid in sorted(traced)]
+                ids |= hit
+            elif path.startswith(CODE_ROOTS) and unmapped == 'all':
+                reasons[path] = ['*']
+                ids |= all_ids
+        return sorted(ids), reasons
+
+
+def changed_files(base, root='.'):
+    """Paths changed between ``base`` and the working tree, plus new untracked files."""
+    changed = []
+    for command in (['git', 'diff', '--name-only', base], ['git', 'ls-files', '--others', '--exclude-standard']):
+        out = subprocess.run(command, cwd=root, check=True, capture_output=True, text=True).stdout
+        changed += [line for line in out.splitlines() if line and line not in changed]
+    return changed
+
+
+def load_document(path):
+    with open(path, encoding='utf-8') as f:
+        document = json.load(f)
+    if not isinstance(document, dict):
+        document = {'features': document}
+    return document
+
+
+def select(catalogue, base=None, files=None, root=None, coverage_path=None, unmapped='all'):
+    """Return ``(ids, reasons)`` for explicit ``files`` plus the diff against ``base``.
+
+    ``root`` defaults to the directory holding the catalogue.
+    """
+    root = root or os.path.dirname(os.path.abspath(catalogue))
+    document = load_document(catalogue)
+    coverage = None
+    if coverage_path:
+        with open(coverage_path, encoding='utf-8') as f:
+            coverage = json.load(f)
+    changed = list(files or []) + (changed_files(base, root) if base else [])
+    return ImpactMap(document, root, coverage).affected(changed, unmapped)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List catalogue cases affected by changed source files.")
+    parser.add_argument('--catalogue', default='feature_list.json')
+    parser.add_argument('--root', help="repository root (default: the catalogue's directory)")
+    parser.add_argument('--base', help="git revision to diff the working tree against, e.g. origin/main")
+    parser.add_argument('--coverage', help="JSON file mapping feature id to the source paths it executed")
+    parser.add_argument('--unmapped', choices=['all', 'ignore'], default='all',
+                        help="what an unmapped code change selects (default: %(default)s)")
+    parser.add_argument('files', nargs='*', help="changed paths, in addition to --base")
+    args = parser.parse_args(argv)
+
+    ids, reasons = select(args.catalogue, args.base, args.files, args.root, args.coverage, args.unmapped)
+    print(json.dumps({'ids': ids, 'reasons': reasons}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
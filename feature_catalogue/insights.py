@@ -0,0 +1,591 @@
+"""Pre-aggregated prediction analytics for the Admin Insights cases.
+
+"Admin can view most/least predicted outcomes" and "Admin can view
+prediction trends over time" are group-bys over every prediction row,
+which the controllers run per request. :class:`PredictionCubes` keeps
+those group-bys materialised instead. Three cubes are kept, each with its
+marginals:
+
+* match x scoreline: how often each score was predicted for each match.
+  Goals above ``MAX_GOALS`` fold into ``MAX_GOALS``.
+* customer x day: predictions submitted per day. Customers (companies)
+  group users on the department leaderboards, so they stand in for
+  departments here, as they do in :mod:`feature_catalogue.datagen`.
+* user x stage: predictions per user and tournament stage. It drives
+  participation and stage-completion figures.
+
+Rows stream in as chunks shaped like the datagen output: tuples in
+``datagen.COLUMNS`` order or dicts keyed by those columns. So the cubes
+can ingest ``datagen.generate`` directly, or read a CSV/NDJSON fixture
+directory one chunk at a time. User ids and customer numbers are
+dictionary-encoded to dense indexes. The current prediction of every
+(user, match) pair lives in flat ``array`` columns, users x matches
+row-major. That state makes ingest an upsert. A repeated row costs
+nothing, a changed score moves one count between scorelines, and a
+deletion takes the row out of every cube. Re-ingesting the same export is
+therefore a no-op. A user who arrives after their predictions, or who
+changes customer, has their day counts moved to the right customer. Every
+query reads the cubes or a maintained counter, never the rows, so query
+cost does not grow with the number of predictions.
+
+Rows need ``match_number``, as the datagen output has. A database
+export has to join ``matches`` to get it. :func:`check` is the
+correctness argument: it compares every query with a from-scratch
+recount of the same rows after random re-predictions and deletions.
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import pickle
+import random
+import time
+from array import array
+from datetime import date, datetime, timezone
+from itertools import islice
+from operator import itemgetter
+
+from . import datagen
+from .scoring import STAGES, match_stages
+
+MAX_GOALS = 10
+SCORELINES = (MAX_GOALS + 1) ** 2
+NO_PREDICTION = -1
+# Customer of users whose user row has not been ingested yet.
+UNASSIGNED = ''
+STATE_VERSION = 1
+
+
+def scoreline(home, away):
+    return min(int(home), MAX_GOALS) * (MAX_GOALS + 1) + min(int(away), MAX_GOALS)
+
+
+def scoreline_label(code):
+    home, away = divmod(code, MAX_GOALS + 1)
+    return f'{home}-{away}'
+
+
+_DAYS = {}
+
+
+def day_number(stamp):
+    """Proleptic ordinal of the UTC day of an ISO 8601 string, epoch seconds or datetime."""
+    if isinstance(stamp, str):
+        prefix = stamp[:10]
+        day = _DAYS.get(prefix)
+        if day is None:
+            day = _DAYS[prefix] = date.fromisoformat(prefix).toordinal()
+        return day
+    if isinstance(stamp, datetime):
+        return stamp.astimezone(timezone.utc).date().toordinal()
+    return datetime.fromtimestamp(stamp, timezone.utc).date().toordinal()
+
+
+def _tuples(table, rows):
+    """Rows as tuples in ``datagen.COLUMNS`` order, whether they arrive as tuples or dicts."""
+    if rows and isinstance(rows[0], dict):
+        return map(itemgetter(*datagen.COLUMNS[table]), rows)
+    return rows
+
+
+class PredictionCubes:
+    def __init__(self):
+        self.stages = [name for name, _ in STAGES]
+        self.stage_sizes = [count for _, count in STAGES]
+        stage_of = {name: i for i, name in enumerate(self.stages)}
+        self.match_stage = [stage_of[s] for s in match_stages()]
+        self.matches = len(self.match_stage)
+
+        self.user_index = {}
+        self.user_keys = []
+        self.customer_index = {UNASSIGNED: 0}
+        self.customer_keys = [UNASSIGNED]
+        self.customer_names = {}
+        # Per user: customer; per (user, match): current scoreline and submission day.
+        self.user_customer = array('i')
+        self.cell_scoreline = array('b')
+        self.cell_day = array('i')
+
+        self.match_scoreline = array('q', bytes(8 * self.matches * SCORELINES))
+        self.match_totals = array('q', bytes(8 * self.matches))
+        self.scoreline_totals = array('q', bytes(8 * SCORELINES))
+        self.customer_day = [{}]
+        self.customer_totals = array('q', [0])
+        self.day_totals = {}
+        self.user_stage = array('i')
+        self.user_totals = array('i')
+        self.stage_users = array('q', bytes(8 * len(self.stages)))
+        self.stage_complete = array('q', bytes(8 * len(self.stages)))
+
+        self.predictions = 0
+        self.active_users = 0
+        self.updates = 0
+        self.deletions = 0
+
+    # -- encoding ---------------------------------------------------------
+
+    def _customer(self, key):
+        c = self.customer_index.get(key)
+        if c is None:
+            c = self.customer_index[key] = len(self.customer_keys)
+            self.customer_keys.append(key)
+            self.customer_day.append({})
+            self.customer_totals.append(0)
+        return c
+
+    def _user(self, key):
+        u = self.user_index.get(key)
+        if u is None:
+            u = self.user_index[key] = len(self.user_keys)
+            self.user_keys.append(key)
+            self.user_customer.append(0)
+            self.cell_scoreline.extend(array('b', [NO_PREDICTION]) * self.matches)
+            self.cell_day.extend(array('i', bytes(4 * self.matches)))
+            self.user_stage.extend(array('i', bytes(4 * len(self.stages))))
+            self.user_totals.append(0)
+        return u
+
+    def _count_day(self, c, day, delta):
+        days = self.customer_day[c]
+        days[day] = days.get(day, 0) + delta
+        if not days[day]:
+            del days[day]
+        self.day_totals[day] = self.day_totals.get(day, 0) + delta
+        if not self.day_totals[day]:
+            del self.day_totals[day]
+        self.customer_totals[c] += delta
+
+    # -- ingest -----------------------------------------------------------
+
+    def ingest(self, table, rows):
+        """Fold one chunk of ``table`` rows in; tables other than customers, users and predictions are ignored."""
+        if table == 'customers':
+            for _, number, name, *_ in _tuples(table, rows):
+                self._customer(number)
+                self.customer_names[number] = name
+        elif table == 'users':
+            self.add_users(rows)
+        elif table == 'predictions':
+            self.add_predictions(rows)
+
+    def add_users(self, rows):
+        """Register users and their customer, moving the day counts of any predictions they already have."""
+        matches = self.matches
+        for row in _tuples('users', rows):
+            u = self._user(row[0])
+            c = self._customer(row[6])
+            old = self.user_customer[u]
+            if old == c:
+                continue
+            self.user_customer[u] = c
+            if self.user_totals[u]:
+                base = u * matches
+                for m in range(matches):
+                    if self.cell_scoreline[base + m] != NO_PREDICTION:
+                        day = self.cell_day[base + m]
+                        self._count_day(old, day, -1)
+                        self._count_day(c, day, 1)
+
+    def add_predictions(self, rows):
+        """Upsert predictions; a (user, match) pair seen before changes score, keeping its submission day."""
+        matches, stage_count, width = self.matches, len(self.stages), MAX_GOALS + 1
+        cell_scoreline, cell_day, match_scoreline = self.cell_scoreline, self.cell_day, self.match_scoreline
+        scoreline_totals, match_totals = self.scoreline_totals, self.match_totals
+        user_index, user_customer, user_stage, user_totals = (
+            self.user_index, self.user_customer, self.user_stage, self.user_totals)
+        match_stage, stage_sizes, stage_users, stage_complete = (
+            self.match_stage, self.stage_sizes, self.stage_users, self.stage_complete)
+        days = _DAYS
+        submitted = {}    # (customer, day) -> new predictions in this chunk
+        added = updated = activated = 0
+        for _, user, match_number, home, away, created, _ in _tuples('predictions', rows):
+            u = user_index.get(user)
+            if u is None:
+                u = self._user(user)
+            m = int(match_number) - 1
+            home, away = int(home), int(away)
+            code = (home if home < MAX_GOALS else MAX_GOALS) * width + (away if away < MAX_GOALS else MAX_GOALS)
+            cell = u * matches + m
+            old = cell_scoreline[cell]
+            if old == code:
+                continue
+            cell_scoreline[cell] = code
+            base = m * SCORELINES
+            match_scoreline[base + code] += 1
+            scoreline_totals[code] += 1
+            if old != NO_PREDICTION:
+                match_scoreline[base + old] -= 1
+                scoreline_totals[old] -= 1
+                updated += 1
+                continue
+            day = days.get(created[:10]) if isinstance(created, str) else None
+            if day is None:
+                day = day_number(created)
+            cell_day[cell] = day
+            key = (user_customer[u], day)
+            submitted[key] = submitted.get(key, 0) + 1
+            match_totals[m] += 1
+            s = match_stage[m]
+            k = u * stage_count + s
+            n = user_stage[k] = user_stage[k] + 1
+            if n == 1:
+                stage_users[s] += 1
+            if n == stage_sizes[s]:
+                stage_complete[s] += 1
+            user_totals[u] += 1
+            if user_totals[u] == 1:
+                activated += 1
+            added += 1
+        for (c, day), count in submitted.items():
+            self._count_day(c, day, count)
+        self.predictions += added
+        self.updates += updated
+        self.active_users += activated
+
+    def remove_predictions(self, pairs):
+        """Delete predictions given as ``(user_id, match_number)``; unknown pairs are ignored."""
+        matches, stage_count = self.matches, len(self.stages)
+        for user, match_number in pairs:
+            u = self.user_index.get(user)
+            if u is None:
+                continue
+            m = int(match_number) - 1
+            cell = u * matches + m
+            old = self.cell_scoreline[cell]
+            if old == NO_PREDICTION:
+                continue
+            self.cell_scoreline[cell] = NO_PREDICTION
+            self.match_scoreline[m * SCORELINES + old] -= 1
+            self.scoreline_totals[old] -= 1
+            self.match_totals[m] -= 1
+            self._count_day(self.user_customer[u], self.cell_day[cell], -1)
+            s = self.match_stage[m]
+            k = u * stage_count + s
+            if self.user_stage[k] == self.stage_sizes[s]:
+                self.stage_complete[s] -= 1
+            self.user_stage[k] -= 1
+            if self.user_stage[k] == 0:
+                self.stage_users[s] -= 1
+            self.user_totals[u] -= 1
+            if self.user_totals[u] == 0:
+                self.active_users -= 1
+            self.predictions -= 1
+            self.deletions += 1
+
+    # -- queries ----------------------------------------------------------
+
+    def top_scorelines(self, match_number=None, n=10, least=False):
+        """Most (or least) predicted scorelines as ``[(label, count)]``, overall or for one match.
+
+        "Least" ranks only scorelines somebody predicted; ties go to the lower score.
+        """
+        if match_number is None:
+            counts = self.scoreline_totals
+        else:
+            base = (match_number - 1) * SCORELINES
+            counts = self.match_scoreline[base:base + SCORELINES]
+        predicted = [(code, count) for code, count in enumerate(counts) if count]
+        predicted.sort(key=(lambda item: (item[1], item[0])) if least else (lambda item: (-item[1], item[0])))
+        return [(scoreline_label(code), count) for code, count in predicted[:n]]
+
+    def outcome_split(self, match_number=None):
+        """``{"home": n, "draw": n, "away": n}`` predicted wins and draws, overall or for one match."""
+        if match_number is None:
+            counts = self.scoreline_totals
+        else:
+            base = (match_number - 1) * SCORELINES
+            counts = self.match_scoreline[base:base + SCORELINES]
+        split = {'home': 0, 'draw': 0, 'away': 0}
+        for code, count in enumerate(counts):
+            if count:
+                home, away = divmod(code, MAX_GOALS + 1)
+                split['home' if home > away else 'away' if away > home else 'draw'] += count
+        return split
+
+    def match_popularity(self, n=10, least=False):
+        """Matches with the most (or fewest) predictions as ``[(match_number, count)]``."""
+        order = sorted(range(self.matches), key=lambda m: (self.match_totals[m] if least else -self.match_totals[m], m))
+        return [(m + 1, self.match_totals[m]) for m in order[:n]]
+
+    def daily(self, customer=None):
+        """Predictions submitted per day as ``[(iso_date, count)]``, overall or for one customer number."""
+        if customer is None:
+            days = self.day_totals
+        else:
+            c = self.customer_index.get(customer)
+            days = self.customer_day[c] if c is not None else {}
+        return [(date.fromordinal(day).isoformat(), count) for day, count in sorted(days.items())]
+
+    def top_customers(self, n=10):
+        """Customers with the most predictions as ``[(customer_number, count)]``."""
+        order = sorted((c for c in range(len(self.customer_keys)) if self.customer_totals[c]),
+                       key=lambda c: (-self.customer_totals[c], self.customer_keys[c]))
+        return [(self.customer_keys[c], self.customer_totals[c]) for c in order[:n]]
+
+    def participation(self):
+        """The admin dashboard figures: users, users with predictions, rate and average, in percent and whole numbers.
+
+        Rounded like the dashboard's ``Math.round`` (halves up), not Python's
+        ``round``, which rounds halves to even: 12.5 must give 13, not 12.
+        """
+        users = len(self.user_keys)
+        return {
+            'users': users,
+            'users_with_predictions': self.active_users,
+            'participation_rate': math.floor(self.active_users / users * 100 + 0.5) if users else 0,
+            'predictions': self.predictions,
+            'avg_predictions_per_user': math.floor(self.predictions / users + 0.5) if users else 0,
+        }
+
+    def stage_coverage(self):
+        """Per stage: predictions, users with at least one and users who predicted every match."""
+        totals = [0] * len(self.stages)
+        for m, s in enumerate(self.match_stage):
+            totals[s] += self.match_totals[m]
+        return {name: {'predictions': totals[s], 'users': self.stage_users[s], 'complete': self.stage_complete[s]}
+                for s, name in enumerate(self.stages)}
+
+    def users_without_predictions(self):
+        return [self.user_keys[u] for u, total in enumerate(self.user_totals) if not total]
+
+    def report(self, top=10):
+        return {
+            'participation': self.participation(),
+            'most_predicted': self.top_scorelines(n=top),
+            'least_predicted': self.top_scorelines(n=top, least=True),
+            'outcomes': self.outcome_split(),
+            'most_predicted_matches': self.match_popularity(top),
+            'least_predicted_matches': self.match_popularity(top, least=True),
+            'daily': self.daily(),
+            'top_customers': self.top_customers(top),
+            'stages': self.stage_coverage(),
+        }
+
+    # -- persistence ------------------------------------------------------
+
+    def save(self, path):
+        from .stream import atomic_writer
+
+        with atomic_writer(path, binary=True) as f:
+            pickle.dump({'version': STATE_VERSION, 'cubes': self.__dict__}, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            state = pickle.load(f)
+        if state.get('version') != STATE_VERSION:
+            raise ValueError(f"{path}: unsupported insights state version {state.get('version')}")
+        cubes = cls.__new__(cls)
+        cubes.__dict__.update(state['cubes'])
+        return cubes
+
+
+def read_fixtures(directory, chunk_size=10_000):
+    """Yield ``(table, rows)`` chunks from a datagen CSV or NDJSON directory: customers, users, predictions.
+
+    CSV rows come out as tuples in the file's column order, which must be
+    ``datagen.COLUMNS`` order; an NDJSON chunk is decoded with one
+    ``json.loads`` call and comes out as dicts. Raises ``ValueError`` when
+    ``directory`` holds none of the tables, e.g. only datagen's SQL output.
+    """
+    found = []
+    for table in ('customers', 'users', 'predictions'):
+        for extension in ('.csv', '.ndjson'):
+            path = os.path.join(directory, table + extension)
+            if os.path.exists(path):
+                found.append((table, path, extension))
+                break
+    if not found:
+        raise ValueError(f"{directory}: no customers, users or predictions table "
+                         f"(expected customers.csv, users.csv, predictions.csv or the .ndjson files)")
+    return _read_tables(found, chunk_size)
+
+
+def _read_tables(found, chunk_size):
+    for table, path, extension in found:
+        with open(path, newline='', encoding='utf-8') as f:
+            if extension == '.csv':
+                rows = csv.reader(f)
+                if tuple(next(rows, ())) != datagen.COLUMNS[table]:
+                    raise ValueError(f"{path}: columns differ from {datagen.COLUMNS[table]}")
+            while True:
+                if extension == '.csv':
+                    chunk = list(islice(rows, chunk_size))
+                else:
+                    lines = [line for line in islice(f, chunk_size) if line.strip()]
+                    chunk = json.loads('[' + ','.join(lines) + ']') if lines else []
+                if not chunk:
+                    break
+                yield table, chunk
+
+
+def _recount(rows, customers, stage_of):
+    """Reference results of the cube queries, recomputed from final prediction rows."""
+    scorelines, per_match, days, per_customer, user_stage, user_totals = {}, {}, {}, {}, {}, {}
+    for (user, match_number), (code, day) in rows.items():
+        scorelines[code] = scorelines.get(code, 0) + 1
+        counts = per_match.setdefault(match_number, {})
+        counts[code] = counts.get(code, 0) + 1
+        customer = customers.get(user, UNASSIGNED)
+        key = (customer, day)
+        days[key] = days.get(key, 0) + 1
+        per_customer[customer] = per_customer.get(customer, 0) + 1
+        stage_key = (user, stage_of[match_number - 1])
+        user_stage[stage_key] = user_stage.get(stage_key, 0) + 1
+        user_totals[user] = user_totals.get(user, 0) + 1
+    return scorelines, per_match, days, per_customer, user_stage, user_totals
+
+
+def check(users=300, seed=0, chunk_size=50, changes=2000):
+    """Randomised equivalence check against a from-scratch recount.
+
+    Ingests datagen rows in chunks, then random re-predictions, deletions,
+    re-deliveries and late customer moves, and compares every query with
+    a recount of the final rows. Returns a list of the queries that disagree.
+    """
+    rng = random.Random(seed)
+    cubes = PredictionCubes()
+    rows, customers, user_ids = {}, {}, []
+    for table, chunk in datagen.generate(users, seed, chunk_size):
+        cubes.ingest(table, chunk)
+        if table == 'users':
+            for row in chunk:
+                customers[row[0]] = row[6]
+                user_ids.append(row[0])
+        elif table == 'predictions':
+            for row in chunk:
+                rows[(row[1], row[2])] = (scoreline(row[3], row[4]), day_number(row[5]))
+    numbers = list(cubes.customer_index)[1:]
+    for _ in range(changes):
+        user, match_number = rng.choice(user_ids), rng.randrange(1, cubes.matches + 1)
+        roll = rng.random()
+        if roll < 0.2:
+            rows.pop((user, match_number), None)
+            cubes.remove_predictions([(user, match_number)])
+        elif roll < 0.25:
+            customers[user] = rng.choice(numbers)
+            cubes.add_users([(user, None, None, None, None, None, customers[user])])
+        else:
+            home, away = rng.randrange(4), rng.randrange(4)
+            stamp = f'2026-06-{rng.randrange(1, 12):02d}T12:00:00Z'
+            day = rows[(user, match_number)][1] if (user, match_number) in rows else day_number(stamp)
+            rows[(user, match_number)] = (scoreline(home, away), day)
+            cubes.add_predictions([('p', user, match_number, home, away, stamp, stamp)])
+
+    scorelines, per_match, days, per_customer, user_stage, user_totals = _recount(rows, customers, cubes.match_stage)
+    failures = []
+    if list(cubes.scoreline_totals) != [scorelines.get(code, 0) for code in range(SCORELINES)]:
+        failures.append('scoreline totals')
+    for m in range(1, cubes.matches + 1):
+        base = (m - 1) * SCORELINES
+        expected = per_match.get(m, {})
+        if list(cubes.match_scoreline[base:base + SCORELINES]) != [expected.get(c, 0) for c in range(SCORELINES)]:
+            failures.append(f'match {m} scorelines')
+        if cubes.match_totals[m - 1] != sum(expected.values()):
+            failures.append(f'match {m} total')
+    cube_days = {(cubes.customer_keys[c], day): n for c, by_day in enumerate(cubes.customer_day)
+                 for day, n in by_day.items()}
+    if cube_days != days:
+        failures.append('customer x day')
+    overall = {}
+    for (_, day), n in days.items():
+        overall[day] = overall.get(day, 0) + n
+    if cubes.day_totals != overall:
+        failures.append('daily totals')
+    if {k: n for k, n in zip(cubes.customer_keys, cubes.customer_totals) if n} != per_customer:
+        failures.append('customer totals')
+    for user, u in cubes.user_index.items():
+        for s in range(len(cubes.stages)):
+            if cubes.user_stage[u * len(cubes.stages) + s] != user_stage.get((user, s), 0):
+                failures.append(f'user {user} stage {cubes.stages[s]}')
+        if cubes.user_totals[u] != user_totals.get(user, 0):
+            failures.append(f'user {user} total')
+    coverage = cubes.stage_coverage()
+    for s, name in enumerate(cubes.stages):
+        counts = [n for (_, stage), n in user_stage.items() if stage == s]
+        if (coverage[name]['users'], coverage[name]['complete']) != \
+                (len(counts), sum(n == cubes.stage_sizes[s] for n in counts)):
+            failures.append(f'stage {name} coverage')
+    if (cubes.predictions, cubes.active_users) != (len(rows), len(user_totals)):
+        failures.append('participation')
+    return failures
+
+
+def _print_report(report, cubes, args):
+    p = report['participation']
+    print(f"{p['predictions']} predictions by {p['users_with_predictions']} of {p['users']} users "
+          f"({p['participation_rate']}%), {p['avg_predictions_per_user']} per user")
+    print(f"most predicted:  {', '.join(f'{label} ({n})' for label, n in report['most_predicted'])}")
+    print(f"least predicted: {', '.join(f'{label} ({n})' for label, n in report['least_predicted'])}")
+    print(f"outcomes: {report['outcomes']}")
+    if args.match:
+        print(f"match {args.match}: {cubes.outcome_split(args.match)}; "
+              f"{', '.join(f'{label} ({n})' for label, n in cubes.top_scorelines(args.match, args.top))}")
+    print('predictions per day:')
+    for day, n in cubes.daily(args.customer) if args.customer else report['daily']:
+        print(f'  {day} {n:>9}')
+    print('top customers: ' + ', '.join(f'{number} ({n})' for number, n in report['top_customers']))
+    print('stages:')
+    for name, entry in report['stages'].items():
+        print(f"  {name:<12} {entry['predictions']:>9} predictions {entry['users']:>8} users "
+              f"{entry['complete']:>8} complete")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prediction analytics cubes for the Admin Insights cases.")
+    parser.add_argument('fixtures', nargs='?', help="datagen CSV/NDJSON directory to ingest")
+    parser.add_argument('--generate', type=int, metavar='USERS', help="ingest freshly generated data for USERS users")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunk-size', type=int, default=10_000, help="rows per ingested chunk")
+    parser.add_argument('--state', help="load cubes from this file if it exists and save them back after ingest")
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--match', type=int, help="also show the scorelines of this match number")
+    parser.add_argument('--customer', help="show the daily trend of this customer number")
+    parser.add_argument('--json', action='store_true')
+    parser.add_argument('--check', action='store_true',
+                        help="run the randomised equivalence check against a from-scratch recount instead")
+    parser.add_argument('--runs', type=int, default=5, help="independent check runs (seeds seed..seed+runs-1)")
+    args = parser.parse_args(argv)
+
+    if args.check:
+        failed = [(seed, what) for seed in range(args.seed, args.seed + args.runs) for what in check(seed=seed)]
+        for seed, what in failed[:20]:
+            print(f"  FAIL seed {seed}: {what}")
+        print(f"{args.runs} check runs against a from-scratch recount: {len(failed)} failures")
+        raise SystemExit(1 if failed else 0)
+
+    cubes = PredictionCubes.load(args.state) if args.state and os.path.exists(args.state) else PredictionCubes()
+    if args.generate:
+        source = datagen.generate(args.generate, args.seed, args.chunk_size)
+    elif args.fixtures:
+        try:
+            source = read_fixtures(args.fixtures, args.chunk_size)
+        except ValueError as exc:
+            raise SystemExit(f"❌ {exc}") from None
+    else:
+        source = ()
+    before = cubes.predictions
+    started = time.perf_counter()
+    try:
+        for table, rows in source:
+            cubes.ingest(table, rows)
+    except ValueError as exc:
+        raise SystemExit(f"❌ {exc}") from None
+    ingest = time.perf_counter() - started
+    if args.state:
+        cubes.save(args.state)
+
+    started = time.perf_counter()
+    report = cubes.report(args.top)
+    query = time.perf_counter() - started
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    _print_report(report, cubes, args)
+    print(f"Ingest: {cubes.predictions - before:+d} predictions in {ingest:.2f}s; "
+          f"full report in {query * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
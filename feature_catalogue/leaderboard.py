@@ -0,0 +1,366 @@
+"""Incremental leaderboard: apply one match result as per-user deltas.
+
+``leaderboardScheduler.ts`` re-scores every recently finished match each
+hour and recalculates all scores nightly, so its cost is users x matches
+even when nothing changed. This is a reference engine for the
+incremental alternative. Applying a result (or a corrected result) to a
+match touches only the users who predicted it. For each of them it
+subtracts the old contribution, adds the new one, and moves the user's
+composite ranking key (see :func:`scoring.rank_keys`) inside a
+:class:`RankIndex`. A user's rank, the top N, or a page of standings then
+costs O(log n) instead of a full ``sortByTieBreak``. Re-applying an
+unchanged result is free. When a result moves a large share of the field,
+one sort can beat that many single moves. The board times its index
+builds and its single moves, and rebuilds only when the moves would
+measurably cost more; ``rebuild_share`` replaces that with a fixed
+threshold.
+
+:func:`check` is the correctness argument. It replays random sequences of
+results, corrections, repeats and retractions, and after every step
+compares points, counts and the full order with a from-scratch
+:func:`scoring.score` of the same state. ``--check`` runs every seed twice:
+once with the measured policy and once with ``rebuild_share=1.0``, which
+never rebuilds, so the single-move path is checked on every update.
+"""
+import argparse
+import bisect
+import dataclasses
+import random
+import time
+
+from . import scoring
+
+
+class RankIndex:
+    """Sorted multiset of integer keys, largest first, with positional access.
+
+    Keys are kept in bounded sorted buckets; a Fenwick tree over bucket
+    sizes turns "position of key" and "key at position" into O(log n)
+    bucket lookups plus a bisect inside one bucket.
+    """
+
+    LOAD = 512
+
+    def __init__(self, keys=()):
+        values = sorted(-k for k in keys)
+        self._lists = [values[i:i + self.LOAD] for i in range(0, len(values), self.LOAD)]
+        self._maxes = [bucket[-1] for bucket in self._lists]
+        self._len = len(values)
+        self._rebuild()
+
+    def __len__(self):
+        return self._len
+
+    def _rebuild(self):
+        tree = [0] * (len(self._lists) + 1)
+        for i, bucket in enumerate(self._lists, 1):
+            tree[i] += len(bucket)
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _bump(self, bucket, delta):
+        i = bucket + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _before(self, bucket):
+        total, i = 0, bucket
+        while i:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def add(self, key):
+        value = -key
+        if not self._lists:
+            self._lists, self._maxes, self._len = [[value]], [value], 1
+            self._rebuild()
+            return
+        i = min(bisect.bisect_left(self._maxes, value), len(self._lists) - 1)
+        bucket = self._lists[i]
+        bisect.insort(bucket, value)
+        self._maxes[i] = bucket[-1]
+        self._len += 1
+        if len(bucket) > 2 * self.LOAD:
+            self._lists[i:i + 1] = [bucket[:self.LOAD], bucket[self.LOAD:]]
+            self._maxes[i:i + 1] = [bucket[self.LOAD - 1], bucket[-1]]
+            self._rebuild()
+        else:
+            self._bump(i, 1)
+
+    def _find(self, key):
+        value = -key
+        i = bisect.bisect_left(self._maxes, value)
+        if i < len(self._lists):
+            j = bisect.bisect_left(self._lists[i], value)
+            if self._lists[i][j] == value:
+                return i, j
+        raise KeyError(key)
+
+    def remove(self, key):
+        i, j = self._find(key)
+        bucket = self._lists[i]
+        del bucket[j]
+        self._len -= 1
+        if bucket:
+            self._maxes[i] = bucket[-1]
+            self._bump(i, -1)
+        else:
+            del self._lists[i], self._maxes[i]
+            self._rebuild()
+
+    def index(self, key):
+        """0-based position of ``key`` (number of larger keys)."""
+        i, j = self._find(key)
+        return self._before(i) + j
+
+    def __getitem__(self, position):
+        if position < 0:
+            position += self._len
+        if not 0 <= position < self._len:
+            raise IndexError(position)
+        # Fenwick descent to the bucket holding ``position``.
+        bucket, step = 0, 1 << (len(self._tree).bit_length())
+        while step:
+            nxt = bucket + step
+            if nxt < len(self._tree) and self._tree[nxt] <= position:
+                bucket = nxt
+                position -= self._tree[nxt]
+            step >>= 1
+        return -self._lists[bucket][position]
+
+    def __iter__(self):
+        for bucket in self._lists:
+            for value in bucket:
+                yield -value
+
+    def slice(self, start, stop):
+        return [self[i] for i in range(start, min(stop, self._len))]
+
+
+class IncrementalLeaderboard:
+    """Standings of a :class:`scoring.Simulation`, updated one result at a time.
+
+    Starts from the results already in ``sim`` (scored once in full) and
+    never mutates ``sim``; the applied results live in :attr:`results`.
+    ``rebuild_share`` is the share of users moving in one update above which
+    the index is rebuilt; ``None`` (the default) decides from measured costs.
+    """
+
+    def __init__(self, sim, rebuild_share=None):
+        self.sim = sim
+        standings = scoring.score(sim)
+        self.points = [int(x) for x in standings.points]
+        self.exact_scores = [int(x) for x in standings.exact_scores]
+        self.correct_winners = [int(x) for x in standings.correct_winners]
+        self.predictions_made = [int(x) for x in standings.predictions_made]
+        self.champion = [bool(x) for x in sim.champion_correct]
+        self.slots = scoring.registration_slots([int(x) for x in sim.registered])
+        self.user_by_slot = {slot: u for u, slot in enumerate(self.slots)}
+        self.results = {j: (sim.actual_home[j], sim.actual_away[j])
+                        for j in range(sim.matches) if sim.actual_home[j] >= 0}
+        self.rebuild_share = rebuild_share
+        started = time.perf_counter()
+        self.index = RankIndex(self.key(u) for u in range(sim.users))
+        self.rebuild_seconds = time.perf_counter() - started
+        self.move_seconds = None  # running mean cost of moving one user
+        self.updates = self.rebuilds = 0
+
+    def key(self, user):
+        return scoring.composite_key(self.points[user], self.exact_scores[user], self.correct_winners[user],
+                                     self.champion[user], self.slots[user])
+
+    def _should_rebuild(self, moves):
+        if self.rebuild_share is not None:
+            return moves > len(self.index) * self.rebuild_share
+        # Until a move has been timed, moving is the safe choice.
+        return self.move_seconds is not None and moves * self.move_seconds > self.rebuild_seconds
+
+    def _user(self, key):
+        return self.user_by_slot[key & ((1 << scoring._REG_BITS) - 1)]
+
+    def _predictions(self, match):
+        sim = self.sim
+        if sim.backend == 'numpy':
+            home, away = sim.pred_home[:, match], sim.pred_away[:, match]
+            made = (home >= 0).nonzero()[0]
+            return zip(made.tolist(), home[made].tolist(), away[made].tolist())
+        home = sim.pred_home[match::sim.matches]
+        away = sim.pred_away[match::sim.matches]
+        return ((u, h, a) for u, (h, a) in enumerate(zip(home, away)) if h >= 0)
+
+    def apply_result(self, match, home, away):
+        """Set (or correct) the result of ``match``; ``None`` retracts it.
+
+        Returns the number of users whose standing changed.
+        """
+        new = None if home is None else (home, away)
+        old = self.results.get(match)
+        if old == new:
+            return 0
+        exact_pts, winner_pts = self.sim.rules[self.sim.stages[match]]
+
+        def outcome(result, ph, pa):
+            if result is None:
+                return 0, 0, 0
+            is_exact = ph == result[0] and pa == result[1]
+            is_winner = scoring._sign(ph - pa) == scoring._sign(result[0] - result[1])
+            return (exact_pts if is_exact else winner_pts if is_winner else 0), int(is_exact), int(is_winner)
+
+        deltas = []
+        for u, ph, pa in self._predictions(match):
+            p0, e0, w0 = outcome(old, ph, pa)
+            p1, e1, w1 = outcome(new, ph, pa)
+            if p0 != p1 or e0 != e1 or w0 != w1:
+                deltas.append((u, p1 - p0, e1 - e0, w1 - w0))
+
+        rebuild = self._should_rebuild(len(deltas))
+        started = time.perf_counter()
+        for u, dp, de, dw in deltas:
+            if not rebuild:
+                self.index.remove(self.key(u))
+            self.points[u] += dp
+            self.exact_scores[u] += de
+            self.correct_winners[u] += dw
+            if not rebuild:
+                self.index.add(self.key(u))
+        if rebuild:
+            self.index = RankIndex(self.key(u) for u in range(self.sim.users))
+            self.rebuild_seconds = time.perf_counter() - started
+            self.rebuilds += 1
+        elif deltas:
+            per_move = (time.perf_counter() - started) / len(deltas)
+            self.move_seconds = per_move if self.move_seconds is None else 0.8 * self.move_seconds + 0.2 * per_move
+        changed = len(deltas)
+        if new is None:
+            del self.results[match]
+        else:
+            self.results[match] = new
+        self.updates += changed
+        return changed
+
+    def rank(self, user):
+        """1-based position of ``user``."""
+        return self.index.index(self.key(user)) + 1
+
+    def page(self, offset=0, limit=50):
+        return [self._user(k) for k in self.index.slice(offset, offset + limit)]
+
+    def order(self):
+        return [self._user(k) for k in self.index]
+
+
+def _state(sim, results):
+    home = [scoring.NO_PREDICTION] * sim.matches
+    away = [scoring.NO_PREDICTION] * sim.matches
+    for j, (h, a) in results.items():
+        home[j], away[j] = h, a
+    return dataclasses.replace(sim, actual_home=home, actual_away=away)
+
+
+def check(users=500, steps=300, seed=0, backend='auto', every=1, rebuild_share=None):
+    """Randomised equivalence check against full recomputation.
+
+    ``rebuild_share=1.0`` never rebuilds, so every update goes through the
+    single-move path. Returns ``(checks, failures)`` where ``failures`` lists
+    ``(step, action, what)`` for every disagreement.
+    """
+    rng = random.Random(seed)
+    sim = scoring.synthesise(users, seed, played=rng.randrange(0, 20), backend=backend)
+    board = IncrementalLeaderboard(sim, rebuild_share)
+    results = dict(board.results)
+    checks, failures = 0, []
+    for step in range(steps):
+        match = rng.randrange(sim.matches)
+        roll = rng.random()
+        if roll < 0.1 and match in results:
+            action = ('retract', match)
+            results.pop(match)
+            board.apply_result(match, None, None)
+        elif roll < 0.25 and match in results:
+            action = ('repeat', match, *results[match])
+            if board.apply_result(match, *results[match]):
+                failures.append((step, action, 'repeating a result changed standings'))
+        else:
+            # Fresh results and corrections; small scores make exact hits common.
+            result = (rng.randrange(4), rng.randrange(4))
+            action = ('set', match, *result)
+            results[match] = result
+            board.apply_result(match, *result)
+        if step % every and step != steps - 1:
+            continue
+
+        checks += 1
+        full = scoring.score(_state(sim, results))
+        for name in ('points', 'exact_scores', 'correct_winners', 'predictions_made'):
+            if [int(x) for x in getattr(full, name)] != getattr(board, name):
+                failures.append((step, action, name))
+        order = [int(u) for u in full.order]
+        if order != board.order():
+            failures.append((step, action, 'order'))
+        for u in rng.sample(range(users), min(5, users)):
+            if board.rank(u) != order.index(u) + 1:
+                failures.append((step, action, f'rank of user {u}'))
+        offset = rng.randrange(users)
+        if board.page(offset, 50) != order[offset:offset + 50]:
+            failures.append((step, action, f'page at {offset}'))
+    return checks, failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Incremental leaderboard engine: benchmark and equivalence check.")
+    parser.add_argument('--users', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--backend', choices=['auto', 'numpy', 'python'], default='auto')
+    parser.add_argument('--check', action='store_true',
+                        help="run the randomised equivalence check against full recomputation instead")
+    parser.add_argument('--steps', type=int, default=300, help="result updates per check run")
+    parser.add_argument('--runs', type=int, default=5, help="independent check runs (seeds seed..seed+runs-1)")
+    args = parser.parse_args(argv)
+    if args.backend == 'numpy' and scoring.np is None:
+        parser.error("numpy is not installed")
+
+    if args.check:
+        users = min(args.users, 2000)
+        total, failed = 0, []
+        for seed in range(args.seed, args.seed + args.runs):
+            for policy, share in (('measured', None), ('incremental', 1.0)):
+                checks, failures = check(users, args.steps, seed, args.backend, rebuild_share=share)
+                total += checks
+                failed += [(seed, policy, *f) for f in failures]
+        for seed, policy, step, action, what in failed[:20]:
+            print(f"  FAIL seed {seed} ({policy}) step {step} {action}: {what}")
+        print(f"{total} comparisons with full recomputation over {args.runs} runs of {users} users, "
+              f"measured and incremental-only: {len(failed)} failures")
+        raise SystemExit(1 if failed else 0)
+
+    sim = scoring.synthesise(args.users, args.seed, played=0, backend=args.backend)
+    started = time.perf_counter()
+    board = IncrementalLeaderboard(sim)
+    built = time.perf_counter() - started
+    rng = random.Random(args.seed)
+    results = {}
+    started = time.perf_counter()
+    for match in range(sim.matches):
+        results[match] = (rng.randrange(4), rng.randrange(4))
+        board.apply_result(match, *results[match])
+    incremental = (time.perf_counter() - started) / sim.matches
+    full = scoring.score(_state(sim, results))
+    rescore = full.timings['score'] + full.timings['rank']
+    started = time.perf_counter()
+    unchanged = sum(board.apply_result(j, *r) for j, r in results.items())
+    repeat = time.perf_counter() - started
+
+    print(f"{sim.backend}: {args.users} users x {sim.matches} matches; index built in {built:.2f}s")
+    print(f"  per result, incremental: {incremental * 1000:.1f} ms ({board.updates / sim.matches:,.0f} users moved, "
+          f"{board.rebuilds} of {sim.matches} results rebuilt the index)")
+    print(f"  per result, full rescore + sort: {rescore * 1000:.1f} ms")
+    print(f"  re-applying all {len(results)} unchanged results: {repeat * 1000:.2f} ms, {unchanged} users moved")
+    print(f"  rank of user 0: {board.rank(0)}; top 5: {board.page(0, 5)}")
+
+
+if __name__ == '__main__':
+    main()
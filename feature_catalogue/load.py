@@ -0,0 +1,390 @@
+"""Load generator that replays catalogue cases as virtual-user journeys.
+
+Each case's ``test_steps`` compile to a journey of HTTP actions:
+
+* ``Login as ...`` logs the session in (seeded users, or the datagen
+  load users with ``--users N``);
+* ``Navigate to /page`` fans out the API calls that page makes on load
+  (``cachecheck.PAGE_REQUESTS``); ``Reload page`` repeats the last page;
+* ``Change a score`` / ``Enter prediction ...`` is the auto-save
+  ``POST /api/predictions`` the prediction page issues on every change;
+* search and paging steps on the standings become the matching queries;
+* explicit ``GET /api/...`` steps are sent as written.
+
+Steps with no HTTP side are think time. Cases that compile to no request
+are skipped. Journeys are weighted by priority and by ``--scenario``
+(``autosave`` reproduces the deadline write storm, ``leaderboard`` the
+post-match read storm) and ``--weight``.
+
+Sessions arrive as a non-homogeneous Poisson process whose rate follows
+``--pattern``: ``constant``, ``ramp`` (0 to peak), ``spike`` (base, then
+peak for the middle tenth) or ``deadline`` (rising exponentially to peak
+at the end, like the minutes before the prediction deadline). All
+sessions share one pooled :class:`HttpClient`. The report gives, per
+journey, sessions, requests, throughput and p50/p95/p99 request latency;
+latency only counts 2xx responses. Non-2xx responses and requests that got
+no response at all (refused, reset or timed out) are counted apart as
+errors.
+
+The server rate-limits per client address (``RATE_LIMIT_MAX_REQUESTS``
+per 15 minutes, 20 ``/api/auth`` calls for the auth limiter), taken from
+the first ``X-Forwarded-For`` entry. Each session therefore sends its own
+address from the 198.18.0.0/15 benchmarking range, so the limiter sees
+many clients instead of one that gets 429s after 20 logins.
+"""
+import argparse
+import asyncio
+import ipaddress
+import json
+import math
+import random
+import re
+import time
+
+from .bench import Histogram, stub_handler
+from .cachecheck import PAGE_REQUESTS
+from .datagen import PASSWORD, user_email
+from .http import HttpClient, HttpError, server_url, start_server
+from .runner import SEEDED_USERS
+from .steps import feature_steps
+from .stream import iter_features
+
+PRIORITY_WEIGHTS = {'high': 3, 'medium': 2, 'low': 1}
+
+# Category multipliers on top of the priority weights.
+SCENARIOS = {
+    'mixed': {},
+    'autosave': {'Prediction System': 20, 'Home Page': 3},
+    'leaderboard': {'Standings': 20, 'Home Page': 5, 'Statistics': 3},
+}
+
+# RFC 2544 benchmarking range: one address per session, for the per-IP limiters.
+CLIENT_NETWORK = ipaddress.ip_network('198.18.0.0/15')
+
+LOGIN = 'login'
+REQUEST = 'request'
+PAGE = 'page'
+SAVE = 'save'
+
+STEP_RULES = [
+    (re.compile(r'^Login as\b'), lambda m: (LOGIN,)),
+    (re.compile(r'^Navigate to (/[^\s,]*)'), lambda m: (PAGE, m.group(1))),
+    (re.compile(r'^Reload page'), lambda m: (PAGE, None)),
+    (re.compile(r'^(GET|POST|PUT|DELETE) (/api/\S+)$'), lambda m: (REQUEST, m.group(1), m.group(2))),
+    (re.compile(r'(?i)^(change|enter|update|modify|edit)\b.*\b(score|prediction)s?\b'), lambda m: (SAVE,)),
+    (re.compile(r'(?i)^(search for|enter name in search)'),
+     lambda m: (REQUEST, 'GET', '/api/standings/individual?limit=50&offset=0&search=jo')),
+    (re.compile(r'(?i)^click page (\d+)'),
+     lambda m: (REQUEST, 'GET', f'/api/standings/individual?limit=50&offset={(int(m.group(1)) - 1) * 50}')),
+]
+
+
+def compile_journey(feature):
+    """The feature's steps as a list of actions; think-time steps are dropped."""
+    actions = []
+    for step in feature_steps(feature):
+        for pattern, build in STEP_RULES:
+            match = pattern.search(step)
+            if match:
+                actions.append(build(match))
+                break
+    if not any(action[0] != LOGIN for action in actions):
+        return []
+    # The prediction page and the save endpoint need a session.
+    needs_auth = any(a[0] == SAVE or (a[0] == PAGE and a[1] == '/my-prediction') for a in actions)
+    if needs_auth and actions[0][0] != LOGIN:
+        actions.insert(0, (LOGIN,))
+    return actions
+
+
+class Journey:
+    __slots__ = ('id', 'name', 'actions', 'weight', 'latencies', 'sessions', 'failed', 'requests', 'errors')
+
+    def __init__(self, feature, actions, weight):
+        self.id = feature['id']
+        self.name = feature['description']
+        self.actions = actions
+        self.weight = weight
+        self.latencies = []
+        self.sessions = self.failed = self.requests = self.errors = 0
+
+
+def build_journeys(features, scenario='mixed', weights=None):
+    multipliers = {**SCENARIOS[scenario], **(weights or {})}
+    journeys = []
+    for feature in features:
+        actions = compile_journey(feature)
+        if not actions:
+            continue
+        weight = PRIORITY_WEIGHTS.get(feature.get('priority'), 1)
+        weight *= multipliers.get(str(feature['id']), multipliers.get(feature['category'], 1))
+        if weight > 0:
+            journeys.append(Journey(feature, actions, weight))
+    return journeys
+
+
+def arrival_rate(pattern, t, duration, peak, base):
+    if pattern == 'constant':
+        return peak
+    if pattern == 'ramp':
+        return peak * t / duration
+    if pattern == 'spike':
+        return peak if 0.45 * duration <= t < 0.55 * duration else base
+    if pattern == 'deadline':
+        # Doubles every tenth of the run, reaching peak at the deadline.
+        return base + (peak - base) * math.exp((t - duration) / duration * 10 * math.log(2))
+    raise ValueError(f'unknown arrival pattern {pattern!r}')
+
+
+def arrivals(pattern, duration, peak, base=None, seed=0):
+    """Session start times in ``[0, duration)`` for the pattern, by thinning a rate-``peak`` process."""
+    rng = random.Random(seed)
+    base = peak / 10 if base is None else base
+    t = 0.0
+    while True:
+        t += rng.expovariate(peak)
+        if t >= duration:
+            return
+        if rng.random() * peak < arrival_rate(pattern, t, duration, peak, base):
+            yield t
+
+
+class Credentials:
+    def __init__(self, users=0):
+        self.users = users
+        self.next = 0
+
+    def take(self):
+        if not self.users:
+            return SEEDED_USERS['user']
+        index, self.next = self.next, (self.next + 1) % self.users
+        return user_email(index), PASSWORD
+
+
+class LoadRun:
+    def __init__(self, client, journeys, credentials, think_ms=500.0, match_ids=None, seed=0):
+        self.client = client
+        self.journeys = journeys
+        self.credentials = credentials
+        self.think = think_ms / 1000
+        self.match_ids = match_ids or list(range(1, 73))
+        self.random = random.Random(seed)
+        self.active = self.peak_active = 0
+        self.sessions = 0
+        self.rejected = 0         # answered, but not 2xx
+        self.unanswered = 0       # connection refused, reset or timed out
+        self.reads = []
+        self.writes = []
+
+    async def _send(self, journey, method, path, headers, json=None):
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, json=json, headers=headers)
+        except (HttpError, OSError, asyncio.TimeoutError):
+            journey.errors += 1
+            self.unanswered += 1
+            return None
+        ms = (time.perf_counter() - started) * 1000
+        journey.requests += 1
+        if not response.ok:
+            # A 429 or 401 answers fast and would flatter the percentiles.
+            journey.errors += 1
+            self.rejected += 1
+            return response
+        journey.latencies.append(ms)
+        (self.reads if method == 'GET' else self.writes).append(ms)
+        return response
+
+    def client_address(self):
+        """A fresh ``X-Forwarded-For`` address for the next session."""
+        self.sessions += 1
+        return str(CLIENT_NETWORK[self.sessions % CLIENT_NETWORK.num_addresses])
+
+    async def session(self, journey):
+        journey.sessions += 1
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+        address = self.client_address()
+        headers, last_page = {'X-Forwarded-For': address}, None
+        try:
+            for action in journey.actions:
+                kind = action[0]
+                if kind == LOGIN:
+                    identifier, password = self.credentials.take()
+                    response = await self._send(journey, 'POST', '/api/auth/login', headers,
+                                                {'identifier': identifier, 'password': password})
+                    if response is None or not response.ok:
+                        journey.failed += 1
+                        return
+                    headers = {'X-Forwarded-For': address,
+                               'Authorization': f"Bearer {response.json()['accessToken']}"}
+                    continue
+                if kind == PAGE:
+                    last_page = action[1] or last_page
+                    requests = [r.partition(' ') for r in PAGE_REQUESTS.get(last_page, ())]
+                    await asyncio.gather(*(self._send(journey, m, p, headers) for m, _, p in requests))
+                elif kind == SAVE:
+                    body = {'matchId': self.random.choice(self.match_ids),
+                            'homeScore': self.random.randint(0, 4), 'awayScore': self.random.randint(0, 4)}
+                    await self._send(journey, 'POST', '/api/predictions', headers, body)
+                else:
+                    await self._send(journey, action[1], action[2], headers)
+                if self.think:
+                    await asyncio.sleep(self.random.expovariate(1 / self.think))
+        finally:
+            self.active -= 1
+
+    async def run(self, starts, max_sessions=None):
+        weights = [j.weight for j in self.journeys]
+        slots = asyncio.Semaphore(max_sessions) if max_sessions else None
+        tasks = []
+        began = time.monotonic()
+
+        async def guarded(journey):
+            if slots is None:
+                return await self.session(journey)
+            async with slots:
+                return await self.session(journey)
+
+        for at in starts:
+            delay = began + at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            journey = self.random.choices(self.journeys, weights)[0]
+            tasks.append(asyncio.ensure_future(guarded(journey)))
+        await asyncio.gather(*tasks)
+        return time.monotonic() - began
+
+
+def _percentiles(samples):
+    histogram = Histogram()
+    histogram.samples = sorted(samples)
+    return {f'p{p}_ms': round(histogram.percentile(p), 2) for p in (50, 95, 99)}
+
+
+def report(run, elapsed):
+    journeys = []
+    for j in sorted(run.journeys, key=lambda j: -j.requests):
+        if not j.sessions:
+            continue
+        journeys.append({'id': j.id, 'journey': j.name, 'sessions': j.sessions, 'failed': j.failed,
+                         'requests': j.requests, 'errors': j.errors,
+                         'rps': round(j.requests / elapsed, 1) if elapsed else math.nan,
+                         **_percentiles(j.latencies)})
+    total = len(run.reads) + len(run.writes)
+    return {
+        'elapsed_s': round(elapsed, 2),
+        'requests': total + run.rejected + run.unanswered,
+        'errors': run.rejected + run.unanswered,
+        'non_2xx': run.rejected,
+        'unanswered': run.unanswered,
+        'rps': round((total + run.rejected + run.unanswered) / elapsed, 1) if elapsed else math.nan,
+        'peak_sessions': run.peak_active,
+        'reads': {'count': len(run.reads), **_percentiles(run.reads)},
+        'writes': {'count': len(run.writes), **_percentiles(run.writes)},
+        'journeys': journeys,
+    }
+
+
+def _raise_fd_limit():
+    # Thousands of sessions need thousands of sockets; lift the soft limit.
+    try:
+        import resource
+    except ImportError:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = 65536 if hard == resource.RLIM_INFINITY else hard
+    if soft != resource.RLIM_INFINITY and soft < wanted:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
+
+
+async def _match_ids(client):
+    try:
+        response = await client.get('/api/matches')
+    except (HttpError, OSError, asyncio.TimeoutError):
+        return None
+    matches = (response.json() or {}).get('matches') if response.ok else None
+    return [m['id'] for m in matches if 'id' in m] if matches else None
+
+
+async def run_load(journeys, base_url, starts, connections=1000, users=0, think_ms=500.0, max_sessions=None,
+                   stub_delay=None, event_code='internal', seed=0):
+    server = None
+    if base_url is None:
+        server = await start_server(stub_handler(stub_delay if stub_delay is not None else 5.0))
+        base_url = server_url(server)
+    try:
+        async with HttpClient(base_url, max_connections=connections, headers={'X-Event-Code': event_code}) as client:
+            run = LoadRun(client, journeys, Credentials(users), think_ms, await _match_ids(client), seed)
+            elapsed = await run.run(starts, max_sessions)
+            return report(run, elapsed)
+    finally:
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive virtual-user journeys built from the catalogue.")
+    parser.add_argument('--catalogue', default='feature_list.json')
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--api', help="server base URL, e.g. http://localhost:5000")
+    target.add_argument('--stub', action='store_true', help="drive an in-process stub instead of a server")
+    parser.add_argument('--stub-delay', type=float, default=5.0, help="stub latency in ms (default: %(default)s)")
+    parser.add_argument('--scenario', choices=sorted(SCENARIOS), default='mixed')
+    parser.add_argument('--weight', action='append', default=[], metavar='CATEGORY|ID=W',
+                        help="multiply the weight of a category or case (repeatable; 0 disables)")
+    parser.add_argument('--category', action='append', help="only journeys from this category (repeatable)")
+    parser.add_argument('--pattern', choices=['constant', 'ramp', 'spike', 'deadline'], default='deadline')
+    parser.add_argument('--duration', type=float, default=60.0, help="seconds of arrivals")
+    parser.add_argument('--peak', type=float, default=200.0, help="peak session arrivals per second")
+    parser.add_argument('--base', type=float, help="off-peak arrivals per second (default: peak / 10)")
+    parser.add_argument('--think', type=float, default=500.0, help="mean think time between steps, ms")
+    parser.add_argument('--connections', type=int, default=1000, help="HTTP connection pool size")
+    parser.add_argument('--max-sessions', type=int, help="cap on concurrently active sessions")
+    parser.add_argument('--users', type=int, default=0,
+                        help="log in as the first N datagen load users instead of the seeded user "
+                             "(required for --scenario autosave against --api)")
+    parser.add_argument('--event-code', default='internal')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', dest='json_out', help="also write the report to this file")
+    args = parser.parse_args(argv)
+    if not args.api and not args.stub:
+        parser.error("one of --api or --stub is required")
+    if args.api and args.scenario == 'autosave' and not args.users:
+        # Every session would overwrite the seeded user's predictions: one row, not a write storm.
+        parser.error("--scenario autosave needs --users N (load the datagen users with "
+                     "'generate --data' first); otherwise every session saves as the seeded user")
+
+    weights = {}
+    for value in args.weight:
+        key, sep, weight = value.rpartition('=')
+        if not sep:
+            parser.error(f'expected CATEGORY=W or ID=W, got {value!r}')
+        weights[key] = float(weight)
+    features = iter_features(args.catalogue, lambda f: not args.category or f['category'] in args.category)
+    journeys = build_journeys(features, args.scenario, weights)
+    if not journeys:
+        parser.error("no catalogue case compiles to an HTTP journey")
+
+    _raise_fd_limit()
+    starts = arrivals(args.pattern, args.duration, args.peak, args.base, args.seed)
+    result = asyncio.run(run_load(journeys, None if args.stub else args.api, starts, args.connections, args.users,
+                                  args.think, args.max_sessions, args.stub_delay, args.event_code, args.seed))
+
+    print(f"{result['requests']} requests in {result['elapsed_s']}s ({result['rps']} req/s), "
+          f"{result['errors']} errors ({result['non_2xx']} non-2xx responses, {result['unanswered']} with no "
+          f"response), peak {result['peak_sessions']} concurrent sessions")
+    for kind in ('reads', 'writes'):
+        r = result[kind]
+        print(f"  {kind:<6} {r['count']:>8}  p50 {r['p50_ms']:>8} ms  p95 {r['p95_ms']:>8} ms  p99 {r['p99_ms']:>8} ms")
+    for j in result['journeys']:
+        print(f"#{j['id']:<4} {j['sessions']:>6} sessions {j['requests']:>7} req {j['rps']:>8} req/s  "
+              f"p95 {j['p95_ms']:>8} ms  p99 {j['p99_ms']:>8} ms  err {j['errors']:>4}  {j['journey'][:50]}")
+    if args.json_out:
+        with open(args.json_out, 'w') as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,301 @@
+"""Typed records, schema validation and a compact column file for the catalogue.
+
+``feature_list.json`` has existed in two shapes: the generator's
+``{"project", "categories", "features": [...]}`` wrapper with
+``test_steps``, and an older bare list whose features use ``steps``.
+:func:`normalize_feature` folds both into one record shape and
+:func:`validate_feature` checks it against :data:`SCHEMA`; every load and
+write in this module goes through both.
+
+The binary form (``.fcat``) stores the catalogue column-wise: ids,
+interned category and priority codes, a passes bitmap and a de-duplicated
+string table that descriptions and steps index into. Steps repeat heavily
+("Navigate to /statistics" opens 15 cases), so the file is a fraction of
+the pretty-printed JSON and loads without a JSON parse per feature. It is
+an export format for ``convert``: the toolchain reads and updates the JSON
+catalogue only, so an ``.fcat`` is a point-in-time copy.
+"""
+import argparse
+import enum
+import json
+import struct
+import sys
+import zlib
+from array import array
+from dataclasses import dataclass, field
+
+MAGIC = b'FCAT'
+FORMAT_VERSION = 1
+
+
+class CatalogueError(ValueError):
+    pass
+
+
+class Priority(enum.IntEnum):
+    HIGH = 0
+    MEDIUM = 1
+    LOW = 2
+
+    @property
+    def label(self):
+        return self.name.lower()
+
+    @classmethod
+    def parse(cls, value):
+        if isinstance(value, cls):
+            return value
+        try:
+            return cls[str(value).upper()]
+        except KeyError:
+            raise CatalogueError(f'unknown priority {value!r}') from None
+
+
+# field -> (accepted types, required). Anything else on a feature is an
+# optional extra (perf_budget, fixtures, ...) and must be JSON-serialisable.
+SCHEMA = {
+    'id': ((int,), True),
+    'category': ((str,), True),
+    'description': ((str,), True),
+    'priority': ((str,), True),
+    'test_steps': ((list, tuple), True),
+    'passes': ((bool,), True),
+}
+
+
+@dataclass(slots=True)
+class Feature:
+    id: int
+    category: str
+    description: str
+    priority: Priority
+    test_steps: tuple
+    passes: bool = False
+    extras: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data):
+        data = normalize_feature(data)
+        validate_feature(data)
+        extras = {k: v for k, v in data.items() if k not in SCHEMA}
+        return cls(data['id'], sys.intern(data['category']), data['description'],
+                   Priority.parse(data['priority']), tuple(data['test_steps']), data['passes'], extras)
+
+    def to_dict(self):
+        data = {
+            'id': self.id,
+            'category': self.category,
+            'description': self.description,
+            'priority': self.priority.label,
+            'test_steps': list(self.test_steps),
+        }
+        data.update(self.extras)
+        data['passes'] = self.passes
+        return data
+
+
+def normalize_feature(data):
+    """Return ``data`` in the current record shape (legacy ``steps`` -> ``test_steps``)."""
+    if 'steps' in data and 'test_steps' not in data:
+        data = {('test_steps' if k == 'steps' else k): v for k, v in data.items()}
+    if 'passes' not in data:
+        data = {**data, 'passes': False}
+    return data
+
+
+def validate_feature(data):
+    where = f"feature {data.get('id', '?')}"
+    for name, (types, required) in SCHEMA.items():
+        if name not in data:
+            if required:
+                raise CatalogueError(f'{where}: missing {name!r}')
+            continue
+        value = data[name]
+        # bool is an int subclass; don't let True pass as an id.
+        if not isinstance(value, types) or (name == 'id' and isinstance(value, bool)):
+            raise CatalogueError(f'{where}: {name!r} has type {type(value).__name__}')
+    if data['id'] < 1:
+        raise CatalogueError(f'{where}: id must be positive')
+    if not data['category'] or not data['description']:
+        raise CatalogueError(f'{where}: empty category or description')
+    Priority.parse(data['priority'])
+    if not all(isinstance(step, str) for step in data['test_steps']):
+        raise CatalogueError(f'{where}: test_steps must be strings')
+    # The column format separates strings with NUL.
+    if '\0' in data['description'] or any('\0' in step for step in data['test_steps']):
+        raise CatalogueError(f'{where}: NUL character in description or test_steps')
+
+
+class Catalogue:
+    """Header fields plus validated :class:`Feature` records."""
+
+    def __init__(self, features, header=None):
+        self.features = list(features)
+        self.header = dict(header or {})
+        seen = set()
+        for feature in self.features:
+            if feature.id in seen:
+                raise CatalogueError(f'duplicate feature id {feature.id}')
+            seen.add(feature.id)
+
+    @classmethod
+    def from_document(cls, document):
+        """Build from either JSON shape: the wrapper dict or a bare feature list."""
+        if isinstance(document, list):
+            document = {'features': document}
+        if not isinstance(document, dict) or not isinstance(document.get('features'), list):
+            raise CatalogueError('catalogue must be a feature list or an object with a "features" list')
+        header = {k: v for k, v in document.items() if k != 'features'}
+        return cls((Feature.from_dict(f) for f in document['features']), header)
+
+    def to_document(self):
+        return {**self.header, 'features': [f.to_dict() for f in self.features]}
+
+
+def _le(arr):
+    # Column files are little-endian regardless of the host.
+    if sys.byteorder == 'big':
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _from_le(typecode, data):
+    arr = array(typecode)
+    arr.frombytes(data)
+    if sys.byteorder == 'big':
+        arr.byteswap()
+    return arr
+
+
+class _Strings:
+    def __init__(self):
+        self.index = {}
+        self.values = []
+
+    def add(self, value):
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+def dumps_binary(catalogue):
+    strings = _Strings()
+    categories = _Strings()
+    ids, category_codes, priorities = array('I'), array('H'), array('B')
+    descriptions, step_offsets, step_codes, extras = array('I'), array('I', [0]), array('I'), array('I')
+    passes = bytearray((len(catalogue.features) + 7) // 8)
+    for n, feature in enumerate(catalogue.features):
+        validate_feature(feature.to_dict())
+        ids.append(feature.id)
+        category_codes.append(categories.add(feature.category))
+        priorities.append(int(feature.priority))
+        descriptions.append(strings.add(feature.description))
+        step_codes.extend(strings.add(step) for step in feature.test_steps)
+        step_offsets.append(len(step_codes))
+        extras.append(strings.add(json.dumps(feature.extras, sort_keys=True)) if feature.extras else 0xFFFFFFFF)
+        if feature.passes:
+            passes[n // 8] |= 1 << (n % 8)
+
+    blob = '\0'.join(strings.values).encode('utf-8')
+    meta = json.dumps({'header': catalogue.header, 'categories': categories.values}).encode('utf-8')
+    sections = [meta, _le(ids), _le(category_codes), _le(priorities), bytes(passes),
+                _le(descriptions), _le(step_offsets), _le(step_codes), _le(extras), zlib.compress(blob)]
+    body = struct.pack('<I', len(catalogue.features)) + b''.join(
+        struct.pack('<I', len(s)) + s for s in sections)
+    return MAGIC + struct.pack('<HI', FORMAT_VERSION, zlib.crc32(body)) + body
+
+
+def loads_binary(data):
+    if data[:4] != MAGIC:
+        raise CatalogueError('not a catalogue column file')
+    version, crc = struct.unpack_from('<HI', data, 4)
+    if version != FORMAT_VERSION:
+        raise CatalogueError(f'unsupported column file version {version}')
+    body = memoryview(data)[10:]
+    if zlib.crc32(body) != crc:
+        raise CatalogueError('column file checksum mismatch')
+    count, = struct.unpack_from('<I', body, 0)
+    pos, sections = 4, []
+    while pos < len(body):
+        size, = struct.unpack_from('<I', body, pos)
+        sections.append(bytes(body[pos + 4:pos + 4 + size]))
+        pos += 4 + size
+    if len(sections) != 10:
+        raise CatalogueError('truncated column file')
+    meta = json.loads(sections[0])
+    ids = _from_le('I', sections[1])
+    category_codes = _from_le('H', sections[2])
+    priorities = _from_le('B', sections[3])
+    passes = sections[4]
+    descriptions = _from_le('I', sections[5])
+    step_offsets = _from_le('I', sections[6])
+    step_codes = _from_le('I', sections[7])
+    extras = _from_le('I', sections[8])
+    strings = zlib.decompress(sections[9]).decode('utf-8').split('\0')
+    categories = [sys.intern(c) for c in meta['categories']]
+    if not (len(ids) == len(category_codes) == len(priorities) == len(descriptions) == len(extras) == count
+            and len(step_offsets) == count + 1 and len(passes) == (count + 7) // 8):
+        raise CatalogueError('column lengths disagree')
+
+    features = []
+    try:
+        for n in range(count):
+            steps = tuple(strings[c] for c in step_codes[step_offsets[n]:step_offsets[n + 1]])
+            features.append(Feature(ids[n], categories[category_codes[n]], strings[descriptions[n]],
+                                    Priority(priorities[n]), steps, bool(passes[n // 8] >> (n % 8) & 1),
+                                    json.loads(strings[extras[n]]) if extras[n] != 0xFFFFFFFF else {}))
+    except (IndexError, ValueError) as exc:
+        raise CatalogueError(f'corrupt column file: {exc}') from None
+    return Catalogue(features, meta['header'])
+
+
+def load(path):
+    """Load a catalogue from JSON (either shape) or a column file, validating it."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data[:4] == MAGIC:
+        return loads_binary(data)
+    try:
+        document = json.loads(data)
+    except ValueError as exc:
+        raise CatalogueError(f'{path}: {exc}') from None
+    return Catalogue.from_document(document)
+
+
+def save(path, catalogue):
+    """Write ``catalogue`` as a column file (``.fcat``) or JSON, by extension."""
+    from .stream import atomic_writer, write_catalogue
+    if path.endswith('.fcat'):
+        data = dumps_binary(catalogue)
+        with atomic_writer(path, binary=True) as f:
+            f.write(data)
+        return
+    write_catalogue(path, {**catalogue.header, 'features': (f.to_dict() for f in catalogue.features)})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate or convert the feature catalogue.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    check = sub.add_parser('validate', help="check a catalogue against the schema")
+    check.add_argument('path')
+    convert = sub.add_parser('convert', help="convert between JSON and the .fcat column format")
+    convert.add_argument('source')
+    convert.add_argument('target')
+    args = parser.parse_args(argv)
+
+    try:
+        catalogue = load(args.source if args.command == 'convert' else args.path)
+    except CatalogueError as exc:
+        sys.exit(f'invalid catalogue: {exc}')
+    if args.command == 'validate':
+        print(f'{args.path}: {len(catalogue.features)} valid features')
+    else:
+        save(args.target, catalogue)
+        print(f'Wrote {len(catalogue.features)} features to {args.target}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,383 @@
+"""Record/replay stand-in for API-Football.
+
+``server/src/services/footballApiService.ts`` calls ``/fixtures``,
+``/standings``, ``/teams`` and ``/players/top*`` on a quota-limited API
+(100 requests a day on the free tier). This proxy answers those calls from
+a cassette on disk, so the "API Integration" cases can run offline and in
+parallel, and the sync path can be load-tested without spending quota.
+Point the server at it with ``FOOTBALL_API_BASE_URL=http://127.0.0.1:PORT``;
+the proxy's own upstream comes from ``--upstream`` or
+``FOOTBALL_API_UPSTREAM``, never from that variable, so it cannot end up
+forwarding to itself.
+
+A cassette is a directory with three files. ``responses.dat`` is an
+append-only log of recorded responses. ``responses.idx`` is a sorted
+array of fixed-size ``(request digest, offset, length)`` entries. Both are
+memory-mapped, so a lookup is a binary search over the index plus one
+slice of the log, and nothing is parsed until a response is served.
+Recording appends the new entry to a journal (``responses.jnl``), whose
+entries take precedence over the index. The journal is merged into the
+index when it grows past ``COMPACT_AFTER`` entries and when the cassette
+is closed.
+
+Modes: ``replay`` serves only recorded responses (a miss is a 404),
+``record`` always forwards upstream and stores the answer, ``auto``
+replays and records on a miss. Concurrent misses for the same request are
+coalesced into one upstream call. ``--latency``/``--jitter`` delay every
+answer, ``--rate`` throttles with a token bucket and ``--quota`` emulates
+the daily limit; both answer 429 like the real API does.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import mmap
+import os
+import random
+import struct
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from .http import HttpClient, HttpError, start_server, server_url
+from .stream import atomic_writer
+
+DEFAULT_UPSTREAM = 'https://v3.football.api-sports.io'
+ENDPOINTS = ('/fixtures', '/standings', '/teams', '/players/topscorers', '/players/topcards')
+API_KEY_HEADER = 'x-apisports-key'
+INDEX_ENTRY = struct.Struct('<16sQI')
+COMPACT_AFTER = 1024
+RECORD_HEAD = struct.Struct('<HI')
+# Upstream headers worth replaying; everything else (dates, cookies, the
+# live quota counters) is either noise or regenerated by the proxy.
+KEPT_HEADERS = ('content-type',)
+# Upstream failures the proxy answers with 502 instead of dropping the connection.
+UPSTREAM_ERRORS = (HttpError, OSError, asyncio.TimeoutError)
+
+
+def request_key(method, target):
+    """Canonical form of a request: method, path and sorted query parameters."""
+    parts = urlsplit(target)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return f'{method.upper()} {parts.path}' + (f'?{query}' if query else '')
+
+
+def _digest(key):
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+
+
+class Cassette:
+    """Memory-mapped store of recorded responses, keyed by :func:`request_key`."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.data_path = os.path.join(directory, 'responses.dat')
+        self.index_path = os.path.join(directory, 'responses.idx')
+        self.journal_path = os.path.join(directory, 'responses.jnl')
+        self._data = self._index = b''
+        self._journal = {}
+        self._open()
+
+    def _open(self):
+        self.close_maps()
+        self._data = self._map(self.data_path)
+        self._index = self._map(self.index_path)
+        self._journal = {}
+        try:
+            with open(self.journal_path, 'rb') as f:
+                journal = f.read()
+        except FileNotFoundError:
+            journal = b''
+        # A torn last entry (crash mid-append) is ignored.
+        for i in range(0, len(journal) - INDEX_ENTRY.size + 1, INDEX_ENTRY.size):
+            digest, offset, length = INDEX_ENTRY.unpack_from(journal, i)
+            self._journal[digest] = (offset, length)
+
+    @staticmethod
+    def _map(path):
+        try:
+            with open(path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return b''
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return b''
+
+    def close_maps(self):
+        for mapped in (self._data, self._index):
+            if isinstance(mapped, mmap.mmap):
+                mapped.close()
+        self._data = self._index = b''
+
+    def close(self):
+        """Merge the journal into the index and release the maps."""
+        if self._journal:
+            self.compact()
+        self.close_maps()
+
+    def _indexed(self):
+        return len(self._index) // INDEX_ENTRY.size
+
+    def __len__(self):
+        return self._indexed() + sum(1 for digest in self._journal if self._find(digest) is None)
+
+    def _find(self, digest):
+        size = INDEX_ENTRY.size
+        lo, hi = 0, self._indexed()
+        while lo < hi:
+            mid = (lo + hi) // 2
+            probe = self._index[mid * size:mid * size + 16]
+            if probe < digest:
+                lo = mid + 1
+            elif probe > digest:
+                hi = mid
+            else:
+                return mid
+        return None
+
+    def _locate(self, digest):
+        located = self._journal.get(digest)
+        if located is not None:
+            return located
+        slot = self._find(digest)
+        if slot is None:
+            return None
+        return INDEX_ENTRY.unpack_from(self._index, slot * INDEX_ENTRY.size)[1:]
+
+    def _record(self, offset, length):
+        status, meta_length = RECORD_HEAD.unpack_from(self._data, offset)
+        start = offset + RECORD_HEAD.size
+        meta = json.loads(self._data[start:start + meta_length])
+        return status, meta, self._data[start + meta_length:offset + length]
+
+    def get(self, key):
+        """Return ``(status, headers, body)`` recorded for ``key``, or ``None``."""
+        located = self._locate(_digest(key))
+        if located is None:
+            return None
+        status, meta, body = self._record(*located)
+        return status, meta['headers'], bytes(body)
+
+    def _entries(self):
+        entries = {self._index[i:i + 16]: INDEX_ENTRY.unpack_from(self._index, i)[1:]
+                   for i in range(0, len(self._index), INDEX_ENTRY.size)}
+        entries.update(self._journal)
+        return entries
+
+    def entries(self):
+        """Yield ``(key, status, body size)`` for every recorded response."""
+        for digest, (offset, length) in sorted(self._entries().items()):
+            status, meta, body = self._record(offset, length)
+            yield meta['key'], status, len(body)
+
+    def put(self, key, status, headers, body):
+        """Append a response and its journal entry; a later put for ``key`` wins."""
+        os.makedirs(self.directory, exist_ok=True)
+        meta = json.dumps({'key': key, 'headers': headers, 'recorded': int(time.time())}).encode('utf-8')
+        record = RECORD_HEAD.pack(status, len(meta)) + meta + body
+        with open(self.data_path, 'ab') as f:
+            offset = f.tell()
+            f.write(record)
+        digest = _digest(key)
+        fd = os.open(self.journal_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, INDEX_ENTRY.pack(digest, offset, len(record)))
+        finally:
+            os.close(fd)
+        self._journal[digest] = (offset, len(record))
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._data = self._map(self.data_path)
+        if len(self._journal) >= COMPACT_AFTER:
+            self.compact()
+
+    def compact(self):
+        """Rewrite the sorted index with the journal merged in, then drop the journal."""
+        entries = self._entries()
+        with atomic_writer(self.index_path, binary=True) as f:
+            f.write(b''.join(INDEX_ENTRY.pack(digest, *entries[digest]) for digest in sorted(entries)))
+        # Replaying a journal that survived a crash here is harmless: its entries are already indexed.
+        try:
+            os.unlink(self.journal_path)
+        except FileNotFoundError:
+            pass
+        self._open()
+
+
+class TokenBucket:
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def take(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class ReplayProxy:
+    """Request handler for :func:`feature_catalogue.http.start_server`."""
+
+    def __init__(self, cassette, mode='replay', upstream=None, api_key=None,
+                 latency_ms=0.0, jitter_ms=0.0, rate=None, quota=None, seed=None):
+        if mode not in ('replay', 'record', 'auto'):
+            raise ValueError(f'unknown mode {mode!r}')
+        self.cassette = cassette
+        self.mode = mode
+        self.upstream = upstream
+        self.api_key = api_key
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.bucket = TokenBucket(rate) if rate else None
+        self.quota = quota
+        self.random = random.Random(seed)
+        self.stats = {'hits': 0, 'misses': 0, 'recorded': 0, 'throttled': 0}
+        self._pending = {}
+
+    def _quota_headers(self):
+        if self.quota is None:
+            return {}
+        served = self.stats['hits'] + self.stats['recorded']
+        return {'x-ratelimit-requests-limit': str(self.quota),
+                'x-ratelimit-requests-remaining': str(max(0, self.quota - served))}
+
+    async def __call__(self, method, target, headers, body):
+        path = urlsplit(target).path
+        if path not in ENDPOINTS:
+            return 404, {}, {'errors': {'endpoint': f'{path} is not proxied'}, 'response': []}
+        if self.bucket is not None and not self.bucket.take():
+            self.stats['throttled'] += 1
+            return 429, {}, {'errors': {'rateLimit': 'Too many requests'}, 'response': []}
+        if self.quota is not None and self.stats['hits'] + self.stats['recorded'] >= self.quota:
+            self.stats['throttled'] += 1
+            return 429, self._quota_headers(), {
+                'errors': {'requests': 'You have reached the request limit for the day'}, 'response': []}
+
+        if self.latency or self.jitter:
+            await asyncio.sleep(self.latency + self.random.uniform(0, self.jitter))
+
+        key = request_key(method, target)
+        recorded = None if self.mode == 'record' else self.cassette.get(key)
+        if recorded is not None:
+            self.stats['hits'] += 1
+            status, kept, payload = recorded
+            return status, {**kept, **self._quota_headers(), 'X-Cassette': 'hit'}, payload
+        if self.mode == 'replay':
+            self.stats['misses'] += 1
+            return 404, {'X-Cassette': 'miss'}, {'errors': {'cassette': f'no recording for {key}'}, 'response': []}
+
+        try:
+            status, kept, payload = await self._record(key, method, target, headers)
+        except UPSTREAM_ERRORS as exc:
+            return 502, {}, {'errors': {'upstream': f'{type(exc).__name__}: {exc}'}, 'response': []}
+        return status, {**kept, **self._quota_headers(), 'X-Cassette': 'recorded'}, payload
+
+    async def _record(self, key, method, target, headers):
+        # Coalesce concurrent misses for one request into a single upstream call.
+        pending = self._pending.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        future = self._pending[key] = asyncio.get_running_loop().create_future()
+        try:
+            api_key = headers.get(API_KEY_HEADER) or self.api_key
+            response = await self.upstream.request(method, target, headers={API_KEY_HEADER: api_key} if api_key else None)
+            kept = {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers}
+            if response.ok:
+                self.cassette.put(key, response.status, kept, response.body)
+                self.stats['recorded'] += 1
+            result = response.status, kept, response.body
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            future.exception()  # mark retrieved when nobody else was waiting
+            raise
+        finally:
+            del self._pending[key]
+
+
+def import_response(cassette, target, path, status=200):
+    """Store the JSON file at ``path`` as the response to ``GET target``."""
+    with open(path, 'rb') as f:
+        body = f.read()
+    json.loads(body)
+    cassette.put(request_key('GET', target), status, {'content-type': 'application/json'}, body)
+
+
+async def serve(args):
+    cassette = Cassette(args.cassette)
+    upstream = None
+    if args.mode != 'replay':
+        upstream = HttpClient(args.upstream, max_connections=4)
+    proxy = ReplayProxy(cassette, args.mode, upstream, args.api_key, args.latency, args.jitter,
+                        args.rate, args.quota, args.seed)
+    server = await start_server(proxy, args.host, args.port)
+    print(f"Serving {len(cassette)} recorded responses from {args.cassette} "
+          f"at {server_url(server)} ({args.mode} mode)")
+    try:
+        await server.serve_forever()
+    except asyncio.CancelledError:
+        pass
+    finally:
+        server.close()
+        if upstream is not None:
+            await upstream.close()
+        cassette.close()
+        print(f"Stats: {proxy.stats}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record/replay proxy for the API-Football endpoints.")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run = sub.add_parser('serve', help="serve (and optionally record) the cassette over HTTP")
+    run.add_argument('cassette', help="cassette directory")
+    run.add_argument('--mode', choices=['replay', 'record', 'auto'], default='replay')
+    run.add_argument('--host', default='127.0.0.1')
+    run.add_argument('--port', type=int, default=5055)
+    run.add_argument('--upstream', default=os.environ.get('FOOTBALL_API_UPSTREAM', DEFAULT_UPSTREAM),
+                     help="real API the proxy forwards to (default: $FOOTBALL_API_UPSTREAM or %(default)s)")
+    run.add_argument('--api-key', default=os.environ.get('FOOTBALL_API_KEY'),
+                     help="used when the client sends no x-apisports-key (default: $FOOTBALL_API_KEY)")
+    run.add_argument('--latency', type=float, default=0.0, help="added delay per response, ms")
+    run.add_argument('--jitter', type=float, default=0.0, help="extra uniform random delay, ms")
+    run.add_argument('--rate', type=float, help="max requests per second before answering 429")
+    run.add_argument('--quota', type=int, help="daily request limit to emulate, e.g. 100")
+    run.add_argument('--seed', type=int, help="seed for the latency jitter")
+
+    add = sub.add_parser('import', help="store a saved JSON response in the cassette")
+    add.add_argument('cassette')
+    add.add_argument('target', help="request path and query, e.g. '/fixtures?league=1&season=2026'")
+    add.add_argument('file', help="JSON response body")
+
+    show = sub.add_parser('list', help="list the recorded requests")
+    show.add_argument('cassette')
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        try:
+            asyncio.run(serve(args))
+        except KeyboardInterrupt:
+            pass
+    elif args.command == 'import':
+        cassette = Cassette(args.cassette)
+        import_response(cassette, args.target, args.file)
+        print(f"Recorded {request_key('GET', args.target)} ({len(cassette)} responses in {args.cassette})")
+        cassette.close()
+    else:
+        cassette = Cassette(args.cassette)
+        for key, status, size in cassette.entries():
+            print(f"{status}  {size:>9} B  {key}")
+        cassette.close()
+
+
+if __name__ == '__main__':
+    main()
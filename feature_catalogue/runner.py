@@ -0,0 +1,378 @@
+"""Concurrent runner for the catalogue's ``test_steps``.
+
+Each step string is matched against a :class:`StepRegistry` of async
+handlers. A feature passes when every step matched a handler and none
+failed; if any step has no handler the feature is reported as
+``unsupported`` and its ``passes`` flag is left alone. Features run
+concurrently on one event loop, bounded by a global worker count and
+optional per-category limits.
+
+Two handler sets ship here. ``http`` drives the ``server/`` API, plus the
+client app for navigation steps. ``local`` is a stand-in that accepts
+every step after a fixed delay, for exercising the runner itself; its
+outcomes mean nothing, so it cannot write ``passes`` or run history.
+
+The ``http`` handlers cover logins, API sync, raw API calls and status
+checks. Navigating loads the page's API requests (as listed in
+:data:`feature_catalogue.coverage.PAGE_ENDPOINTS`), so a handful of
+``Verify`` steps can be checked against what the page received. Most
+catalogue steps describe UI interaction ("Click Save", "Verify layout
+stacks vertically") that needs a browser driver. Cases with such steps
+are reported ``unsupported``, which is most of the catalogue today.
+"""
+import argparse
+import asyncio
+import json
+import time
+from dataclasses import asdict, replace
+
+from . import trace
+from .http import HttpClient
+from .steps import (
+    ERROR, FAILED, PASSED, STEP_ERRORS, UNSUPPORTED,
+    FeatureResult, StepContext, StepFailed, StepRegistry, feature_steps,
+)
+from .stream import iter_features, update_passes
+
+# The API Integration cases hit the quota-limited external football API
+# through the server's sync endpoint, so they never run side by side. With
+# the server pointed at the replay proxy (feature_catalogue.replay) lift it
+# with ``--limit "API Integration=N"``.
+DEFAULT_CATEGORY_LIMITS = {'API Integration': 1}
+
+SEEDED_USERS = {
+    'admin': ('admin@wk2026.com', 'password123'),
+    'user': ('john.doe@wk2026.com', 'password123'),
+}
+
+
+def _expect(response, what):
+    if not response.ok:
+        raise StepFailed(f'{what}: HTTP {response.status}')
+    return response
+
+
+http_steps = StepRegistry()
+
+
+@http_steps.step(r'^Login as (?:an? )?(?P<who>admin|regular user|user)\b')
+async def login(ctx, who):
+    identifier, password = SEEDED_USERS['admin' if who.lower() == 'admin' else 'user']
+    response = _expect(await ctx.api.post('/api/auth/login', json={'identifier': identifier, 'password': password}),
+                       f'login as {who}')
+    ctx.state['token'] = response.json()['accessToken']
+    ctx.last_response = response
+
+
+def _page_requests(path):
+    from .coverage import PAGE_ENDPOINTS
+    return PAGE_ENDPOINTS.get(path.rstrip('/') or '/', ())
+
+
+@http_steps.step(r'^Navigate to (?P<path>/[^\s,]*)')
+async def navigate(ctx, path):
+    ctx.last_response = _expect(await ctx.app.get(path, headers=ctx.auth_headers()), f'GET {path}')
+    # The client shell always loads; what the page shows comes from its API requests.
+    loaded = {}
+    for spec in _page_requests(path):
+        method, target = spec.split(' ', 1)
+        loaded[target] = await ctx.api.request(method, target, headers=ctx.auth_headers())
+    ctx.state['page'] = loaded
+
+
+@http_steps.step(r'^Trigger API sync$')
+async def trigger_sync(ctx):
+    ctx.last_response = _expect(
+        await ctx.api.post('/api/admin/dashboard/sync', headers=ctx.auth_headers()), 'API sync')
+
+
+@http_steps.step(r'^(?P<method>GET|POST|PUT|DELETE) (?P<path>/api/\S+)$')
+async def api_call(ctx, method, path):
+    ctx.last_response = await ctx.api.request(method.upper(), path, headers=ctx.auth_headers())
+
+
+@http_steps.step(r'^Verify (?:response )?status (?:code )?(?:is )?(?P<code>\d{3})$')
+async def verify_status(ctx, code):
+    if ctx.last_response is None or ctx.last_response.status != int(code):
+        got = ctx.last_response.status if ctx.last_response else 'no response'
+        raise StepFailed(f'expected HTTP {code}, got {got}')
+
+
+def _page(ctx):
+    page = ctx.state.get('page')
+    if not page:
+        raise StepFailed('no page with known API requests was loaded')
+    return page
+
+
+@http_steps.step(r'^Verify (?:the )?(?:correct page|admin dashboard|page) loads$')
+async def verify_page_loads(ctx):
+    failed = [f'{target}: HTTP {response.status}' for target, response in _page(ctx).items() if not response.ok]
+    if failed:
+        raise StepFailed('; '.join(failed))
+
+
+@http_steps.step(r'^Verify (?:access denied|redirect to login page|cannot access protected routes|'
+                 r'forced to login again)\b')
+async def verify_access_denied(ctx):
+    statuses = sorted({response.status for response in _page(ctx).values()})
+    if not set(statuses) & {401, 403}:
+        raise StepFailed(f'page API answered {statuses}, expected 401 or 403')
+
+
+@http_steps.step(r'^Verify top (?P<n>\d+) users\b')
+async def verify_top_users(ctx, n):
+    response = next((r for target, r in _page(ctx).items() if target.startswith('/api/standings/individual')),
+                    None)
+    if response is None:
+        raise StepFailed('the page did not load individual standings')
+    rows = (_expect(response, 'individual standings').json() or {}).get('standings', [])
+    if not 0 < len(rows) <= int(n):
+        raise StepFailed(f'expected 1..{n} standings rows, got {len(rows)}')
+    if [row.get('rank') for row in rows] != list(range(1, len(rows) + 1)):
+        raise StepFailed('standings ranks are not 1..n')
+    if any(row.get('totalPoints') is None or not (row.get('username') or row.get('firstName')) for row in rows):
+        raise StepFailed('standings rows without a name or points')
+
+
+def local_steps(delay=0.01):
+    registry = StepRegistry()
+
+    @registry.step(r'.')
+    async def accept(ctx):
+        await asyncio.sleep(delay)
+
+    return registry
+
+
+async def run_feature(feature, registry, ctx, start=0):
+    """Run the feature's steps from index ``start`` onwards in ``ctx``."""
+    with trace.feature_span(feature) as span:
+        result = await _run_steps(feature, registry, ctx, start)
+        span.set('status', result.status)
+    return result
+
+
+async def _run_steps(feature, registry, ctx, start):
+    started = time.perf_counter()
+    steps = feature_steps(feature)
+    resolved = []
+    for index in range(start, len(steps)):
+        match = registry.match(steps[index])
+        if match is None:
+            return FeatureResult(feature['id'], feature['category'], UNSUPPORTED, 0.0, index,
+                                 f'no handler for step: {steps[index]}')
+        resolved.append((index, match))
+
+    for index, (handler, kwargs) in resolved:
+        try:
+            with trace.span(f'step {index + 1}: {steps[index]}', 'step'):
+                await handler(ctx, **kwargs)
+        except StepFailed as exc:
+            return FeatureResult(feature['id'], feature['category'], FAILED,
+                                 time.perf_counter() - started, index, str(exc))
+        except STEP_ERRORS as exc:
+            return FeatureResult(feature['id'], feature['category'], ERROR,
+                                 time.perf_counter() - started, index, f'{type(exc).__name__}: {exc}')
+    return FeatureResult(feature['id'], feature['category'], PASSED, time.perf_counter() - started)
+
+
+async def run_features(features, registry, make_context, workers=8, category_limits=None, on_result=None):
+    """Run ``features`` concurrently and return their results in input order.
+
+    ``make_context(feature)`` builds the :class:`StepContext` for each
+    feature. At most ``workers`` features run at once, and at most
+    ``category_limits[category]`` of any one category.
+    """
+    limits = {**DEFAULT_CATEGORY_LIMITS, **(category_limits or {})}
+    pool = asyncio.Semaphore(workers)
+    per_category = {}
+
+    async def run_one(feature):
+        category = feature['category']
+        if category not in per_category:
+            per_category[category] = asyncio.Semaphore(limits.get(category, workers))
+        async with per_category[category], pool:
+            result = await run_feature(feature, registry, make_context(feature))
+        if on_result is not None:
+            on_result(result)
+        return result
+
+    return await asyncio.gather(*(run_one(feature) for feature in features))
+
+
+def passes_from_results(results):
+    """Map feature id to its new ``passes`` value; unsupported/errored runs are left out."""
+    return {r.id: r.status == PASSED for r in results if r.status in (PASSED, FAILED)}
+
+
+def summarize(results):
+    summary = {}
+    for result in results:
+        summary[result.status] = summary.get(result.status, 0) + 1
+    return summary
+
+
+def _parse_limits(values):
+    limits = {}
+    for value in values:
+        category, sep, limit = value.rpartition('=')
+        if not sep or not limit.isdigit():
+            raise argparse.ArgumentTypeError(f'expected CATEGORY=N, got {value!r}')
+        limits[category] = int(limit)
+    return limits
+
+
+def select_features(path, ids=None, category=None, priority=None, failing=False):
+    def predicate(feature):
+        return ((not ids or feature['id'] in ids)
+                and (category is None or feature['category'] == category)
+                and (priority is None or feature['priority'] == priority)
+                and (not failing or not feature.get('passes')))
+    return list(iter_features(path, predicate))
+
+
+async def retry_failures(features, results, retries, run):
+    """Re-run failed/errored features that have retries left, one round per attempt.
+
+    ``retries`` maps feature id to the number of extra attempts it gets and
+    ``run(features)`` runs a batch. Returns ``(final results, all attempts)``;
+    every result carries its attempt number.
+    """
+    by_id = {f['id']: f for f in features}
+    final = {r.id: r for r in results}
+    attempts = list(results)
+    for attempt in range(2, max(retries.values(), default=0) + 2):
+        again = [by_id[r.id] for r in final.values()
+                 if r.status in (FAILED, ERROR) and retries.get(r.id, 0) >= attempt - 1]
+        if not again:
+            break
+        for result in await run(again):
+            result = replace(result, attempts=attempt)
+            attempts.append(result)
+            final[result.id] = result
+    return [final[r.id] for r in results], attempts
+
+
+async def _execute(args, features, registry, make_context, retries=None):
+    limits = _parse_limits(args.limit)
+    if not args.reuse_fixtures:
+        results = await run_features(features, registry, make_context, args.workers, limits, _report)
+    else:
+        from .scheduler import run_scheduled
+        results, stats = await run_scheduled(features, registry, make_context, args.workers, limits, _report,
+                                             scope=args.fixture_scope)
+        print(f"Fixture setups: {stats.fixture_setups} (vs {stats.naive_setups} without reuse)")
+    if not retries:
+        return results, results
+    # Retries run without fixture reuse: a flaky case gets a fresh session.
+    return await retry_failures(features, results, retries, lambda batch: run_features(
+        batch, registry, make_context, args.workers, limits, _report))
+
+
+async def _run_cli(args, features, retries=None):
+    if args.backend == 'local':
+        return await _execute(args, features, local_steps(args.delay), StepContext, retries)
+
+    async with HttpClient(args.api, max_connections=args.workers) as api, \
+            HttpClient(args.app, max_connections=args.workers) as app:
+        return await _execute(args, features, http_steps, lambda f: StepContext(f, api, app), retries)
+
+
+def _report(result):
+    retry = f' (attempt {result.attempts})' if result.attempts > 1 else ''
+    print(f"{result.status:>11}  #{result.id:<4} {result.duration * 1000:8.1f} ms  {result.message}{retry}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run catalogue test steps concurrently.")
+    parser.add_argument('--catalogue', default='feature_list.json')
+    parser.add_argument('--backend', choices=['http', 'local'], default='http')
+    parser.add_argument('--api', default='http://localhost:5000', help="server base URL (default: %(default)s)")
+    parser.add_argument('--app', default='http://localhost:3000', help="client base URL (default: %(default)s)")
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--limit', action='append', default=[], metavar='CATEGORY=N',
+                        help="per-category concurrency limit (repeatable)")
+    parser.add_argument('--reuse-fixtures', action='store_true',
+                        help="set up shared preamble steps (logins, syncs, navigation) once and reuse them")
+    parser.add_argument('--fixture-scope', choices=['run', 'worker'], default='run',
+                        help="share fixtures across the whole run or keep one cache per worker")
+    parser.add_argument('--delay', type=float, default=0.01, help="per-step delay of the local backend, seconds")
+    parser.add_argument('--id', type=int, action='append', dest='ids')
+    parser.add_argument('--category')
+    parser.add_argument('--priority', choices=['high', 'medium', 'low'])
+    parser.add_argument('--failing', action='store_true', help="only run features that do not pass yet")
+    parser.add_argument('--changed-since', metavar='REV',
+                        help="only run features affected by source changes since this git revision")
+    parser.add_argument('--history', action='store_true',
+                        help="record the run in the catalogue's run-history log, run likely failures and slow "
+                             "cases first and retry known-flaky cases")
+    parser.add_argument('--history-file', metavar='PATH', help="run-history log (default: next to the catalogue)")
+    parser.add_argument('--flaky-retries', type=int, default=2, metavar='N',
+                        help="extra attempts for cases the history marks flaky (default: %(default)s)")
+    tracing = parser.add_argument_group(
+        "tracing", "record feature and step spans for Perfetto or flamegraphs; splitting a request's server "
+                   "wait into handler and database time needs a Server-Timing header, which the server "
+                   "does not send yet")
+    tracing.add_argument('--trace', metavar='PATH', help="write a Chrome trace (Perfetto JSON) of the run")
+    tracing.add_argument('--trace-folded', metavar='PATH', help="write folded stacks for flamegraph tools")
+    tracing.add_argument('--trace-sample', type=float, default=1.0, metavar='RATE',
+                         help="share of features to trace, chosen by id (default: %(default)s)")
+    tracing.add_argument('--trace-slow', type=float, metavar='MS',
+                         help="also keep unsampled features that took at least MS milliseconds")
+    parser.add_argument('--write', action='store_true', help="write passed/failed outcomes back into the catalogue")
+    parser.add_argument('--json', dest='json_out', help="also write all results to this file")
+    args = parser.parse_args(argv)
+    if args.backend == 'local' and (args.write or args.history or args.history_file):
+        parser.error("the local backend accepts every step; --write and --history need --backend http")
+
+    ids = args.ids
+    if args.changed_since:
+        from .impact import select
+        affected, _ = select(args.catalogue, base=args.changed_since)
+        ids = sorted(set(affected) & set(ids)) if ids else affected
+        if not ids:
+            print(f"No features affected by changes since {args.changed_since}")
+            return
+    features = select_features(args.catalogue, ids, args.category, args.priority, args.failing)
+    history = retries = None
+    if args.history or args.history_file:
+        from .history import RunHistory, environment
+        history = RunHistory(args.history_file) if args.history_file else RunHistory.for_catalogue(args.catalogue)
+        history.stats()
+        features = history.order(features)
+        retries = history.retries(features, args.flaky_retries)
+    tracing = args.trace or args.trace_folded
+    if tracing:
+        trace.start(args.trace_sample, args.trace_slow)
+    run_started = time.time()
+    started = time.perf_counter()
+    try:
+        results, attempts = asyncio.run(_run_cli(args, features, retries))
+    finally:
+        tracer = trace.stop() if tracing else None
+    elapsed = time.perf_counter() - started
+    if tracer is not None:
+        if args.trace:
+            trace.write_chrome(args.trace, tracer, {'catalogue': args.catalogue, 'backend': args.backend})
+        if args.trace_folded:
+            trace.write_folded(args.trace_folded, tracer.events())
+        traced = sum(1 for s in tracer.spans if s.root is s and 'id' in s.args)
+        print(f"Traced {traced} features ({tracer.dropped} not kept)")
+    if history is not None:
+        history.append(attempts, environment(backend=args.backend, api=args.api, workers=args.workers),
+                       run_started)
+        retried = sum(1 for r in results if r.attempts > 1)
+        print(f"Recorded {len(attempts)} attempts in {history.path} ({retried} features retried)")
+
+    print(f"{len(results)} features in {elapsed:.2f}s with {args.workers} workers: {summarize(results)}")
+    if args.json_out:
+        with open(args.json_out, 'w') as f:
+            json.dump([asdict(r) for r in results], f, indent=2)
+    if args.write:
+        flipped = update_passes(args.catalogue, passes_from_results(results))
+        print(f"Updated passes for {flipped} features in {args.catalogue}")
+
+
+if __name__ == '__main__':
+    main()
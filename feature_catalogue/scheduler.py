@@ -0,0 +1,197 @@
+"""Fixture-sharing scheduler for catalogue runs.
+
+Many features open with the same setup steps: "Login as admin", "Trigger
+API sync", "Navigate to /my-prediction". The scheduler treats the leading
+run of such fixture steps as a feature's *preamble*, optionally prefixed
+by steps a category assumes without spelling them out (every Admin Panel
+case needs an admin session). Preambles form a trie: the state after each
+prefix (auth token, last response) is a fixture that depends on its
+parent prefix, is set up once, and is handed as a copy to every feature
+below it. Features are queued in preamble order and split into contiguous
+per-worker segments, so a worker walks one branch of the trie at a time;
+idle workers steal from the tail of the longest queue.
+"""
+import asyncio
+import re
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+from . import trace
+from .runner import DEFAULT_CATEGORY_LIMITS, run_feature
+from .steps import ERROR, FAILED, STEP_ERRORS, UNSUPPORTED, FeatureResult, StepFailed, feature_steps
+
+FIXTURE_STEPS = [re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'^Login as (?:an? )?(?:admin|regular user|user)$',
+    r'^Trigger API sync$',
+    r'^Navigate to /\S*$',
+)]
+
+# Categories whose cases assume a session without listing the login step.
+CATEGORY_PREAMBLES = {
+    'Admin Panel': ('Login as admin',),
+    'Admin Insights': ('Login as admin',),
+    'API Integration': ('Login as admin',),
+}
+
+
+# Steps that test access without a session; a case containing one never
+# gets the category's implicit login.
+UNAUTHENTICATED = re.compile(r'\bwithout (?:\w+ )?(?:login|logging in|authentication)\b', re.IGNORECASE)
+
+
+def is_fixture_step(text):
+    return any(regex.search(text) for regex in FIXTURE_STEPS)
+
+
+def preamble(feature):
+    """Return ``(prefix, start)`` for a feature.
+
+    ``prefix`` is the tuple of fixture steps the feature depends on and
+    ``start`` the index of its first step that is not covered by them. A
+    feature may declare its own implicit steps in a ``fixtures`` list,
+    which replaces the category default. Cases that check access without
+    a session ("Navigate to /admin without admin login") get no category
+    default.
+    """
+    steps = feature_steps(feature)
+    default = CATEGORY_PREAMBLES.get(feature['category'], ())
+    if default and any(UNAUTHENTICATED.search(step) for step in steps):
+        default = ()
+    declared = tuple(feature.get('fixtures', default))
+    start = 0
+    while start < len(steps) and is_fixture_step(steps[start]):
+        start += 1
+    leading = tuple(steps[:start])
+    # Don't log in twice when the feature already starts with its own login.
+    if declared and not (leading and leading[0].lower().startswith('login')):
+        leading = declared + leading
+    return leading, start
+
+
+@dataclass
+class Fixture:
+    state: dict = field(default_factory=dict)
+    last_response: object = None
+    status: str = None
+    message: str = ''
+
+
+class FixtureCache:
+    """Set up each preamble prefix once and remember the resulting state."""
+
+    def __init__(self, registry, make_context):
+        self.registry = registry
+        self.make_context = make_context
+        self.setups = 0
+        self._fixtures = {(): Fixture()}
+        self._locks = {}
+
+    async def get(self, prefix):
+        fixture = self._fixtures.get(prefix)
+        if fixture is not None:
+            return fixture
+        lock = self._locks.setdefault(prefix, asyncio.Lock())
+        async with lock:
+            if prefix not in self._fixtures:
+                self._fixtures[prefix] = await self._setup(prefix)
+        return self._fixtures[prefix]
+
+    async def _setup(self, prefix):
+        parent = await self.get(prefix[:-1])
+        if parent.status is not None:
+            return parent
+        step = prefix[-1]
+        match = self.registry.match(step)
+        if match is None:
+            return Fixture(status=UNSUPPORTED, message=f'no handler for fixture step: {step}')
+        handler, kwargs = match
+        ctx = self.make_context(None)
+        ctx.state = dict(parent.state)
+        ctx.last_response = parent.last_response
+        self.setups += 1
+        try:
+            with trace.span(f'fixture: {step}', 'fixture', depth=len(prefix)):
+                await handler(ctx, **kwargs)
+        except StepFailed as exc:
+            return Fixture(status=FAILED, message=f'fixture {step!r}: {exc}')
+        except STEP_ERRORS as exc:
+            return Fixture(status=ERROR, message=f'fixture {step!r}: {type(exc).__name__}: {exc}')
+        return Fixture(ctx.state, ctx.last_response)
+
+
+@dataclass
+class ScheduleStats:
+    fixture_setups: int = 0
+    naive_setups: int = 0
+    elapsed: float = 0.0
+
+
+def plan(features, workers):
+    """Split features into ``workers`` contiguous queues ordered by preamble.
+
+    Queues are balanced on step count, so long features don't pile up on
+    one worker.
+    """
+    items = sorted(((preamble(f), f) for f in features), key=lambda item: (item[0][0], item[1]['id']))
+    total = sum(len(feature_steps(f)) or 1 for _, f in items)
+    target = total / max(workers, 1)
+    queues = [deque() for _ in range(max(workers, 1))]
+    index, filled = 0, 0
+    for item in items:
+        if filled >= target * (index + 1) and index < len(queues) - 1:
+            index += 1
+        queues[index].append(item)
+        filled += len(feature_steps(item[1])) or 1
+    return queues
+
+
+async def run_scheduled(features, registry, make_context, workers=8, category_limits=None,
+                        on_result=None, scope='run'):
+    """Run features with shared fixtures; returns ``(results, stats)``.
+
+    With ``scope='run'`` all workers share one fixture cache, so each
+    prefix is set up once per run; ``scope='worker'`` gives every worker
+    its own cache, for fixtures whose state must not be shared.
+    """
+    limits = {**DEFAULT_CATEGORY_LIMITS, **(category_limits or {})}
+    per_category = {}
+    queues = plan(features, workers)
+    shared = FixtureCache(registry, make_context)
+    caches = [shared if scope == 'run' else FixtureCache(registry, make_context) for _ in queues]
+    results = {}
+    stats = ScheduleStats(naive_setups=sum(len(preamble(f)[0]) for f in features))
+    started = time.perf_counter()
+
+    def next_item(own):
+        if own:
+            return own.popleft()
+        victim = max(queues, key=len)
+        return victim.pop() if victim else None
+
+    async def worker(queue, cache):
+        while True:
+            item = next_item(queue)
+            if item is None:
+                return
+            (prefix, start), feature = item
+            category = feature['category']
+            if category not in per_category:
+                per_category[category] = asyncio.Semaphore(limits.get(category, workers))
+            async with per_category[category]:
+                fixture = await cache.get(prefix)
+                if fixture.status is not None:
+                    result = FeatureResult(feature['id'], category, fixture.status, 0.0, None, fixture.message)
+                else:
+                    ctx = make_context(feature)
+                    ctx.state = dict(fixture.state)
+                    ctx.last_response = fixture.last_response
+                    result = await run_feature(feature, registry, ctx, start)
+            results[feature['id']] = result
+            if on_result is not None:
+                on_result(result)
+
+    await asyncio.gather(*(worker(queue, cache) for queue, cache in zip(queues, caches)))
+    stats.elapsed = time.perf_counter() - started
+    stats.fixture_setups = shared.setups if scope == 'run' else sum(cache.setups for cache in caches)
+    return [results[f['id']] for f in features], stats
@@ -0,0 +1,353 @@
+"""Vectorised scoring and leaderboard simulator.
+
+A Python reference model of ``scoringService.calculatePredictionPoints``
+and ``utils/tieBreak.sortByTieBreak``, used as an oracle for the Standings
+and Flexible Participation catalogue cases and as a capacity model for the
+production scoring path. It synthesises N users x 104 matches of
+predictions, scores them column-wise (exact score, correct winner,
+per-stage rules) and ranks users by a single precomputed integer key
+instead of a comparator.
+
+NumPy is used when installed; otherwise the same model runs on
+``array``-backed lists, which is exact but considerably slower.
+"""
+import argparse
+import functools
+import random
+import time
+from array import array
+from dataclasses import dataclass, field, replace
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# 2026 format: 72 group matches, then a round of 32 through the final.
+STAGES = (
+    ('group', 72), ('round32', 16), ('round16', 8), ('quarter', 4),
+    ('semi', 2), ('third_place', 1), ('final', 1),
+)
+
+# Mirrors the rules seeded by server/src/utils/seed.ts: stage -> (exact, winner).
+DEFAULT_RULES = {
+    'group': (5, 3), 'round32': (7, 5), 'round16': (10, 7), 'quarter': (12, 9),
+    'semi': (15, 12), 'third_place': (10, 7), 'final': (20, 15),
+}
+
+NO_PREDICTION = -1
+
+# Bit widths of the composite ranking key, most significant first.
+_EXACT_BITS = _WINNER_BITS = 8
+_REG_BITS = 21
+
+
+def match_stages():
+    return [stage for stage, count in STAGES for _ in range(count)]
+
+
+@dataclass
+class Simulation:
+    """Struct-of-arrays input. Score arrays are ``users x matches``, row-major."""
+    users: int
+    stages: list
+    rules: dict
+    actual_home: list
+    actual_away: list
+    pred_home: object
+    pred_away: object
+    registered: object
+    champion_correct: object
+    backend: str = 'python'
+
+    @property
+    def matches(self):
+        return len(self.stages)
+
+
+@dataclass
+class Standings:
+    points: object
+    exact_scores: object
+    correct_winners: object
+    predictions_made: object
+    order: list = field(default_factory=list)
+    timings: dict = field(default_factory=dict)
+
+
+def _goals(rng):
+    # Cheap Poisson(1.3)-ish draw without numpy.
+    goals, threshold, p = 0, rng.random(), 0.2725
+    cumulative = p
+    while cumulative < threshold and goals < 10:
+        goals += 1
+        p *= 1.3 / goals
+        cumulative += p
+    return goals
+
+
+def synthesise(users, seed=0, coverage=0.8, played=None, rules=None, backend='auto'):
+    """Build a deterministic simulation for ``users`` users.
+
+    Each user predicts a random share of matches drawn around ``coverage``;
+    the rest stay at ``NO_PREDICTION``. The first ``played`` matches (all
+    by default) have results.
+    """
+    stages = match_stages()
+    matches = len(stages)
+    played = matches if played is None else played
+    rules = rules or DEFAULT_RULES
+    if backend == 'auto':
+        backend = 'numpy' if np is not None else 'python'
+
+    if backend == 'numpy':
+        rng = np.random.default_rng(seed)
+        actual_home = np.minimum(rng.poisson(1.3, matches), 10)
+        actual_away = np.minimum(rng.poisson(1.1, matches), 10)
+        actual_home[played:] = NO_PREDICTION
+        actual_away[played:] = NO_PREDICTION
+        share = np.clip(rng.normal(coverage, 0.2, (users, 1)), 0.0, 1.0)
+        made = rng.random((users, matches)) < share
+        pred_home = np.where(made, np.minimum(rng.poisson(1.4, (users, matches)), 10), NO_PREDICTION).astype(np.int8)
+        pred_away = np.where(made, np.minimum(rng.poisson(1.1, (users, matches)), 10), NO_PREDICTION).astype(np.int8)
+        registered = rng.integers(0, 60 * 86400, users, dtype=np.int64)
+        champion = rng.random(users) < 0.1
+        return Simulation(users, stages, rules, actual_home.tolist(), actual_away.tolist(),
+                          pred_home, pred_away, registered, champion, 'numpy')
+
+    rng = random.Random(seed)
+    actual_home = [_goals(rng) if j < played else NO_PREDICTION for j in range(matches)]
+    actual_away = [_goals(rng) if j < played else NO_PREDICTION for j in range(matches)]
+    pred_home, pred_away = array('b'), array('b')
+    for _ in range(users):
+        share = min(max(rng.gauss(coverage, 0.2), 0.0), 1.0)
+        for _ in range(matches):
+            if rng.random() < share:
+                pred_home.append(_goals(rng))
+                pred_away.append(_goals(rng))
+            else:
+                pred_home.append(NO_PREDICTION)
+                pred_away.append(NO_PREDICTION)
+    registered = array('q', (rng.randrange(60 * 86400) for _ in range(users)))
+    champion = [rng.random() < 0.1 for _ in range(users)]
+    return Simulation(users, stages, rules, actual_home, actual_away, pred_home, pred_away,
+                      registered, champion, 'python')
+
+
+def _sign(x):
+    return (x > 0) - (x < 0)
+
+
+def _score_numpy(sim):
+    stage_exact = np.array([sim.rules[s][0] for s in sim.stages], dtype=np.int32)
+    stage_winner = np.array([sim.rules[s][1] for s in sim.stages], dtype=np.int32)
+    ah = np.asarray(sim.actual_home, dtype=np.int16)
+    aa = np.asarray(sim.actual_away, dtype=np.int16)
+    ph = sim.pred_home.astype(np.int16)
+    pa = sim.pred_away.astype(np.int16)
+    made = ph >= 0
+    counted = made & (ah >= 0)
+    exact = counted & (ph == ah) & (pa == aa)
+    winner = counted & (np.sign(ph - pa) == np.sign(ah - aa))
+    points = np.where(exact, stage_exact, np.where(winner, stage_winner, 0))
+    return (points.sum(axis=1, dtype=np.int64), exact.sum(axis=1), winner.sum(axis=1), made.sum(axis=1))
+
+
+def _score_python(sim):
+    users, matches = sim.users, sim.matches
+    points = [0] * users
+    exact_scores = [0] * users
+    correct_winners = [0] * users
+    made = [0] * users
+    for j in range(matches):
+        ph_col = sim.pred_home[j::matches]
+        pa_col = sim.pred_away[j::matches]
+        ah, aa = sim.actual_home[j], sim.actual_away[j]
+        exact_pts, winner_pts = sim.rules[sim.stages[j]]
+        outcome = _sign(ah - aa)
+        for u, (ph, pa) in enumerate(zip(ph_col, pa_col)):
+            if ph < 0:
+                continue
+            made[u] += 1
+            if ah < 0:
+                continue
+            if ph == ah and pa == aa:
+                points[u] += exact_pts
+                exact_scores[u] += 1
+                correct_winners[u] += 1
+            elif _sign(ph - pa) == outcome:
+                points[u] += winner_pts
+                correct_winners[u] += 1
+    return points, exact_scores, correct_winners, made
+
+
+def rank_keys(points, exact_scores, correct_winners, champion_correct, registered, use_numpy=False):
+    """Composite integer keys; sorting them descending reproduces sortByTieBreak.
+
+    Earlier registration wins the last tie, so registration enters the key
+    as an inverted rank. The rank comes from a stable sort, which keeps
+    equal timestamps in input order, as ``Array.prototype.sort`` does.
+    """
+    n = len(points)
+    if n >= 1 << _REG_BITS:
+        raise ValueError(f'at most {(1 << _REG_BITS) - 1} users fit the ranking key')
+    if use_numpy:
+        reg_rank = np.empty(n, dtype=np.int64)
+        reg_rank[np.argsort(registered, kind='stable')] = np.arange(n)
+        key = np.asarray(points, dtype=np.int64)
+        key = (key << _EXACT_BITS) | np.asarray(exact_scores, dtype=np.int64)
+        key = (key << _WINNER_BITS) | np.asarray(correct_winners, dtype=np.int64)
+        key = (key << 1) | np.asarray(champion_correct, dtype=np.int64)
+        return (key << _REG_BITS) | ((1 << _REG_BITS) - 1 - reg_rank)
+
+    return [composite_key(p, e, w, c, r)
+            for p, e, w, c, r in zip(points, exact_scores, correct_winners, champion_correct,
+                                     registration_slots(registered))]
+
+
+def registration_slots(registered):
+    """Per user, the low bits of the ranking key: earlier registration, larger slot."""
+    n = len(registered)
+    top = (1 << _REG_BITS) - 1
+    slots = [0] * n
+    for rank, u in enumerate(sorted(range(n), key=registered.__getitem__)):
+        slots[u] = top - rank
+    return slots
+
+
+def composite_key(points, exact_scores, correct_winners, champion_correct, slot):
+    return ((((points << _EXACT_BITS | exact_scores) << _WINNER_BITS | correct_winners) << 1
+             | int(champion_correct)) << _REG_BITS) | slot
+
+
+def score(sim):
+    """Score every prediction and rank all users; returns :class:`Standings`."""
+    started = time.perf_counter()
+    use_numpy = sim.backend == 'numpy'
+    points, exact_scores, correct_winners, made = (_score_numpy if use_numpy else _score_python)(sim)
+    scored = time.perf_counter()
+    keys = rank_keys(points, exact_scores, correct_winners, sim.champion_correct, sim.registered, use_numpy)
+    if use_numpy:
+        order = np.argsort(-keys, kind='stable').tolist()
+    else:
+        order = sorted(range(sim.users), key=keys.__getitem__, reverse=True)
+    ranked = time.perf_counter()
+    return Standings(points, exact_scores, correct_winners, made, order,
+                     {'score': scored - started, 'rank': ranked - scored})
+
+
+def reference_points(rules, stage, actual_home, actual_away, predicted_home, predicted_away):
+    """Scalar port of calculatePredictionPoints: ``(points, is_exact, is_winner)``."""
+    exact_pts, winner_pts = rules[stage]
+    is_exact = predicted_home == actual_home and predicted_away == actual_away
+    is_winner = _sign(predicted_home - predicted_away) == _sign(actual_home - actual_away)
+    return (exact_pts if is_exact else winner_pts if is_winner else 0), is_exact, is_winner
+
+
+def _prediction(sim, user, match):
+    if sim.backend == 'numpy':
+        return int(sim.pred_home[user, match]), int(sim.pred_away[user, match])
+    index = user * sim.matches + match
+    return sim.pred_home[index], sim.pred_away[index]
+
+
+def _tie_break_cmp(a, b):
+    # Rows are (points, exact, winners, champion, registered); mirrors sortByTieBreak.
+    for i in range(4):
+        if a[i] != b[i]:
+            return int(b[i]) - int(a[i])
+    return int(a[4]) - int(b[4])
+
+
+def _blank_users_score_nothing(sim, users=4):
+    """Score ``users`` users with no predictions against ``sim``'s results; all must get nothing."""
+    if sim.backend == 'numpy':
+        blank = np.full((users, sim.matches), NO_PREDICTION, dtype=np.int8)
+        registered = np.arange(users, dtype=np.int64)
+    else:
+        blank = array('b', [NO_PREDICTION]) * (users * sim.matches)
+        registered = array('q', range(users))
+    probe = score(replace(sim, users=users, pred_home=blank, pred_away=blank, registered=registered,
+                          champion_correct=[False] * users))
+    return all(int(x) == 0 for column in (probe.points, probe.exact_scores, probe.correct_winners,
+                                          probe.predictions_made) for x in column)
+
+
+def verify(sim, standings, sample=2000, seed=0):
+    """Check a sample of users against the scalar reference implementation.
+
+    Returns ``{catalogue case description: passed}`` for the cases this
+    model can answer.
+    """
+    rng = random.Random(seed)
+    users = sorted(rng.sample(range(sim.users), min(sample, sim.users)))
+    m = sim.matches
+    rows = {}
+    scores_match = unmade_ignored = True
+    for u in users:
+        totals = [0, 0, 0, 0]
+        for j in range(m):
+            ph, pa = _prediction(sim, u, j)
+            if ph == NO_PREDICTION:
+                continue
+            totals[3] += 1
+            if sim.actual_home[j] < 0:
+                continue
+            pts, is_exact, is_winner = reference_points(sim.rules, sim.stages[j], sim.actual_home[j],
+                                                        sim.actual_away[j], ph, pa)
+            totals[0] += pts
+            totals[1] += is_exact
+            totals[2] += is_winner
+        got = [int(standings.points[u]), int(standings.exact_scores[u]),
+               int(standings.correct_winners[u]), int(standings.predictions_made[u])]
+        scores_match &= got == totals
+        if totals[3] == 0:
+            unmade_ignored &= got == [0, 0, 0, 0]
+        rows[u] = (totals[0], totals[1], totals[2], bool(sim.champion_correct[u]), int(sim.registered[u]))
+
+    # Users without predictions are rare in a sample, so also score a few blank users outright.
+    unmade_ignored = unmade_ignored and _blank_users_score_nothing(sim)
+    expected = sorted(users, key=functools.cmp_to_key(lambda a, b: _tie_break_cmp(rows[a], rows[b])))
+    chosen = set(users)
+    actual = [u for u in standings.order if u in chosen]
+    return {
+        'Scoring system only counts predictions that were made': scores_match and unmade_ignored,
+        'Leaderboard shows \'Predictions Made\' count': scores_match,
+        'Tie-breaking works correctly in individual standings': actual == expected,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate scoring and ranking at production scale.")
+    parser.add_argument('--users', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--coverage', type=float, default=0.8, help="mean share of matches each user predicts")
+    parser.add_argument('--played', type=int, help="number of matches with a result (default: all)")
+    parser.add_argument('--backend', choices=['auto', 'numpy', 'python'], default='auto')
+    parser.add_argument('--verify', type=int, default=2000, metavar='N',
+                        help="check N sampled users against the scalar reference (0 to skip)")
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args(argv)
+    if args.backend == 'numpy' and np is None:
+        parser.error("numpy is not installed")
+
+    started = time.perf_counter()
+    sim = synthesise(args.users, args.seed, args.coverage, args.played, backend=args.backend)
+    synthesised = time.perf_counter() - started
+    standings = score(sim)
+    predictions = int(sum(standings.predictions_made))
+
+    print(f"{sim.backend}: {args.users} users x {sim.matches} matches, {predictions} predictions")
+    print(f"  synthesise {synthesised:.2f}s  score {standings.timings['score']:.2f}s  "
+          f"rank {standings.timings['rank']:.2f}s  "
+          f"({predictions / max(standings.timings['score'], 1e-9):,.0f} predictions/s)")
+    for rank, u in enumerate(standings.order[:args.top], 1):
+        print(f"  {rank:>3}. user {u:<8} {int(standings.points[u]):>5} pts  exact {int(standings.exact_scores[u]):>3}  "
+              f"winners {int(standings.correct_winners[u]):>3}  champion {bool(sim.champion_correct[u])}")
+    if args.verify:
+        for case, ok in verify(sim, standings, args.verify, args.seed).items():
+            print(f"  {'PASS' if ok else 'FAIL'}  {case}")
+
+
+if __name__ == '__main__':
+    main()
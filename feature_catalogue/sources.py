@@ -0,0 +1,319 @@
+"""Pluggable category sources and sharded, parallel catalogue expansion.
+
+A category source is a named list of entries (``(description, priority,
+steps[, extra])``, as in ``definitions.py``), the repo files it
+exercises, and the expansion axes it takes part in. Sources come from:
+
+* Python modules (a dotted name or a ``.py`` path) that define
+  ``CATEGORIES`` and optionally ``CATEGORY_SOURCES`` and ``CATEGORY_AXES``,
+  the same names ``definitions.py`` uses;
+* YAML files (PyYAML required) holding one category or a ``categories``
+  list; see :func:`load_yaml`;
+* directories, which load every ``*.py`` and ``*.yaml``/``*.yml`` inside
+  in name order.
+
+Expansion multiplies each entry by the cartesian product of its
+category's axes (``event``, ``locale``, ``viewport``). It runs on a
+process pool, one shard per (category, slice of variants). Ids are
+deterministic and independent of the worker count: each category
+reserves a range of ``id_block`` ids, and inside it each variant a slot of
+``entries_block`` ids, so an id is ``variant * entries_block + entry``.
+Blocks are keyed by category name and persisted as ``expansion.blocks`` in
+the catalogue header; a category keeps its block across runs, and a new one
+takes the next unused block. Inserting, reordering or removing categories
+therefore never renumbers another category, and appending entries to a
+category keeps the ids of its existing entries. Inserting or reordering
+entries, or changing a category's axis values, does renumber that
+category.
+Workers render their features to JSON themselves, so the merge step only
+concatenates text.
+"""
+import hashlib
+import importlib
+import importlib.util
+import itertools
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+from .model import validate_feature
+from .stream import iter_features, read_header, render_feature
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+VIEWPORTS = {'mobile': '375x667', 'tablet': '768x1024', 'desktop': '1280x800'}
+LOCALES = ('en', 'nl')
+AXES = ('event', 'locale', 'viewport')
+
+
+@dataclass
+class CategorySource:
+    name: str
+    entries: list
+    sources: list
+    axes: tuple = AXES
+    origin: str = ''
+
+    def digest(self, axes=None):
+        # Unexpanded categories hash exactly as generate_features always has.
+        payload = [self.name, self.entries, self.sources]
+        if self.variant_axes(axes or {}):
+            payload.append(self.variant_axes(axes))
+        payload = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def variant_axes(self, axes):
+        """The ``(axis, values)`` pairs of ``axes`` this category expands over."""
+        return [(axis, list(axes[axis])) for axis in AXES if axis in axes and axis in self.axes]
+
+    def variants(self, axes):
+        pairs = self.variant_axes(axes)
+        return [tuple(zip([a for a, _ in pairs], combo)) for combo in itertools.product(*(v for _, v in pairs))]
+
+
+def _entry(raw, where):
+    if isinstance(raw, dict):
+        raw = dict(raw)
+        try:
+            desc, priority = raw.pop('description'), raw.pop('priority')
+            steps = raw.pop('test_steps', None) or raw.pop('steps')
+        except KeyError as exc:
+            raise ValueError(f'{where}: entry is missing {exc.args[0]!r}') from None
+        return (desc, priority, list(steps), raw) if raw else (desc, priority, list(steps))
+    return tuple(raw)
+
+
+def from_definitions(categories, category_sources=None, category_axes=None, origin=''):
+    """Wrap ``generate_features``-style definitions as :class:`CategorySource` objects."""
+    category_sources = category_sources or {}
+    category_axes = category_axes or {}
+    return [CategorySource(name, [_entry(e, name) for e in entries], list(category_sources.get(name, [])),
+                           tuple(category_axes.get(name, AXES)), origin)
+            for name, entries in categories]
+
+
+def load_module(spec):
+    """Load category sources from a module name or a ``.py`` path."""
+    if spec.endswith('.py'):
+        name = '_catalogue_source_' + hashlib.sha1(os.path.abspath(spec).encode()).hexdigest()[:12]
+        loader_spec = importlib.util.spec_from_file_location(name, spec)
+        module = importlib.util.module_from_spec(loader_spec)
+        sys.modules[name] = module
+        loader_spec.loader.exec_module(module)
+    else:
+        module = importlib.import_module(spec)
+    if not hasattr(module, 'CATEGORIES'):
+        raise ValueError(f'{spec}: module defines no CATEGORIES')
+    return from_definitions(module.CATEGORIES, getattr(module, 'CATEGORY_SOURCES', None),
+                            getattr(module, 'CATEGORY_AXES', None), spec)
+
+
+def load_yaml(path):
+    """Load category sources from a YAML file.
+
+    The file holds one category, or ``categories:`` with a list of them::
+
+        category: Email & Notifications
+        sources: [server/src/services/emailService.ts]
+        axes: [event, locale]          # optional, default: all axes
+        features:
+          - description: Welcome email is sent after registration
+            priority: high
+            test_steps: [Register a new user, Verify welcome email received]
+    """
+    if yaml is None:
+        raise RuntimeError(f'{path}: PyYAML is required for YAML category sources')
+    with open(path, encoding='utf-8') as f:
+        data = yaml.safe_load(f) or {}
+    categories = data.get('categories', [data]) if isinstance(data, dict) else data
+    loaded = []
+    for category in categories:
+        name = category.get('category')
+        if not name:
+            raise ValueError(f'{path}: category without a name')
+        entries = [_entry(e, f'{path}: {name}') for e in category.get('features', [])]
+        loaded.append(CategorySource(name, entries, list(category.get('sources', [])),
+                                     tuple(category.get('axes', AXES)), path))
+    return loaded
+
+
+def load_sources(specs):
+    """Load every source in ``specs`` (modules, ``.py``/YAML files, directories)."""
+    loaded = []
+    for spec in specs:
+        if os.path.isdir(spec):
+            loaded += load_sources(sorted(os.path.join(spec, name) for name in os.listdir(spec)
+                                          if name.endswith(('.py', '.yaml', '.yml')) and not name.startswith('_')))
+        elif spec.endswith(('.yaml', '.yml')):
+            loaded += load_yaml(spec)
+        else:
+            loaded += load_module(spec)
+    names = [source.name for source in loaded]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"categories defined more than once: {', '.join(duplicates)}")
+    return loaded
+
+
+def parse_axes(values):
+    """``['locale=en,nl', 'viewport', 'event=internal,acme']`` -> axis dict.
+
+    An axis without values takes its defaults (locales EN/NL, all viewports).
+    """
+    axes = {}
+    for value in values:
+        axis, _, listed = value.partition('=')
+        if axis not in AXES:
+            raise ValueError(f'unknown expansion axis {axis!r} (expected one of {", ".join(AXES)})')
+        if listed:
+            axes[axis] = [v.strip() for v in listed.split(',') if v.strip()]
+        elif axis == 'locale':
+            axes[axis] = list(LOCALES)
+        elif axis == 'viewport':
+            axes[axis] = list(VIEWPORTS)
+        else:
+            raise ValueError('the event axis needs explicit event codes, e.g. event=internal,acme')
+    return axes
+
+
+def expand_entry(category, entry, variant, fid):
+    desc, priority, steps, *extra = entry
+    steps = list(steps)
+    setup = []
+    labels = []
+    for axis, value in variant:
+        labels.append(value)
+        if axis == 'event':
+            # The client routes every page under /:eventCode.
+            steps = [f'Navigate to /{value}{s[len("Navigate to "):]}' if s.startswith('Navigate to /') else s
+                     for s in steps]
+        elif axis == 'locale':
+            setup.append(f'Switch language to {value.upper()}')
+        elif axis == 'viewport':
+            setup.append(f'Set viewport to {VIEWPORTS.get(value, value)} ({value})')
+    feature = {
+        'id': fid,
+        'category': category,
+        'description': f"{desc} [{', '.join(labels)}]" if labels else desc,
+        'priority': priority,
+        'test_steps': setup + steps,
+    }
+    if extra:
+        feature.update(extra[0])
+    if variant:
+        feature['variant'] = dict(variant)
+    feature['passes'] = False
+    return feature
+
+
+@dataclass
+class Shard:
+    source: CategorySource
+    variants: list
+    first_variant: int
+    base_id: int
+    stride: int
+
+
+def assign_blocks(names, blocks=None):
+    """``{category: block}``: names in ``blocks`` keep theirs, new ones take the next free block.
+
+    Retired categories stay in the map, so their block is never reused.
+    """
+    blocks = dict(blocks or {})
+    free = max(blocks.values(), default=-1) + 1
+    for name in names:
+        if name not in blocks:
+            blocks[name] = free
+            free += 1
+    return blocks
+
+
+def plan(sources, axes, id_block=10000, shard_size=2000, blocks=None, entries_block=100):
+    """Split the expansion into shards with reserved, deterministic id ranges."""
+    blocks = assign_blocks([source.name for source in sources], blocks)
+    shards = []
+    for source in sources:
+        variants = source.variants(axes)
+        if len(source.entries) > entries_block:
+            raise ValueError(f'{source.name}: {len(source.entries)} entries exceed the per-variant slot of '
+                             f'{entries_block} ids; raise entries_block')
+        if len(variants) * entries_block > id_block:
+            raise ValueError(f'{source.name}: {len(variants)} variants of {entries_block} ids exceed '
+                             f'the id block of {id_block}; raise id_block')
+        per_shard = max(1, shard_size // max(1, len(source.entries)))
+        for first in range(0, len(variants), per_shard):
+            shards.append(Shard(source, variants[first:first + per_shard], first,
+                                blocks[source.name] * id_block + 1, entries_block))
+    return shards
+
+
+def build_shard(shard):
+    """Worker: expand one shard and return its features rendered, plus passes keys."""
+    rendered = []
+    for v, variant in enumerate(shard.variants, shard.first_variant):
+        for e, entry in enumerate(shard.source.entries):
+            feature = expand_entry(shard.source.name, entry, variant, shard.base_id + v * shard.stride + e)
+            validate_feature(feature)
+            rendered.append((feature['id'], feature['description'], render_feature(feature)))
+    return rendered
+
+
+def _with_passes(item, previous):
+    fid, desc, rendered = item
+    if previous.get(fid) != desc:
+        return rendered
+    return render_feature({**json.loads(rendered.ndjson), 'passes': True})
+
+
+def expand(sources, axes, jobs=None, id_block=10000, previous=None, blocks=None, entries_block=100):
+    """Expand ``sources`` on ``jobs`` processes; returns ``(header, rendered features)``.
+
+    ``previous`` maps id -> description of features that pass in the old
+    catalogue; a feature with the same id and description keeps ``passes``.
+    ``blocks`` is the old catalogue's category -> id block map (see
+    :func:`id_blocks`); ``entries_block`` is the id slot of one variant.
+    """
+    blocks = assign_blocks([s.name for s in sources], blocks)
+    shards = plan(sources, axes, id_block, blocks=blocks, entries_block=entries_block)
+    jobs = jobs or os.cpu_count() or 1
+    if jobs > 1 and len(shards) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(shards))) as pool:
+            parts = list(pool.map(build_shard, shards, chunksize=max(1, len(shards) // (jobs * 4))))
+    else:
+        parts = [build_shard(shard) for shard in shards]
+    previous = previous or {}
+    features = [_with_passes(item, previous) if item[0] in previous else item[2]
+                for part in parts for item in part]
+    header = {
+        'categories': {s.name: len(s.entries) * len(s.variants(axes)) for s in sources},
+        'category_hashes': {s.name: s.digest(axes) for s in sources},
+        'category_sources': {s.name: s.sources for s in sources},
+        'expansion': {'axes': axes, 'id_block': id_block, 'entries_block': entries_block, 'blocks': blocks},
+    }
+    return header, features
+
+
+def passing(path):
+    """``{id: description}`` of the passing features in the catalogue at ``path``, if any."""
+    try:
+        return {f['id']: f['description'] for f in iter_features(path, lambda f: f.get('passes'))}
+    except (OSError, ValueError):
+        return {}
+
+
+def id_blocks(path, id_block):
+    """The category -> id block map of the expanded catalogue at ``path``, if any.
+
+    Blocks recorded with a different ``id_block`` size do not carry over.
+    """
+    try:
+        expansion = read_header(path).get('expansion') or {}
+    except (OSError, ValueError):
+        return {}
+    return expansion.get('blocks', {}) if expansion.get('id_block') == id_block else {}
@@ -0,0 +1,76 @@
+"""Step registry, per-feature context and result types shared by the runners."""
+import asyncio
+import re
+from dataclasses import dataclass
+
+from .http import HttpError
+
+PASSED = 'passed'
+FAILED = 'failed'
+UNSUPPORTED = 'unsupported'
+ERROR = 'error'
+
+
+class StepFailed(Exception):
+    pass
+
+
+class StepRegistry:
+    def __init__(self):
+        self._handlers = []
+
+    def step(self, pattern):
+        """Register the decorated coroutine for steps matching ``pattern``.
+
+        Named groups of the pattern are passed to the handler as keyword
+        arguments. Patterns are tried in registration order.
+        """
+        regex = re.compile(pattern, re.IGNORECASE)
+
+        def decorator(handler):
+            self._handlers.append((regex, handler))
+            return handler
+        return decorator
+
+    def match(self, text):
+        for regex, handler in self._handlers:
+            m = regex.search(text)
+            if m:
+                return handler, m.groupdict()
+        return None
+
+
+class StepContext:
+    """Per-feature state shared by the handlers of one feature's steps."""
+
+    def __init__(self, feature, api=None, app=None, options=None):
+        self.feature = feature
+        self.api = api
+        self.app = app
+        self.options = options or {}
+        self.state = {}
+        self.last_response = None
+
+    def auth_headers(self):
+        token = self.state.get('token')
+        return {'Authorization': f'Bearer {token}'} if token else {}
+
+
+@dataclass
+class FeatureResult:
+    id: int
+    category: str
+    status: str
+    duration: float
+    failed_step: int = None
+    message: str = ''
+    attempts: int = 1
+
+
+def feature_steps(feature):
+    """Return a feature's step list, accepting the legacy ``steps`` key too."""
+    return feature.get('test_steps', feature.get('steps', []))
+
+
+# Exceptions that mean a step could not be carried out, as opposed to StepFailed.
+STEP_ERRORS = (HttpError, OSError, asyncio.TimeoutError)
@@ -0,0 +1,194 @@
+"""Indexed, persistent view of the feature catalogue.
+
+Dashboards and agent loops ask the same questions over and over ("give me
+feature 187", "which high-priority Security cases fail?"). Instead of
+re-reading ``feature_list.json`` on every poll, :class:`FeatureStore` keeps
+the features in a SQLite file with secondary indexes on ``category``,
+``priority`` and ``passes``. :meth:`FeatureStore.sync` only touches rows
+whose content changed. :meth:`FeatureStore.set_passes` writes a flipped
+case through to the catalogue and re-syncs, so the change survives the
+next :meth:`~FeatureStore.sync`. ``python -m feature_catalogue query`` and
+``stats`` read through this store.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+
+from .stream import iter_features, update_passes
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS features (
+    id INTEGER PRIMARY KEY,
+    category TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    passes INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS features_category ON features (category, priority, passes);
+CREATE INDEX IF NOT EXISTS features_priority ON features (priority, passes);
+CREATE INDEX IF NOT EXISTS features_passes ON features (passes);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def index_path(catalogue_path):
+    root, _ = os.path.splitext(catalogue_path)
+    return root + '.sqlite'
+
+
+def _digest(feature):
+    # ``passes`` has its own column, so flipping it never invalidates the digest.
+    payload = json.dumps({k: v for k, v in feature.items() if k != 'passes'},
+                         sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def _source_stamp(path):
+    st = os.stat(path)
+    return f'{st.st_mtime_ns}:{st.st_size}'
+
+
+class FeatureStore:
+    """SQLite-backed feature index built from a catalogue file."""
+
+    def __init__(self, catalogue_path='feature_list.json', db_path=None):
+        self.catalogue_path = catalogue_path
+        self.db_path = db_path or index_path(catalogue_path)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _meta(self, key):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def sync(self, force=False):
+        """Bring the index in line with the catalogue file.
+
+        Returns ``(upserted, deleted)``. Nothing is read when the catalogue's
+        mtime and size match the last sync, unless ``force`` is set. The
+        catalogue file is authoritative, including for ``passes``.
+        """
+        stamp = _source_stamp(self.catalogue_path)
+        if not force and self._meta('source_stamp') == stamp:
+            return 0, 0
+
+        known = {fid: (digest, passes) for fid, digest, passes
+                 in self.conn.execute("SELECT id, digest, passes FROM features")}
+        upserts = []
+        for feature in iter_features(self.catalogue_path):
+            digest = _digest(feature)
+            passes = int(bool(feature.get('passes')))
+            if known.pop(feature['id'], None) != (digest, passes):
+                upserts.append((
+                    feature['id'], feature['category'], feature['priority'],
+                    passes, digest, json.dumps(feature),
+                ))
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO features (id, category, priority, passes, digest, body) "
+                "VALUES (?, ?, ?, ?, ?, ?)", upserts)
+            self.conn.executemany("DELETE FROM features WHERE id = ?", [(fid,) for fid in known])
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('source_stamp', ?)", (stamp,))
+        return len(upserts), len(known)
+
+    @staticmethod
+    def _row_to_feature(row):
+        passes, body = row
+        feature = json.loads(body)
+        feature['passes'] = bool(passes)
+        return feature
+
+    def get(self, feature_id):
+        row = self.conn.execute("SELECT passes, body FROM features WHERE id = ?", (feature_id,)).fetchone()
+        return self._row_to_feature(row) if row else None
+
+    def _where(self, category, priority, passes, search=None):
+        clauses, params = [], []
+        for column, value in (('category', category), ('priority', priority), ('passes', passes)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(int(value) if column == 'passes' else value)
+        if search:
+            # A plain substring test: LIKE would treat % and _ in the search as wildcards.
+            clauses.append("instr(lower(json_extract(body, '$.description')), ?) > 0")
+            params.append(search.lower())
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def query(self, category=None, priority=None, passes=None, search=None):
+        """Return features matching all given filters, ordered by id.
+
+        ``search`` is a case-insensitive substring of the description.
+        """
+        where, params = self._where(category, priority, passes, search)
+        rows = self.conn.execute(f"SELECT passes, body FROM features{where} ORDER BY id", params)
+        return [self._row_to_feature(row) for row in rows]
+
+    def ids(self, category=None, priority=None, passes=None):
+        where, params = self._where(category, priority, passes)
+        return [row[0] for row in self.conn.execute(f"SELECT id FROM features{where} ORDER BY id", params)]
+
+    def counts(self, key='category'):
+        """Return ``{value: {"total": n, "passing": m}}`` per ``category`` or ``priority``, from the index."""
+        if key not in ('category', 'priority'):
+            raise ValueError(f'cannot count by {key!r}')
+        rows = self.conn.execute(
+            f"SELECT {key}, COUNT(*), SUM(passes) FROM features GROUP BY {key} ORDER BY MIN(id)")
+        return {value: {'total': total, 'passing': passing or 0} for value, total, passing in rows}
+
+    def set_passes(self, feature_id, passes):
+        """Record a new ``passes`` value for one feature; returns whether it changed.
+
+        The catalogue is authoritative, so the value is written there first
+        and the index follows through :meth:`sync`.
+        """
+        if not update_passes(self.catalogue_path, {feature_id: bool(passes)}):
+            return False
+        self.sync()
+        return True
+
+
+def open_store(catalogue_path='feature_list.json', db_path=None):
+    store = FeatureStore(catalogue_path, db_path)
+    store.sync()
+    return store
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the indexed feature catalogue.")
+    parser.add_argument('--catalogue', default='feature_list.json')
+    parser.add_argument('--id', type=int, dest='feature_id')
+    parser.add_argument('--category')
+    parser.add_argument('--priority', choices=['high', 'medium', 'low'])
+    state = parser.add_mutually_exclusive_group()
+    state.add_argument('--passing', action='store_const', const=True, dest='passes')
+    state.add_argument('--failing', action='store_const', const=False, dest='passes')
+    parser.add_argument('--counts', action='store_true', help="print per-category totals")
+    args = parser.parse_args(argv)
+
+    with open_store(args.catalogue) as store:
+        if args.counts:
+            result = store.counts()
+        elif args.feature_id is not None:
+            result = store.get(args.feature_id)
+        else:
+            result = store.query(args.category, args.priority, args.passes)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+"""Streaming reader and writer for the feature catalogue.
+
+``feature_list.json`` stays the canonical document. Next to it the writer
+keeps an NDJSON sidecar (``feature_list.ndjson``) holding one feature per
+line, so consumers can scan the catalogue lazily and stop at the first hit
+instead of loading the whole document.
+"""
+import contextlib
+import json
+import os
+import tempfile
+from collections import namedtuple
+
+from .model import normalize_feature, validate_feature
+
+SIDECAR_SUFFIX = '.ndjson'
+
+
+def sidecar_path(path):
+    root, _ = os.path.splitext(path)
+    return root + SIDECAR_SUFFIX
+
+
+@contextlib.contextmanager
+def atomic_writer(path, binary=False):
+    """Open a temporary file next to ``path`` and move it into place on success."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f'.{os.path.basename(path)}.', suffix='.tmp', dir=directory)
+    try:
+        with (os.fdopen(fd, 'wb') if binary else os.fdopen(fd, 'w', encoding='utf-8')) as f:
+            yield f
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp_path)
+        raise
+
+
+# A feature already serialised for both outputs, so the JSON work can be
+# done by whoever produced the feature (e.g. a generator worker process).
+RenderedFeature = namedtuple('RenderedFeature', 'document ndjson')
+
+
+def _indent(text, prefix):
+    return '\n'.join(prefix + line for line in text.split('\n'))
+
+
+def render_feature(feature):
+    return RenderedFeature(_indent(json.dumps(feature, indent=2), '    '),
+                           json.dumps(feature, separators=(',', ':')) + '\n')
+
+
+def write_catalogue(path, document, sidecar=True):
+    """Write ``document`` to ``path``, emitting its features one at a time.
+
+    ``document["features"]`` may be any iterable, including a generator; it
+    is consumed exactly once and always written as the last key. Items may
+    be dicts or :class:`RenderedFeature` tuples from :func:`render_feature`. The JSON
+    output matches ``json.dump(document, f, indent=2)``. When ``sidecar`` is
+    true the NDJSON sidecar is written in the same pass. Returns the number
+    of features written.
+
+    Dict features are checked with :func:`~feature_catalogue.model.validate_feature`;
+    a :class:`~feature_catalogue.model.CatalogueError` leaves ``path``
+    untouched. Rendered features are validated by whoever rendered them.
+    """
+    header = {key: value for key, value in document.items() if key != 'features'}
+    head = json.dumps(header, indent=2)
+    head = head[:-2] + ',\n' if header else '{\n'
+
+    count = 0
+    with contextlib.ExitStack() as stack:
+        # Entered first so it is replaced last: the sidecar is never older
+        # than the document it mirrors.
+        nd = stack.enter_context(atomic_writer(sidecar_path(path))) if sidecar else None
+        doc = stack.enter_context(atomic_writer(path))
+        doc.write(head + '  "features": [')
+        for feature in document.get('features', ()):
+            if not isinstance(feature, RenderedFeature):
+                validate_feature(feature)
+                feature = render_feature(feature)
+            doc.write(('\n' if count == 0 else ',\n') + feature.document)
+            if nd is not None:
+                nd.write(feature.ndjson)
+            count += 1
+        doc.write('\n  ]\n}' if count else ']\n}')
+    return count
+
+
+def load_features(path):
+    """Return the full feature list of a JSON catalogue (wrapper or bare list).
+
+    Legacy records are normalised, so every feature has ``test_steps``.
+    """
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    return [normalize_feature(f) for f in (data['features'] if isinstance(data, dict) else data)]
+
+
+def read_header(path):
+    """Return the catalogue's top-level keys other than ``features``.
+
+    Documents written by :func:`write_catalogue` keep the features last, so
+    only the lines before them are parsed; anything else is loaded whole.
+    A bare-list catalogue has no header and gives ``{}``.
+    """
+    head = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line == '  "features": [\n' or line.startswith('  "features": []'):
+                text = ''.join(head).rstrip()
+                return json.loads(text[:-1] + '\n}' if text.endswith(',') else text + '}')
+            head.append(line)
+    data = json.loads(''.join(head))
+    return {key: value for key, value in data.items() if key != 'features'} if isinstance(data, dict) else {}
+
+
+def sidecar_is_fresh(path):
+    """Whether the NDJSON sidecar of ``path`` exists and is not older than it."""
+    try:
+        return os.stat(sidecar_path(path)).st_mtime_ns >= os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+
+def iter_features(path, predicate=None):
+    """Yield features from the catalogue at ``path`` lazily.
+
+    ``path`` may name the JSON document or the sidecar itself. The sidecar
+    is read line by line when it is at least as new as the document;
+    otherwise (missing, or the document was edited afterwards) this falls
+    back to loading the document. ``predicate`` filters the features.
+    """
+    if path.endswith(SIDECAR_SUFFIX):
+        ndjson = path
+    else:
+        ndjson = sidecar_path(path)
+        if not sidecar_is_fresh(path):
+            for feature in load_features(path):
+                if predicate is None or predicate(feature):
+                    yield feature
+            return
+
+    with open(ndjson, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            feature = json.loads(line)
+            if predicate is None or predicate(feature):
+                yield feature
+
+
+def find_feature(path, feature_id):
+    """Return the feature with ``feature_id``, stopping as soon as it is found."""
+    return next(iter_features(path, lambda f: f.get('id') == feature_id), None)
+
+
+def update_passes(path, outcomes):
+    """Write ``{feature_id: passes}`` back into the catalogue at ``path``.
+
+    Only rewrites the file (and its sidecar) when a value actually changes.
+    Returns the number of features whose ``passes`` flipped.
+    """
+    with open(path, encoding='utf-8') as f:
+        document = json.load(f)
+    features = document['features'] if isinstance(document, dict) else document
+    flipped = 0
+    for feature in features:
+        passes = outcomes.get(feature['id'])
+        if passes is not None and feature.get('passes') != passes:
+            feature['passes'] = passes
+            flipped += 1
+    if not flipped:
+        return 0
+    if isinstance(document, dict):
+        write_catalogue(path, document, sidecar=os.path.exists(sidecar_path(path)))
+    else:
+        for feature in features:
+            validate_feature(normalize_feature(feature))
+        with atomic_writer(path) as f:
+            json.dump(document, f, indent=2)
+    return flipped
@@ -0,0 +1,290 @@
+"""Span tracing for catalogue runs, exported as Chrome trace and folded stacks.
+
+The runner opens a span per feature and per ``test_step``; the scheduler
+adds one per fixture setup and :class:`~feature_catalogue.http.HttpClient`
+one per request, split into ``connect``, ``send``, ``wait`` (until the
+status line arrives: server and database time) and ``read``. When the
+server sends a ``Server-Timing`` header, its entries (``db;dur=41``)
+become child spans of ``wait``, laid end to end in header order since the
+header carries durations but no start times. The Express server in
+``server/`` sends no such header today, so ``wait`` stays one undivided
+span until a middleware adds it.
+
+Tracing is off unless :func:`start` installed a tracer. While it is off,
+:func:`span` returns a shared no-op context manager, so the hooks cost one
+global lookup. Sampling is decided once per feature, deterministically
+from its id, so the same cases are traced on every run; with ``slow_ms``
+set, features outside the sample are traced anyway and kept only if they
+took at least that long. The current span lives in a context variable, so
+concurrent features on one event loop don't mix.
+
+:func:`write_chrome` writes the Chrome trace event format, which Perfetto
+and ``chrome://tracing`` open, with one lane per feature.
+:func:`fold` turns those events into flamegraph folded stacks
+(``category;#12 feature;step 3: ...;GET /api/...;wait 1234``, self time
+in microseconds), from a live tracer or a saved trace file. So a slow run
+can be diagnosed from its trace without running it again.
+"""
+import argparse
+import json
+import time
+import zlib
+from contextvars import ContextVar
+
+_tracer = None
+_current = ContextVar('catalogue_trace_span', default=None)
+
+HTTP_PHASES = ('connect', 'send', 'wait', 'read')
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, key, value):
+        pass
+
+
+_NOOP = _NoSpan()
+
+
+class _Suppressed:
+    """Marks a feature outside the sample, so spans below it are no-ops too."""
+    __slots__ = ('_token',)
+
+    def __enter__(self):
+        self._token = _current.set(_SUPPRESSED)
+        return _NOOP
+
+    def __exit__(self, *exc):
+        _current.reset(self._token)
+        return False
+
+
+_SUPPRESSED = object()
+
+
+class Span:
+    __slots__ = ('tracer', 'name', 'cat', 'args', 'root', 'lane', 'keep', 'start', 'end', 'buffer', '_token')
+
+    def __init__(self, tracer, name, cat, args, parent, lane=None, keep=True):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.root = parent.root if parent is not None else self
+        self.lane = lane
+        self.keep = keep
+        self.buffer = [] if parent is None else None
+
+    def set(self, key, value):
+        self.args[key] = value
+
+    def __enter__(self):
+        self._token = _current.set(self)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end = time.perf_counter_ns()
+        _current.reset(self._token)
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.root.buffer.append(self)
+        if self.root is self:
+            self.tracer._finish(self)
+        return False
+
+
+class Tracer:
+    def __init__(self, sample=1.0, slow_ms=None):
+        self.sample = sample
+        self.slow_ns = None if slow_ms is None else slow_ms * 1e6
+        self.origin = time.perf_counter_ns()
+        self.spans = []
+        self.lanes = {}
+        self.dropped = 0
+
+    def sampled(self, key):
+        if self.sample >= 1:
+            return True
+        return zlib.crc32(str(key).encode()) / 2 ** 32 < self.sample
+
+    def root(self, name, cat, args, key, label):
+        keep = self.sampled(key)
+        if not keep and self.slow_ns is None:
+            self.dropped += 1
+            return _Suppressed()
+        lane = self.lanes.setdefault(label, len(self.lanes) + 1)
+        return Span(self, name, cat, args, None, lane, keep)
+
+    def _finish(self, root):
+        if root.keep or root.end - root.start >= self.slow_ns:
+            self.spans.extend(root.buffer)
+        else:
+            self.dropped += 1
+
+    def events(self):
+        """Return the kept spans as Chrome trace events, lane metadata first."""
+        events = [{'ph': 'M', 'name': 'process_name', 'pid': 1, 'args': {'name': 'catalogue run'}}]
+        for label, lane in self.lanes.items():
+            events.append({'ph': 'M', 'name': 'thread_name', 'pid': 1, 'tid': lane, 'args': {'name': label}})
+            events.append({'ph': 'M', 'name': 'thread_sort_index', 'pid': 1, 'tid': lane,
+                           'args': {'sort_index': lane}})
+        for s in sorted(self.spans, key=lambda s: (s.root.lane, s.start, -s.end)):
+            event = {'name': s.name, 'cat': s.cat, 'ph': 'X', 'pid': 1, 'tid': s.root.lane,
+                     'ts': (s.start - self.origin) / 1000, 'dur': (s.end - s.start) / 1000}
+            if s.args:
+                event['args'] = s.args
+            events.append(event)
+        return events
+
+
+def start(sample=1.0, slow_ms=None):
+    """Install and return a tracer; spans are recorded until :func:`stop`."""
+    global _tracer
+    _tracer = Tracer(sample, slow_ms)
+    return _tracer
+
+
+def stop():
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def enabled():
+    return _tracer is not None
+
+
+def span(name, cat='span', **args):
+    """Context manager timing ``name`` below the current span; a no-op while tracing is off."""
+    if _tracer is None:
+        return _NOOP
+    parent = _current.get()
+    if parent is _SUPPRESSED:
+        return _NOOP
+    if parent is None:
+        return _tracer.root(name, cat, args, name, f'{name} ({len(_tracer.lanes) + 1})')
+    return Span(_tracer, name, cat, args, parent)
+
+
+def feature_span(feature):
+    """Root span of one feature run, sampled by feature id; one trace lane per feature."""
+    if _tracer is None:
+        return _NOOP
+    label = f"#{feature['id']} {feature['description']}"
+    return _tracer.root(label, feature['category'], {'id': feature['id']}, feature['id'], label)
+
+
+def server_timing(header, parent):
+    """Record ``Server-Timing`` entries (``name;dur=ms``) as children of span ``parent``.
+
+    Each entry starts where the previous one ended, clipped to ``parent``,
+    so :func:`_nest` sees siblings rather than one entry inside another.
+    """
+    if not isinstance(parent, Span):
+        return
+    cursor = parent.start
+    for entry in header.split(','):
+        name, *params = [p.strip() for p in entry.split(';')]
+        durations = [p[4:] for p in params if p.startswith('dur=')]
+        if not name or not durations:
+            continue
+        try:
+            dur_ns = int(float(durations[0]) * 1e6)
+        except ValueError:
+            continue
+        child = Span(parent.tracer, f'server: {name}', 'server', {}, parent)
+        child.start, child.end = cursor, min(parent.end, cursor + dur_ns)
+        cursor = child.end
+        parent.root.buffer.append(child)
+
+
+def write_chrome(path, tracer, metadata=None):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': tracer.events(), 'displayTimeUnit': 'ms',
+                   'otherData': {**(metadata or {}), 'sample': tracer.sample, 'dropped': tracer.dropped}}, f)
+
+
+def _nest(events):
+    """Yield ``(event, stack, self_time_us)`` for Chrome ``X`` events, nesting them by time per lane."""
+    lanes = {}
+    for event in events:
+        if event.get('ph') == 'X':
+            lanes.setdefault((event.get('pid'), event.get('tid')), []).append(event)
+    for lane_events in lanes.values():
+        lane_events.sort(key=lambda e: (e['ts'], -e['dur']))
+        stack = []    # [event, path, time spent in children] per open span
+        for event in lane_events:
+            while stack and event['ts'] >= stack[-1][0]['ts'] + stack[-1][0]['dur'] - 1e-3:
+                yield _close(stack)
+            name = event['name'].replace(';', ',')
+            path = stack[-1][1] + ';' + name if stack else f"{event.get('cat', 'span')};{name}"
+            stack.append([event, path, 0.0])
+        while stack:
+            yield _close(stack)
+
+
+def _close(stack):
+    event, path, children = stack.pop()
+    if stack:
+        stack[-1][2] += event['dur']
+    return event, path, max(0.0, event['dur'] - children)
+
+
+def fold(events):
+    """Return ``{stack: self_time_us}`` for flamegraph tools."""
+    stacks = {}
+    for _, path, us in _nest(events):
+        stacks[path] = stacks.get(path, 0.0) + us
+    return stacks
+
+
+def write_folded(path, events):
+    with open(path, 'w', encoding='utf-8') as f:
+        for stack, us in sorted(fold(events).items()):
+            if us >= 1:
+                f.write(f'{stack} {round(us)}\n')
+
+
+def summarize(events, top=15):
+    """Slowest features and the span names with the most self time, as printable lines."""
+    roots = sorted((e for e in events if e.get('ph') == 'X' and 'id' in e.get('args', {})),
+                   key=lambda e: -e['dur'])
+    lines = ['slowest features:']
+    lines += [f"  {e['dur'] / 1000:9.1f} ms  {e['name']}" for e in roots[:top]]
+    by_kind = {}
+    for event, _, us in _nest(events):
+        # Request phases (connect/send/wait/read) separately, everything else by category.
+        kind = f"http {event['name']}" if event['name'] in HTTP_PHASES else event.get('cat', 'span')
+        by_kind[kind] = by_kind.get(kind, 0.0) + us
+    lines.append('self time by kind:')
+    lines += [f'  {us / 1000:9.1f} ms  {kind}'
+              for kind, us in sorted(by_kind.items(), key=lambda item: -item[1])[:top]]
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize a catalogue run trace or convert it to folded stacks.")
+    parser.add_argument('trace', help="Chrome trace JSON written by the runner's --trace")
+    parser.add_argument('--folded', metavar='PATH', help="write flamegraph folded stacks to PATH")
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args(argv)
+
+    with open(args.trace, encoding='utf-8') as f:
+        data = json.load(f)
+    events = data['traceEvents'] if isinstance(data, dict) else data
+    if args.folded:
+        write_folded(args.folded, events)
+        print(f"Wrote folded stacks to {args.folded}")
+    print('\n'.join(summarize(events, args.top)))
+
+
+if __name__ == '__main__':
+    main()